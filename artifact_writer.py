@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+import pygame
+from variables import *
+
+class ArtifactWriter:
+    """Class writing the output files of the game (screenshots, maze images, path.txt) on worker threads.
+
+    Callers hand over a snapshot of what to write, like a copy of the window, so
+    the encode and the disk write never run on the thread handling input. Pending
+    files wait in a bounded queue; a file submitted again before it was written
+    only keeps its latest snapshot. Files can be switched off one by one with
+    ARTIFACT_ENABLED, in which case no snapshot is taken at all.
+    """
+
+    def __init__(self, max_pending, worker_count, enabled):
+        """
+        Initialize an artifact writer. The worker threads start with the first submitted file.
+
+        Args:
+            max_pending (int): The maximum number of files waiting to be written.
+            worker_count (int): The number of worker threads.
+            enabled (dict): Whether to write each output file, keyed by file name without folder. Files not listed are written.
+        """
+        self.worker_count = worker_count
+        self.enabled = enabled
+        self.queue = queue.Queue(max_pending)
+        self.pending = {}
+        self.file_locks = {}
+        self.lock = threading.Lock()
+        self.workers = []
+        self.written = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def is_enabled(self, file_name):
+        """
+        Check whether an output file should be written.
+
+        Args:
+            file_name (str): The path of the file.
+
+        Returns:
+            bool: True if the file is enabled.
+        """
+        return self.enabled.get(os.path.basename(file_name), True)
+
+    def submit(self, file_name, function, *args):
+        """
+        Queue a function writing a file. Blocks only while max_pending other files are waiting.
+
+        Args:
+            file_name (str): The path of the file, used for the enable flag and to merge jobs for the same file.
+            function (callable): The function writing the file.
+            *args: The arguments of the function, which must not change after the call.
+
+        Returns:
+            bool: True if the file was queued, False if it is disabled.
+        """
+        if not self.is_enabled(file_name):
+            self.skipped += 1
+            return False
+        if not self.workers:
+            self.start()
+        with self.lock:
+            queued = file_name in self.pending
+            self.pending[file_name] = (function, args)
+            self.file_locks.setdefault(file_name, threading.Lock())
+        if not queued:
+            self.queue.put(file_name)
+        return True
+
+    def save_surface(self, surface, file_name):
+        """
+        Queue a copy of a surface to be saved with pygame.image.save.
+
+        Args:
+            surface (pygame.Surface): The surface, which can be drawn on again right after the call.
+            file_name (str): The path of the image file.
+
+        Returns:
+            bool: True if the image was queued, False if it is disabled.
+        """
+        if not self.is_enabled(file_name):
+            self.skipped += 1
+            return False
+        return self.submit(file_name, pygame.image.save, surface.copy(), file_name)
+
+    def save_text(self, text, file_name):
+        """
+        Queue a text to be written to a file.
+
+        Args:
+            text (str): The content of the file.
+            file_name (str): The path of the text file.
+
+        Returns:
+            bool: True if the text was queued, False if it is disabled.
+        """
+        return self.submit(file_name, write_text_file, text, file_name)
+
+    def start(self):
+        """
+        Start the worker threads.
+        """
+        for _ in range(self.worker_count):
+            worker = threading.Thread(target=self.work, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def work(self):
+        """
+        Write the queued files until the None sentinel of close is taken from the queue.
+        """
+        while True:
+            file_name = self.queue.get()
+            if file_name is None:
+                self.queue.task_done()
+                return
+            with self.lock:
+                function, args = self.pending.pop(file_name)
+                file_lock = self.file_locks[file_name]
+            # A newer snapshot of the same file may be taken by another worker; it waits for this one
+            with file_lock:
+                try:
+                    function(*args)
+                    self.written += 1
+                except Exception as error:
+                    self.errors += 1
+                    print(f"Failed to write {file_name}: {error}")
+            self.queue.task_done()
+
+    def flush(self):
+        """
+        Wait until every queued file has been written.
+        """
+        if self.workers:
+            self.queue.join()
+
+    def close(self):
+        """
+        Write the queued files and stop the worker threads. A later submit starts them again.
+        """
+        self.flush()
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+
+    def __str__(self):
+        """
+        Return a string representation of the writer statistics.
+
+        Returns:
+            str: String representation of the writer.
+        """
+        return f'pending:{len(self.pending)} written:{self.written} skipped:{self.skipped} errors:{self.errors}'
+
+def write_text_file(text, file_name):
+    """
+    Write a text to a file.
+
+    Args:
+        text (str): The content of the file.
+        file_name (str): The path of the file.
+    """
+    with open(file_name, "w") as fh:
+        fh.write(text)
+
+# The artifact writer shared by the whole game
+ARTIFACT_WRITER = ArtifactWriter(ARTIFACT_QUEUE_SIZE, ARTIFACT_WORKER_COUNT, ARTIFACT_ENABLED)
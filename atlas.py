@@ -0,0 +1,125 @@
+import glob
+import json
+import os
+import pygame
+from variables import *
+
+# Sprites packed for each size they are drawn at (None keeps the original size).
+# Sizes are in pixels; the middle maze sizes follow VISIBLE_WIDTH / (block_in_maze * CELL_IN_BLOCK).
+ITEM_IMAGE_LIST = ["assets/image/coin.png", "assets/image/sword.png", "assets/image/meat.png",
+                   "assets/image/coke.png", "assets/image/shield.png", "assets/image/finish_flag.png"]
+MIDDLE_MAZE_CELL_SIZE_LIST = [int(VISIBLE_WIDTH/(block_in_maze*CELL_IN_BLOCK)) for block_in_maze in (3, 4, 5)]
+ATLAS_SPRITES = {
+    LARGE_MAZE_CELL_SIZE: ITEM_IMAGE_LIST + ["assets/image/enemy/*/*.png"],
+    SMALL_MAZE_CELL_SIZE: ITEM_IMAGE_LIST + ["assets/image/danger.png", "assets/image/red-circle.png"],
+    BATTLE_PLAYER_IMAGE_SIZE: ["assets/image/enemy/*/*.png", "assets/image/attack/*.png",
+                               "assets/image/move_left/frame_2.png", "assets/image/defend.png"],
+    PLAYER_INFORMATION_IMAGE_SIZE: [f"assets/image/{icon}.png" for icon in ICON_LIST],
+    HELPER_PORTRAIT_SIZE: ["assets/image/portrait/*.png"],
+    TURN_ICON_IMAGE_SIZE: ["assets/image/sword.png", "assets/image/defense.png"],
+    None: ["assets/image/move_*/frame_*.png"],
+}
+for middle_size in MIDDLE_MAZE_CELL_SIZE_LIST:
+    ATLAS_SPRITES[middle_size] = ATLAS_SPRITES.get(middle_size, []) + ITEM_IMAGE_LIST + ["assets/image/danger.png", "assets/image/red-circle.png"]
+
+ATLAS_FOLDER = "assets/atlas"
+ATLAS_MANIFEST = "manifest.json"
+ATLAS_WIDTH = 1024
+# Empty pixels between sprites, so smoothscaled edges never bleed into each other
+ATLAS_PADDING = 1
+
+def sprite_paths(patterns):
+    """
+    Expand the glob patterns of one atlas into a sorted list of image paths without duplicates.
+
+    Args:
+        patterns (list): The paths or glob patterns of the sprites.
+
+    Returns:
+        list: The image paths, with forward slashes.
+    """
+    paths = set()
+    for pattern in patterns:
+        paths.update(path.replace(os.sep, "/") for path in glob.glob(pattern))
+    return sorted(paths)
+
+def pack_sprites(sizes, width):
+    """
+    Place rectangles on shelves of an atlas, tallest first.
+
+    Args:
+        sizes (dict): The (width, height) of each sprite, keyed by path.
+        width (int): The width of the atlas.
+
+    Returns:
+        tuple: The rects (x, y, w, h) keyed by path, and the height of the atlas.
+    """
+    rects = {}
+    x = y = shelf_height = 0
+    for path in sorted(sizes, key=lambda path: (-sizes[path][1], path)):
+        sprite_width, sprite_height = sizes[path]
+        if x + sprite_width > width:
+            x, y = 0, y + shelf_height + ATLAS_PADDING
+            shelf_height = 0
+        rects[path] = (x, y, sprite_width, sprite_height)
+        x += sprite_width + ATLAS_PADDING
+        shelf_height = max(shelf_height, sprite_height)
+    return rects, y + shelf_height
+
+def build_atlases(folder=ATLAS_FOLDER):
+    """
+    Pack every sprite of ATLAS_SPRITES into one PNG per size and write the manifest.
+
+    The sprites are converted and smoothscaled exactly like ImageCache.get does it, so
+    a sprite cut out of an atlas is the image the game would otherwise load.
+
+    Args:
+        folder (str, optional): The folder to write the atlases and the manifest to.
+    """
+    os.makedirs(folder, exist_ok=True)
+    manifest = []
+    for size, patterns in ATLAS_SPRITES.items():
+        images = {}
+        for path in sprite_paths(patterns):
+            image = pygame.image.load(path).convert_alpha()
+            images[path] = image if size is None else pygame.transform.smoothscale(image, (size, size))
+        rects, height = pack_sprites({path: image.get_size() for path, image in images.items()}, ATLAS_WIDTH)
+        atlas = pygame.Surface((ATLAS_WIDTH, max(height, 1)), pygame.SRCALPHA, 32)
+        for path, image in images.items():
+            # The atlas starts fully transparent, so the maximum copies the pixels without blending
+            atlas.blit(image, rects[path][:2], special_flags=pygame.BLEND_RGBA_MAX)
+        file_name = f"atlas_{'original' if size is None else size}.png"
+        pygame.image.save(atlas, os.path.join(folder, file_name))
+        manifest.append({"size": size, "file": file_name, "sprites": rects})
+        print(f"{file_name}: {len(rects)} sprites, {ATLAS_WIDTH}x{height}")
+    with open(os.path.join(folder, ATLAS_MANIFEST), "w") as fh:
+        json.dump(manifest, fh, indent=1)
+
+def load_manifest(folder=ATLAS_FOLDER):
+    """
+    Read the atlas manifest written by build_atlases.
+
+    Args:
+        folder (str, optional): The folder containing the atlases and the manifest.
+
+    Returns:
+        dict: The (atlas path, rect) of each sprite, keyed by (image path, size). Empty if no atlas was built.
+    """
+    try:
+        with open(os.path.join(folder, ATLAS_MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return {}
+    sprites = {}
+    for atlas in manifest:
+        atlas_path = os.path.join(folder, atlas["file"])
+        for path, rect in atlas["sprites"].items():
+            sprites[(path, atlas["size"])] = (atlas_path, tuple(rect))
+    return sprites
+
+if __name__ == "__main__":
+    # Sprites are converted to the display format, which needs a (hidden) display
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    build_atlases()
+    pygame.quit()
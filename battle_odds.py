@@ -0,0 +1,387 @@
+import collections
+import functools
+import threading
+import numpy as np
+from variables import *
+
+# The odds are kept in tables of shape (2, player life + 1, enemy life + 1): the win probability and the expected
+# life of the player at the end of the battle, for every pair of lives at the start of a turn. Column 0 holds the
+# battles the enemy lost, row 0 the ones the player lost.
+
+@functools.lru_cache(maxsize=BATTLE_ODDS_CACHE_SIZE)
+def damage_distribution(attack, attack_dice, defense, defense_dice):
+    """
+    Get the distribution of the damage of one roll, attack * attack dice - defense * defense dice and at least 0.
+
+    Args:
+        attack (int): The attack power of the attacker.
+        attack_dice (tuple): The (lower_bound, upper_bound) of the attacker's dice.
+        defense (int): The defense power of the defender.
+        defense_dice (tuple): The (lower_bound, upper_bound) of the defender's dice.
+
+    Returns:
+        tuple: The possible damages and their probabilities, as numpy arrays.
+    """
+    attack_rolls = np.arange(attack_dice[0], attack_dice[1] + 1)
+    defense_rolls = np.arange(defense_dice[0], defense_dice[1] + 1)
+    damages = np.maximum(attack * attack_rolls[:, None] - defense * defense_rolls[None, :], 0).ravel()
+    values, counts = np.unique(damages, return_counts=True)
+    return values, counts / damages.size
+
+def create_boundary_table(max_player_life, max_enemy_life):
+    """
+    Create a table holding only the battles already over.
+
+    Args:
+        max_player_life (int): The largest player life in the table.
+        max_enemy_life (int): The largest enemy life in the table.
+
+    Returns:
+        numpy.ndarray: The table, with zeros for the battles still running.
+    """
+    table = np.zeros((2, max_player_life + 1, max_enemy_life + 1))
+    set_boundary(table)
+    return table
+
+def set_boundary(table):
+    """
+    Fill the battles already over in a table: the player wins with its life left, or loses with nothing left.
+
+    Args:
+        table (numpy.ndarray): The table to fill.
+    """
+    table[0, :, 0] = 1
+    table[1, :, 0] = np.arange(table.shape[1])
+    table[:, 0, 1:] = 0
+
+@functools.lru_cache(maxsize=BATTLE_ODDS_CACHE_SIZE)
+def get_base_tables(player_attack_stats, enemy_attack_stats, max_player_life, max_enemy_life):
+    """
+    Compute the odds of every pair of lives when no helper is active.
+
+    A turn where nobody takes damage comes back to the same lives, so the odds of a pair of lives
+    are solved from the pairs with less life in total, one diagonal of the table at a time.
+
+    Args:
+        player_attack_stats (tuple): The (attack, attack_dice, defense, defense_dice) of the player's attack roll.
+        enemy_attack_stats (tuple): The (attack, attack_dice, defense, defense_dice) of the enemy's attack roll.
+        max_player_life (int): The largest player life in the tables.
+        max_enemy_life (int): The largest enemy life in the tables.
+
+    Returns:
+        tuple: The tables at the start of an attack turn and of a defense turn. Must not be modified.
+    """
+    player_damages, player_probabilities = damage_distribution(*player_attack_stats)
+    enemy_damages, enemy_probabilities = damage_distribution(*enemy_attack_stats)
+    player_miss = player_probabilities[player_damages == 0].sum()
+    enemy_miss = enemy_probabilities[enemy_damages == 0].sum()
+    attack_table = create_boundary_table(max_player_life, max_enemy_life)
+    defense_table = create_boundary_table(max_player_life, max_enemy_life)
+    if player_miss * enemy_miss >= 1:
+        # Nobody can ever take damage: the battle never ends and the player keeps its life
+        attack_table[1, 1:, 1:] = np.arange(1, max_player_life + 1)[:, None]
+        defense_table[1, 1:, 1:] = attack_table[1, 1:, 1:]
+        return attack_table, defense_table
+
+    # Only the rolls dealing damage lead to other lives
+    player_hits = player_damages > 0
+    player_damages, player_probabilities = player_damages[player_hits], player_probabilities[player_hits]
+    enemy_hits = enemy_damages > 0
+    enemy_damages, enemy_probabilities = enemy_damages[enemy_hits], enemy_probabilities[enemy_hits]
+    for total in range(2, max_player_life + max_enemy_life + 1):
+        player_lives = np.arange(max(1, total - max_enemy_life), min(max_player_life, total - 1) + 1)
+        enemy_lives = total - player_lives
+        # Odds after the attack roll and after the defense roll, one row per damage
+        after_attack = player_probabilities @ defense_table[:, player_lives, np.maximum(enemy_lives - player_damages[:, None], 0)]
+        after_defense = enemy_probabilities @ attack_table[:, np.maximum(player_lives - enemy_damages[:, None], 0), enemy_lives]
+        attack_odds = (after_attack + player_miss * after_defense) / (1 - player_miss * enemy_miss)
+        attack_table[:, player_lives, enemy_lives] = attack_odds
+        defense_table[:, player_lives, enemy_lives] = enemy_miss * attack_odds + after_defense
+    attack_table.flags.writeable = False
+    defense_table.flags.writeable = False
+    return attack_table, defense_table
+
+def get_attack_roll_table(defense_table, damages, probabilities, heal, max_life):
+    """
+    Compute the odds at the start of an attack turn from the odds at the start of the next defense turn.
+
+    Args:
+        defense_table (numpy.ndarray): The odds at the start of the next defense turn.
+        damages (numpy.ndarray): The possible damages of the player's attack.
+        probabilities (numpy.ndarray): The probabilities of the damages.
+        heal (int): The life Chopper gives the player before the roll, 0 if Chopper is not active.
+        max_life (int): The maximum life of the player.
+
+    Returns:
+        numpy.ndarray: The odds at the start of the attack turn.
+    """
+    table = np.zeros(defense_table.shape)
+    for damage, probability in zip(damages, probabilities):
+        # Lives above the damage move down by it, the others end the battle in column 0
+        table[:, :, damage:] += probability * defense_table[:, :, :max(defense_table.shape[2] - damage, 0)]
+        table[:, :, :damage] += probability * defense_table[:, :, :1]
+    if heal:
+        table = table[:, np.minimum(np.arange(table.shape[1]) + heal, max_life), :]
+    set_boundary(table)
+    return table
+
+def get_defense_roll_table(attack_table, damages, probabilities, never_die):
+    """
+    Compute the odds at the start of a defense turn from the odds at the start of the next attack turn.
+
+    Args:
+        attack_table (numpy.ndarray): The odds at the start of the next attack turn.
+        damages (numpy.ndarray): The possible damages of the enemy's attack.
+        probabilities (numpy.ndarray): The probabilities of the damages.
+        never_die (bool): Whether Zoro leaves the player 1 life instead of losing.
+
+    Returns:
+        numpy.ndarray: The odds at the start of the defense turn.
+    """
+    lowest_life = 1 if never_die else 0
+    table = np.zeros(attack_table.shape)
+    for damage, probability in zip(damages, probabilities):
+        # Lives above the damage move down by it, the others end at the lowest life
+        table[:, damage + lowest_life:] += probability * attack_table[:, lowest_life:max(attack_table.shape[1] - damage, lowest_life)]
+        table[:, :damage + lowest_life] += probability * attack_table[:, lowest_life:lowest_life + 1]
+    set_boundary(table)
+    return table
+
+@functools.lru_cache(maxsize=BATTLE_ODDS_CACHE_SIZE)
+def get_odds_table(player_stats, enemy_stats, max_player_life, max_enemy_life, turn, nami_rounds, chopper_rounds, zoro_rounds):
+    """
+    Compute the odds of every pair of lives at the start of a turn, with the helpers still active.
+
+    The table of a turn is computed from the cached table of the next turn, down to the tables without
+    helpers, so activating a helper or using one of its rounds only computes the tables not seen yet.
+    Brook halves the enemy's attack during the player's attack roll, and the attack is reset before the
+    enemy attacks, so Brook does not change the odds.
+
+    Args:
+        player_stats (tuple): The (attack, defense, attack_dice, defense_dice, maximum_life) of the player.
+        enemy_stats (tuple): The (attack, defense, attack_dice, defense_dice) of the enemy, as reset after every roll.
+        max_player_life (int): The largest player life in the table.
+        max_enemy_life (int): The largest enemy life in the table.
+        turn (str): The turn about to be rolled, "attack" or "defense".
+        nami_rounds (int): The remaining attack rolls without enemy defense.
+        chopper_rounds (int): The remaining attack rolls starting with a heal.
+        zoro_rounds (int): The remaining defense rolls where the player cannot lose.
+
+    Returns:
+        numpy.ndarray: The odds table of the turn. Must not be modified.
+    """
+    player_attack, player_defense, player_attack_dice, player_defense_dice, maximum_life = player_stats
+    enemy_attack, enemy_defense, enemy_attack_dice, enemy_defense_dice = enemy_stats
+    enemy_attack_stats = (enemy_attack, enemy_attack_dice, player_defense, player_defense_dice)
+    if nami_rounds == 0 and chopper_rounds == 0 and zoro_rounds == 0:
+        attack_table, defense_table = get_base_tables((player_attack, player_attack_dice, enemy_defense, enemy_defense_dice),
+                                                      enemy_attack_stats, max_player_life, max_enemy_life)
+        return attack_table if turn == "attack" else defense_table
+
+    if turn == "attack":
+        next_table = get_odds_table(player_stats, enemy_stats, max_player_life, max_enemy_life, "defense",
+                                    max(nami_rounds - 1, 0), max(chopper_rounds - 1, 0), zoro_rounds)
+        defense = 0 if nami_rounds > 0 else enemy_defense
+        damages, probabilities = damage_distribution(player_attack, player_attack_dice, defense, enemy_defense_dice)
+        heal = maximum_life // 5 if chopper_rounds > 0 else 0
+        table = get_attack_roll_table(next_table, damages, probabilities, heal, maximum_life)
+    else:
+        next_table = get_odds_table(player_stats, enemy_stats, max_player_life, max_enemy_life, "attack",
+                                    nami_rounds, chopper_rounds, max(zoro_rounds - 1, 0))
+        damages, probabilities = damage_distribution(*enemy_attack_stats)
+        table = get_defense_roll_table(next_table, damages, probabilities, zoro_rounds > 0)
+    table.flags.writeable = False
+    return table
+
+def battle_odds_args(player, enemy, turn, helper_dict, activated=()):
+    """
+    Get the arguments of get_odds_table for the current state of a battle.
+
+    The table is sized to the largest lives of the battle, so the same table serves every turn
+    whatever the lives; only the turn, the helpers and the stats select another one.
+
+    Args:
+        player (Player): The player object.
+        enemy (Enemy): The enemy object being battled.
+        turn (str): The turn about to be rolled, "attack" or "defense".
+        helper_dict (dict): The helpers, whose active skills change the odds.
+        activated (tuple, optional): The names of helpers to count as just activated, for prefetching.
+
+    Returns:
+        tuple: The arguments of get_odds_table.
+    """
+    rounds = {name: helper.rounds if helper.activate or name in activated else 0 for name, helper in helper_dict.items()}
+    player_stats = (player.attack, player.defense, (player.attack_dice.lower_bound, player.attack_dice.upper_bound),
+                    (player.defense_dice.lower_bound, player.defense_dice.upper_bound), player.maximum_life)
+    enemy_stats = (enemy.initial_attack, enemy.initial_defense, (enemy.attack_dice.lower_bound, enemy.attack_dice.upper_bound),
+                   (enemy.defense_dice.lower_bound, enemy.defense_dice.upper_bound))
+    return (player_stats, enemy_stats, max(player.life, player.maximum_life), max(enemy.life, enemy.initial_life),
+            turn, rounds.get("Nami", 0), rounds.get("Chopper", 0), rounds.get("Zoro", 0))
+
+def read_battle_odds(table, player, enemy):
+    """
+    Read the odds of the current lives of a battle in its odds table.
+
+    Args:
+        table (numpy.ndarray): The odds table, as returned by get_odds_table.
+        player (Player): The player object.
+        enemy (Enemy): The enemy object being battled.
+
+    Returns:
+        tuple: The probability that the player wins, and the expected change of the player's life,
+        positive when Chopper heals more than the enemy takes.
+    """
+    if player.life <= 0 or enemy.life <= 0:
+        return (1.0 if enemy.life <= 0 else 0.0), 0.0
+    win_probability, expected_life = table[:, player.life, enemy.life]
+    return float(win_probability), float(expected_life - player.life)
+
+def get_battle_odds(player, enemy, turn, helper_dict):
+    """
+    Get the exact odds of a battle from its current state, computing its table if needed.
+
+    Computing a table takes up to a few hundred milliseconds; the battle screen uses
+    request_battle_odds instead, which never waits.
+
+    Args:
+        player (Player): The player object.
+        enemy (Enemy): The enemy object being battled.
+        turn (str): The turn about to be rolled, "attack" or "defense".
+        helper_dict (dict): The helpers, whose active skills change the odds.
+
+    Returns:
+        tuple: The probability that the player wins, and the expected change of the player's life in the
+        battle, down to 0 life and before the rewards of a win.
+    """
+    if player.life <= 0 or enemy.life <= 0:
+        return read_battle_odds(None, player, enemy)
+    return read_battle_odds(get_odds_table(*battle_odds_args(player, enemy, turn, helper_dict)), player, enemy)
+
+class BattleOddsWorker:
+    """Class computing odds tables on a worker thread, so the battle screen never waits for them.
+
+    Requests for the battle on screen go first, the newest first. Prefetched tables, for the
+    battles to come, are computed when nothing is requested, and every prefetch replaces the
+    previous one. The last BATTLE_ODDS_CACHE_SIZE finished tables are kept for lookups.
+    """
+
+    def __init__(self):
+        """
+        Initialize a worker. The thread starts with the first request or prefetch.
+        """
+        self.condition = threading.Condition()
+        self.requests = []
+        self.prefetches = []
+        self.tables = collections.OrderedDict()
+        self.thread = None
+
+    def start(self):
+        """
+        Start the worker thread if it is not running. Must be called with the condition held.
+        """
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def get_table(self, args, on_ready=None):
+        """
+        Get a finished table, or ask for it.
+
+        Args:
+            args (tuple): The arguments of get_odds_table, as returned by battle_odds_args.
+            on_ready (callable, optional): Called on the worker thread once the table asked for is finished.
+
+        Returns:
+            numpy.ndarray: The table, or None if it is not finished yet.
+        """
+        with self.condition:
+            if args in self.tables:
+                self.tables.move_to_end(args)
+                return self.tables[args]
+            if all(request_args != args for request_args, _ in self.requests):
+                self.requests.append((args, on_ready))
+                self.start()
+                self.condition.notify()
+        return None
+
+    def prefetch(self, args_list):
+        """
+        Replace the tables to prefetch.
+
+        Args:
+            args_list (list): The arguments of get_odds_table of every table, in the order to compute them.
+        """
+        with self.condition:
+            self.prefetches = [args for args in args_list if args not in self.tables]
+            self.start()
+            self.condition.notify()
+
+    def run(self):
+        """
+        Compute the requested and prefetched tables, forever.
+        """
+        while True:
+            with self.condition:
+                while not self.requests and not self.prefetches:
+                    self.condition.wait()
+                args, on_ready = self.requests.pop() if self.requests else (self.prefetches.pop(0), None)
+                finished = args in self.tables
+            if not finished:
+                table = get_odds_table(*args)
+                with self.condition:
+                    self.tables[args] = table
+                    while len(self.tables) > BATTLE_ODDS_CACHE_SIZE:
+                        self.tables.popitem(last=False)
+            if on_ready is not None:
+                on_ready()
+
+    def __str__(self):
+        """
+        Return a string representation of the worker.
+
+        Returns:
+            str: String representation of the worker.
+        """
+        return f'tables:{len(self.tables)} requests:{len(self.requests)} prefetches:{len(self.prefetches)}'
+
+# The worker computing the odds shown in the battle screen
+BATTLE_ODDS_WORKER = BattleOddsWorker()
+
+def request_battle_odds(player, enemy, turn, helper_dict, on_ready=None):
+    """
+    Get the odds of a battle from its current state without waiting for its table to be computed.
+
+    Args:
+        player (Player): The player object.
+        enemy (Enemy): The enemy object being battled.
+        turn (str): The turn about to be rolled, "attack" or "defense".
+        helper_dict (dict): The helpers, whose active skills change the odds.
+        on_ready (callable, optional): Called on the worker thread once the missing table is finished.
+
+    Returns:
+        tuple: The odds as returned by get_battle_odds, or None while the table is being computed.
+    """
+    if player.life <= 0 or enemy.life <= 0:
+        return read_battle_odds(None, player, enemy)
+    table = BATTLE_ODDS_WORKER.get_table(battle_odds_args(player, enemy, turn, helper_dict), on_ready)
+    return None if table is None else read_battle_odds(table, player, enemy)
+
+def prefetch_battle_odds(player, enemies, helper_dict, helper_names=()):
+    """
+    Prefetch the tables of the battles to come with the current stats of the player.
+
+    Args:
+        player (Player): The player object.
+        enemies (list): The enemies to prefetch, the first ones first. Defeated enemies are skipped.
+        helper_dict (dict): The helpers.
+        helper_names (tuple, optional): The helpers the player may activate, whose tables are prefetched too.
+    """
+    args_list = []
+    for enemy in enemies:
+        if enemy.defeated:
+            continue
+        for activated in [()] + [(name,) for name in helper_names]:
+            for turn in ("attack", "defense"):
+                args_list.append(battle_odds_args(player, enemy, turn, helper_dict, activated))
+    # Helpers without an effect on the odds give the same tables as no helper
+    BATTLE_ODDS_WORKER.prefetch(list(dict.fromkeys(args_list)))
@@ -0,0 +1,285 @@
+import concurrent.futures
+import numpy as np
+from variables import *
+from maze import Maze
+from player import Player
+from engine import create_helper
+
+class BattleStats:
+    """Class keeping the stats a battle depends on, for the player or an enemy.
+
+    Dice are kept as (lower_bound, upper_bound) tuples, so stats can be sent to other processes.
+    """
+
+    def __init__(self, life, maximum_life, attack, defense, attack_dice, defense_dice):
+        """
+        Initialize the stats of one side of a battle.
+
+        Args:
+            life (int): The life points at the start of the battle.
+            maximum_life (int): The maximum life points, the limit of Chopper's healing.
+            attack (int): The attack power.
+            defense (int): The defense power.
+            attack_dice (tuple): The (lower_bound, upper_bound) of the attack dice.
+            defense_dice (tuple): The (lower_bound, upper_bound) of the defense dice.
+        """
+        self.life = life
+        self.maximum_life = maximum_life
+        self.attack = attack
+        self.defense = defense
+        self.attack_dice = attack_dice
+        self.defense_dice = defense_dice
+
+    def __str__(self):
+        """
+        Return a string representation of the stats.
+
+        Returns:
+            str: String representation of the stats.
+        """
+        return f'life:{self.life}/{self.maximum_life} attack:{self.attack} defense:{self.defense} ' \
+               f'attack_dice:{self.attack_dice} defense_dice:{self.defense_dice}'
+
+def player_stats(player:Player):
+    """
+    Get the battle stats of a player.
+
+    Args:
+        player (Player): The player object.
+
+    Returns:
+        BattleStats: The current stats of the player.
+    """
+    return BattleStats(player.life, player.maximum_life, player.attack, player.defense,
+                       (player.attack_dice.lower_bound, player.attack_dice.upper_bound),
+                       (player.defense_dice.lower_bound, player.defense_dice.upper_bound))
+
+def enemy_stats(enemy):
+    """
+    Get the battle stats of an enemy.
+
+    Args:
+        enemy (Enemy): The enemy object.
+
+    Returns:
+        BattleStats: The current stats of the enemy.
+    """
+    return BattleStats(enemy.life, enemy.initial_life, enemy.attack, enemy.defense,
+                       (enemy.attack_dice.lower_bound, enemy.attack_dice.upper_bound),
+                       (enemy.defense_dice.lower_bound, enemy.defense_dice.upper_bound))
+
+def roster_stats(block_in_maze):
+    """
+    List every stat block the enemy factories of a level can create. Each is equally likely.
+
+    Args:
+        block_in_maze (int): The level, as the number of blocks in each row and column of the maze.
+
+    Returns:
+        list: The BattleStats of the possible enemies.
+    """
+    attack, defense, life, dice = {3: (EASY_ENEMY_ATTACK, EASY_ENEMY_DEFENSE, EASY_ENEMY_LIFE, EASY_ENEMY_DICE),
+                                   4: (MEDIUM_ENEMY_ATTACK, MEDIUM_ENEMY_DEFENSE, MEDIUM_ENEMY_LIFE, MEDIUM_ENEMY_DICE),
+                                   5: (HARD_ENEMY_ATTACK, HARD_ENEMY_DEFENSE, HARD_ENEMY_LIFE, HARD_ENEMY_DICE)}[block_in_maze]
+    roster = []
+    for attack_change in [-1,0,1]:
+        for defense_change in [-1,0,1]:
+            for life_change in [-1,0,1]:
+                enemy_life = life + life_change * ENEMY_LIFE_VARIATION
+                roster.append(BattleStats(enemy_life, enemy_life, attack + attack_change, defense + defense_change, dice, dice))
+    return roster
+
+def roll_dice(rng, dice, size):
+    """
+    Roll a dice for many battles at once.
+
+    Args:
+        rng (numpy.random.Generator): The random generator.
+        dice (tuple): The (lower_bound, upper_bound) of the dice.
+        size (int): The number of rolls.
+
+    Returns:
+        numpy.ndarray: The results of the rolls.
+    """
+    return rng.integers(dice[0], dice[1] + 1, size)
+
+def simulate_battle_batch(player:BattleStats, enemy:BattleStats, helpers, count, rng, max_rolls):
+    """
+    Simulate a batch of battles between the same player and enemy, one dice roll of every battle at a time.
+
+    The rules are the ones of GameState.play_roll: the player attacks, then defends, and the enemy's attack
+    and defense are reset after every roll. Helpers are used at the same rolls in every battle, so their
+    remaining rounds are kept once for the whole batch, and battles are dropped from the arrays once they end.
+
+    Args:
+        player (BattleStats): The stats of the player.
+        enemy (BattleStats): The stats of the enemy.
+        helpers (tuple): The names of the helpers activated when the battle starts, in activation order.
+        count (int): The number of battles.
+        rng (numpy.random.Generator): The random generator.
+        max_rolls (int): The number of dice rolls after which a battle is a draw.
+
+    Returns:
+        tuple: The number of wins, the number of losses, the number of wins after each number of
+        player attacks (numpy.ndarray) and the total life lost by the player.
+    """
+    helper_dict = create_helper()
+    rounds = {}
+    turns_to_kill = np.zeros(max_rolls // 2 + 2, dtype=np.int64)
+    start_enemy_life = enemy.life
+
+    # The skills used right away are used once per activation, before the first roll
+    for name in helpers:
+        rounds[name] = helper_dict[name].rounds
+        for helper in helper_dict.values():
+            if rounds.get(helper.name, 0) > 0 and helper.skill_execution_time == "right_away":
+                rounds[helper.name] -= 1
+                if helper.name == "Sanji":
+                    start_enemy_life -= int(player.attack * player.attack_dice[1] * 1.5)
+                elif helper.name == "Usopp":
+                    # The player escapes, which ends the battle as a win
+                    start_enemy_life = 0
+            if start_enemy_life <= 0:
+                turns_to_kill[0] = count
+                return count, 0, turns_to_kill, 0
+
+    player_life = np.full(count, player.life, dtype=np.int64)
+    enemy_life = np.full(count, start_enemy_life, dtype=np.int64)
+    wins = losses = life_lost = 0
+    for roll in range(max_rolls):
+        if player_life.size == 0:
+            break
+        enemy_attack, enemy_defense = enemy.attack, enemy.defense
+        execution_time = "before_attack" if roll % 2 == 0 else "before_defense"
+        for helper in helper_dict.values():
+            if rounds.get(helper.name, 0) > 0 and helper.skill_execution_time == execution_time:
+                rounds[helper.name] -= 1
+                if helper.name == "Nami":
+                    enemy_defense = 0
+                elif helper.name == "Brook":
+                    enemy_attack = enemy_attack // 2
+                elif helper.name == "Chopper":
+                    player_life = np.minimum(player_life + player.maximum_life // 5, player.maximum_life)
+
+        if roll % 2 == 0:
+            damage = player.attack * roll_dice(rng, player.attack_dice, player_life.size) \
+                     - enemy_defense * roll_dice(rng, enemy.defense_dice, player_life.size)
+            enemy_life -= np.maximum(damage, 0)
+            done = enemy_life <= 0
+            won = int(np.count_nonzero(done))
+            wins += won
+            turns_to_kill[roll // 2 + 1] += won
+            life_lost += int(np.sum(player.life - player_life[done]))
+        else:
+            damage = enemy_attack * roll_dice(rng, enemy.attack_dice, player_life.size) \
+                     - player.defense * roll_dice(rng, player.defense_dice, player_life.size)
+            player_life -= np.maximum(damage, 0)
+            if rounds.get("Zoro", 0) > 0:
+                rounds["Zoro"] -= 1
+                player_life = np.maximum(player_life, 1)
+            done = player_life <= 0
+            lost = int(np.count_nonzero(done))
+            losses += lost
+            life_lost += lost * player.life
+        player_life = player_life[~done]
+        enemy_life = enemy_life[~done]
+
+    # Battles still running are draws
+    life_lost += int(np.sum(player.life - player_life))
+    return wins, losses, turns_to_kill, life_lost
+
+def simulate_battles(player:BattleStats, enemy:BattleStats, helpers=(), battles=SIMULATED_BATTLE_COUNT, seed=None, max_rolls=MAX_SIMULATED_ROLLS):
+    """
+    Simulate many battles between a player and an enemy with vectorized dice.
+
+    Args:
+        player (BattleStats): The stats of the player.
+        enemy (BattleStats): The stats of the enemy.
+        helpers (tuple, optional): The names of the helpers activated when the battle starts, in activation order.
+        battles (int, optional): The number of battles to simulate.
+        seed (optional): The seed of the dice, as taken by numpy.random.default_rng. None gives a new seed on each call.
+        max_rolls (int, optional): The number of dice rolls after which a battle is a draw.
+
+    Returns:
+        dict: The results:
+            "battles": The number of battles.
+            "win_rate", "lose_rate", "draw_rate": The share of the battles won, lost and stopped as draws.
+            "turns_to_kill": The share of the won battles won after each number of player attacks (numpy.ndarray).
+            "mean_turns_to_kill": The mean number of player attacks of the won battles.
+            "expected_life_lost": The mean life lost by the player in the battle, down to 0 life and before the rewards of a win.
+    """
+    rng = np.random.default_rng(seed)
+    wins = losses = life_lost = 0
+    turns_to_kill = np.zeros(max_rolls // 2 + 2, dtype=np.int64)
+    for first in range(0, battles, SIMULATED_BATTLE_BATCH):
+        count = min(SIMULATED_BATTLE_BATCH, battles - first)
+        batch_wins, batch_losses, batch_turns, batch_life_lost = simulate_battle_batch(player, enemy, helpers, count, rng, max_rolls)
+        wins += batch_wins
+        losses += batch_losses
+        turns_to_kill += batch_turns
+        life_lost += batch_life_lost
+    turns_to_kill = np.trim_zeros(turns_to_kill, "b")
+    return {
+        "battles": battles,
+        "win_rate": wins / battles,
+        "lose_rate": losses / battles,
+        "draw_rate": (battles - wins - losses) / battles,
+        "turns_to_kill": turns_to_kill / wins if wins else turns_to_kill.astype(float),
+        "mean_turns_to_kill": float(np.dot(np.arange(turns_to_kill.size), turns_to_kill)) / wins if wins else 0.0,
+        "expected_life_lost": life_lost / battles,
+    }
+
+def simulate_sweep_task(task):
+    """
+    Simulate the battles of one sweep entry, in a worker process.
+
+    Args:
+        task (tuple): The (player, enemy, helpers, battles, seed) of the entry.
+
+    Returns:
+        dict: The results of simulate_battles.
+    """
+    player, enemy, helpers, battles, seed = task
+    return simulate_battles(player, enemy, helpers, battles, seed)
+
+def sweep_roster(player:BattleStats, levels=(3, 4, 5), helper_sets=((),), battles=SIMULATED_BATTLE_COUNT, seed=None, processes=None):
+    """
+    Simulate the battles of a player against every possible enemy of some levels, over a process pool.
+
+    Every entry gets its own dice stream spawned from the seed, so a sweep with a seed gives the
+    same results whatever the number of processes.
+
+    Args:
+        player (BattleStats): The stats of the player.
+        levels (tuple, optional): The levels to sweep, as numbers of blocks in each row and column of the maze.
+        helper_sets (tuple, optional): The helper activations to try against every enemy.
+        battles (int, optional): The number of battles of every entry.
+        seed (int, optional): The seed of the sweep.
+        processes (int, optional): The number of worker processes, the number of CPUs if None.
+
+    Returns:
+        list: One dict per (level, enemy, helpers) entry, with the "level", "enemy" (BattleStats) and
+        "helpers" of the entry added to the results of simulate_battles.
+    """
+    entries = [(level, enemy, tuple(helpers)) for level in levels for enemy in roster_stats(level) for helpers in helper_sets]
+    seeds = np.random.SeedSequence(seed).spawn(len(entries))
+    tasks = [(player, enemy, helpers, battles, entry_seed) for (level, enemy, helpers), entry_seed in zip(entries, seeds)]
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        results = list(pool.map(simulate_sweep_task, tasks))
+    for (level, enemy, helpers), result in zip(entries, results):
+        result.update(level=level, enemy=enemy, helpers=helpers)
+    return results
+
+if __name__ == "__main__":
+    # Sweep the rosters with the stats of a new player; every enemy stat block of a level is equally likely
+    player = player_stats(Player((0, 0, 0, 0), Maze(0, 0, 1, LARGE_MAZE_CELL_SIZE, 10)))
+    helper_sets = [()] + [(name,) for name in HELPER_LIST]
+    results = sweep_roster(player, helper_sets=helper_sets, battles=SIMULATED_BATTLE_COUNT // 10, seed=my_seed)
+    for level in (3, 4, 5):
+        for helpers in helper_sets:
+            entries = [result for result in results if result["level"] == level and result["helpers"] == helpers]
+            win_rate = np.mean([result["win_rate"] for result in entries])
+            life_lost = np.mean([result["expected_life_lost"] for result in entries])
+            turns = np.mean([result["mean_turns_to_kill"] for result in entries])
+            print(f"level {level} helpers {', '.join(helpers) or '-':8} win rate {win_rate:.3f} "
+                  f"attacks to kill {turns:.1f} life lost {life_lost:.1f}")
@@ -0,0 +1,292 @@
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import variables
+from variables import *
+
+# The maze modules copy CELL_IN_BLOCK when they are imported, so every CELL_IN_BLOCK is benchmarked in a
+# fresh process that sets it before importing them (see set_cell_in_block). This module only imports them
+# inside the functions running in those processes.
+
+def set_cell_in_block(cell_in_block):
+    """
+    Set CELL_IN_BLOCK in a benchmark process, before the maze modules are imported.
+
+    Args:
+        cell_in_block (int): The number of cells in each row and column of a block.
+    """
+    variables.CELL_IN_BLOCK = cell_in_block
+
+def measure(operation, setup, calls=1, repeat=BENCHMARK_REPEAT, time_budget=BENCHMARK_TIME_BUDGET):
+    """
+    Measure the wall time and the memory of an operation.
+
+    The time is the best of repeat timed runs, fewer once the runs took time_budget seconds,
+    so the largest mazes are not generated over and over. The memory is measured in one more run under
+    tracemalloc, which slows it down: the peak of the memory allocated during the run, and the
+    number of memory blocks allocated by the run and still allocated after it (for example the
+    cells of a new maze).
+
+    Args:
+        operation (callable): Called with the value returned by setup.
+        setup (callable): Called before every run, not measured.
+        calls (int, optional): The number of calls the operation makes to the function benchmarked.
+        repeat (int, optional): The largest number of timed runs.
+        time_budget (float, optional): No more timed runs start after this many seconds of runs.
+
+    Returns:
+        dict: The "calls", "seconds", "seconds_per_call", "peak_bytes" and "allocated_blocks" of the operation.
+    """
+    times = []
+    while len(times) < repeat and sum(times) < time_budget:
+        value = setup()
+        start = time.perf_counter()
+        operation(value)
+        times.append(time.perf_counter() - start)
+    value = setup()
+    tracemalloc.start()
+    result = operation(value)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    allocated_blocks = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+    del result
+    seconds = min(times)
+    return {"calls": calls, "seconds": seconds, "seconds_per_call": seconds / calls,
+            "peak_bytes": peak_bytes, "allocated_blocks": allocated_blocks}
+
+def farthest_pair(maze):
+    """
+    Find two cells far apart and connected under the rules of the solvers.
+
+    The solvers never wrap around the maze, unlike generate_maze, so the ends of the longest path of the
+    generation are usually not connected. The two cells are taken in the largest region of cells connected
+    without wrapping, as the ends of a double sweep: the farthest cell from any cell of the region, then the
+    farthest cell from that one. The regions are trees, so they are the farthest apart in the region.
+
+    Args:
+        maze: The Maze object.
+
+    Returns:
+        tuple: The two positions (block_row, block_col, cell_row, cell_col).
+    """
+    import solver
+    passable = solver.passable_masks(maze)
+    size = maze.block_in_maze * variables.CELL_IN_BLOCK
+
+    def sweep(index, seen):
+        # Visit the cells reachable from index in breadth-first order, the farthest last
+        seen[index] = 1
+        order = [index]
+        for index in order:
+            for neighbor in solver.neighbors(passable, size, index):
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    order.append(neighbor)
+        return order
+
+    seen = bytearray(size * size)
+    region = []
+    for index in range(size * size):
+        if not seen[index]:
+            order = sweep(index, seen)
+            if len(order) > len(region):
+                region = order
+    start = sweep(region[0], bytearray(size * size))[-1]
+    end = sweep(start, bytearray(size * size))[-1]
+    return maze.grid_pos(start), maze.grid_pos(end)
+
+def benchmark_maze(block_in_maze, seed=my_seed, repeat=BENCHMARK_REPEAT):
+    """
+    Benchmark the maze operations on a maze of the given size.
+
+    Args:
+        block_in_maze (int): The number of blocks in each row and column of the maze.
+        seed (int, optional): The seed of the maze and of the random positions and blocks used.
+        repeat (int, optional): The number of timed runs of every operation.
+
+    Returns:
+        list: One dict per operation, with its "operation" name added to the results of measure.
+    """
+    from maze import Maze
+    import solver
+    import export
+    cell_in_block = variables.CELL_IN_BLOCK
+    size = block_in_maze * cell_in_block
+
+    def new_maze():
+        return Maze(0, 0, block_in_maze, BENCHMARK_EXPORT_CELL_SIZE, 1)
+
+    # The solvers go between two connected cells far apart (see farthest_pair), and must find a path.
+    # Moving blocks takes the same time whatever their cells, so randomize and exchange_block shuffle
+    # an empty maze instead of another generated one.
+    maze = new_maze()
+    path = maze.generate_maze(seed)
+    shuffled_maze = new_maze()
+    start, end = farthest_pair(maze)
+    for algorithm in solver.SOLVERS:
+        if not solver.solve(maze, start, end, algorithm):
+            raise RuntimeError(f"solve_{algorithm} found no path between {start} and {end}")
+    rng = random.Random(seed)
+    block_pairs = [((rng.randrange(block_in_maze), rng.randrange(block_in_maze)), (rng.randrange(block_in_maze), rng.randrange(block_in_maze)))
+                   for _ in range(BENCHMARK_CALLS)]
+    moves = [((rng.randrange(block_in_maze), rng.randrange(block_in_maze), rng.randrange(cell_in_block), rng.randrange(cell_in_block)), rng.choice(DIRECTION))
+             for _ in range(BENCHMARK_CALLS)]
+
+    def exchange_blocks(maze):
+        for block1_idx, block2_idx in block_pairs:
+            maze.exchange_block(block1_idx, block2_idx)
+
+    def wrap_moves(maze):
+        for pos, direction in moves:
+            maze.wrap_around(pos, direction)
+
+    def export_png(maze):
+        with tempfile.TemporaryDirectory() as folder:
+            export.save_maze_png(maze, os.path.join(folder, "maze.png"), path)
+
+    operations = [("maze_init", lambda value: new_maze(), lambda: None, 1),
+                  ("generate_maze", lambda maze: maze.generate_maze(seed), new_maze, 1),
+                  ("randomize", lambda maze: maze.randomize(seed), lambda: shuffled_maze, 1),
+                  ("exchange_block", exchange_blocks, lambda: shuffled_maze, BENCHMARK_CALLS),
+                  ("wrap_around", wrap_moves, lambda: maze, BENCHMARK_CALLS)]
+    for algorithm in solver.SOLVERS:
+        operations.append((f"solve_{algorithm}", lambda maze, algorithm=algorithm: solver.solve(maze, start, end, algorithm), lambda: maze, 1))
+    block_number = maze.block[end[0]][end[1]].block_num
+    operations += [("distance_field", lambda maze: solver.DistanceField(maze, block_number, end[2], end[3]), lambda: maze, 1),
+                   ("export_png", export_png, lambda: maze, 1)]
+
+    results = []
+    for name, operation, setup, calls in operations:
+        result = {"cell_in_block": cell_in_block, "block_in_maze": block_in_maze, "cells": size * size, "operation": name}
+        result.update(measure(operation, setup, calls, repeat))
+        result["peak_bytes_per_cell"] = result["peak_bytes"] / result["cells"]
+        result["allocated_blocks_per_cell"] = result["allocated_blocks"] / result["cells"]
+        results.append(result)
+    return results
+
+def benchmark_cell_in_block(block_in_maze_list, seed=my_seed, repeat=BENCHMARK_REPEAT, max_cells=BENCHMARK_MAX_CELLS, verbose=False):
+    """
+    Benchmark the maze operations on mazes of several sizes, in a process whose CELL_IN_BLOCK is already set.
+
+    Args:
+        block_in_maze_list (list): The numbers of blocks in each row and column of the mazes.
+        seed (int, optional): The seed of the mazes.
+        repeat (int, optional): The number of timed runs of every operation.
+        max_cells (int, optional): Mazes with more cells are skipped.
+        verbose (bool, optional): Whether to print every result once measured.
+
+    Returns:
+        list: The results of benchmark_maze for every size.
+    """
+    results = []
+    for block_in_maze in block_in_maze_list:
+        if (block_in_maze * variables.CELL_IN_BLOCK) ** 2 <= max_cells:
+            maze_results = benchmark_maze(block_in_maze, seed, repeat)
+            if verbose:
+                for result in maze_results:
+                    print(format_result(result), flush=True)
+            results += maze_results
+    return results
+
+def run_benchmarks(block_in_maze_list=BENCHMARK_BLOCK_IN_MAZE_LIST, cell_in_block_list=BENCHMARK_CELL_IN_BLOCK_LIST,
+                   seed=my_seed, repeat=BENCHMARK_REPEAT, max_cells=BENCHMARK_MAX_CELLS, verbose=False):
+    """
+    Run the benchmark suite, one fresh process per CELL_IN_BLOCK, one after the other so the timings do not compete.
+
+    Args:
+        block_in_maze_list (list, optional): The numbers of blocks in each row and column of the mazes.
+        cell_in_block_list (list, optional): The numbers of cells in each row and column of a block.
+        seed (int, optional): The seed of the mazes.
+        repeat (int, optional): The number of timed runs of every operation.
+        max_cells (int, optional): Mazes with more cells are skipped.
+        verbose (bool, optional): Whether to print every result once measured.
+
+    Returns:
+        dict: The "python", "platform", "seed" and "repeat" of the run, and its "results".
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for cell_in_block in cell_in_block_list:
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=context, initializer=set_cell_in_block,
+                                                    initargs=(cell_in_block,)) as pool:
+            results += pool.submit(benchmark_cell_in_block, block_in_maze_list, seed, repeat, max_cells, verbose).result()
+    return {"python": platform.python_version(), "platform": platform.platform(), "seed": seed, "repeat": repeat,
+            "results": results}
+
+def compare_results(report, baseline, tolerance=BENCHMARK_TOLERANCE, min_seconds=BENCHMARK_MIN_SECONDS):
+    """
+    Compare a benchmark run with a saved baseline.
+
+    An operation regresses when its time or its peak memory grows by more than the tolerance.
+    Differences of time below min_seconds are ignored, as they are mostly noise.
+
+    Args:
+        report (dict): The run, as returned by run_benchmarks.
+        baseline (dict): The baseline run, in the same format.
+        tolerance (float, optional): The allowed relative growth, 0.25 for 25%.
+        min_seconds (float, optional): The smallest difference of time reported.
+
+    Returns:
+        list: One (key, metric, baseline value, value) tuple per regression, where key is
+        (cell_in_block, block_in_maze, operation). Operations missing from the baseline are not compared.
+    """
+    baseline_results = {(result["cell_in_block"], result["block_in_maze"], result["operation"]): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        key = (result["cell_in_block"], result["block_in_maze"], result["operation"])
+        if key not in baseline_results:
+            continue
+        old = baseline_results[key]
+        if result["seconds"] > old["seconds"] * (1 + tolerance) and result["seconds"] - old["seconds"] > min_seconds:
+            regressions.append((key, "seconds", old["seconds"], result["seconds"]))
+        if result["peak_bytes"] > old["peak_bytes"] * (1 + tolerance):
+            regressions.append((key, "peak_bytes", old["peak_bytes"], result["peak_bytes"]))
+    return regressions
+
+def format_result(result):
+    """
+    Format one benchmark result as a line of the summary.
+
+    Args:
+        result (dict): One result, as returned by benchmark_maze.
+
+    Returns:
+        str: The formatted result.
+    """
+    return (f"cell_in_block {result['cell_in_block']:3} block_in_maze {result['block_in_maze']:4} {result['operation']:20} "
+            f"{result['seconds_per_call'] * 1000:12.4f} ms/call  peak {result['peak_bytes_per_cell']:10.1f} B/cell  "
+            f"blocks {result['allocated_blocks_per_cell']:8.3f} /cell")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark maze generation, solving and export.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_BLOCK_IN_MAZE_LIST, help="the block_in_maze values to run")
+    parser.add_argument("--cell-sizes", type=int, nargs="+", default=BENCHMARK_CELL_IN_BLOCK_LIST, help="the CELL_IN_BLOCK values to run")
+    parser.add_argument("--max-cells", type=int, default=BENCHMARK_MAX_CELLS, help="skip mazes with more cells")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT, help="timed runs of every operation")
+    parser.add_argument("--seed", type=int, default=my_seed, help="the seed of the mazes")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE, help="allowed relative growth against the baseline")
+    args = parser.parse_args()
+
+    # The largest mazes take minutes, mostly in the runs under tracemalloc, so results are printed as they come
+    report = run_benchmarks(args.sizes, args.cell_sizes, args.seed, args.repeat, args.max_cells, verbose=True)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare_results(report, baseline, args.tolerance)
+        for (cell_in_block, block_in_maze, operation), metric, old, new in regressions:
+            print(f"REGRESSION cell_in_block {cell_in_block} block_in_maze {block_in_maze} {operation} {metric}: {old:.6g} -> {new:.6g}")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        sys.exit(1 if regressions else 0)
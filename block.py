@@ -1,29 +1,47 @@
 import pygame
 # import random
-from cell import Cell
+from cell import Cell, draw_walls
 from variables import *
 
 class Block(Cell):
-    """Class representing a block of cells in the grid."""
-    
-    def __init__(self, x, y, block_num, cell_size, line_width):
+    """Class representing a block of cells in the grid.
+
+    A block only holds topology (its number and its slice of the connect grid);
+    its position on screen is supplied by the maze view that draws it.
+    """
+
+    def __init__(self, block_num, connect_grid=None, offset=0):
         """
         Initialize a block.
 
         Args:
+            block_num (int): The number of the block.
+            connect_grid (bytearray, optional): The grid holding the connect masks of the block's cells.
+                A private grid is created if omitted.
+            offset (int, optional): The index of the block's first cell in connect_grid.
+        """
+        self.block_num = block_num
+        # The cells of the block are stored row by row in CELL_IN_BLOCK * CELL_IN_BLOCK bytes of the grid
+        self.connect_grid = connect_grid if connect_grid is not None else bytearray(CELL_IN_BLOCK * CELL_IN_BLOCK)
+        self.offset = offset
+
+    def get_cell(self, row, col, x, y, cell_size, line_width):
+        """
+        Get a Cell view over one cell of the block.
+
+        Args:
+            row (int): The row of the cell in the block.
+            col (int): The column of the cell in the block.
             x (int): The x-coordinate of the top-left corner of the block.
             y (int): The y-coordinate of the top-left corner of the block.
-            block_num (int): The number of the block.
             cell_size (int): The size of each cell in the block.
-            line_width (int): The width of the lines to draw for the block.
+            line_width (int): The width of the lines to draw for the cell.
+
+        Returns:
+            Cell: The cell view.
         """
-        self.x = x
-        self.y = y
-        self.block_num = block_num
-        self.cell_size = cell_size
-        # Create a 2D array to hold cells in the block
-        self.cell = [[Cell(x+j*self.cell_size, y+i*self.cell_size, cell_size, line_width) for j in range(CELL_IN_BLOCK)] for i in range(CELL_IN_BLOCK)]
-      
+        return Cell(x+col*cell_size, y+row*cell_size, cell_size, line_width, self.connect_grid, self.offset+row*CELL_IN_BLOCK+col)
+
     def __str__(self):
         """
         Return a string representation of the block.
@@ -34,9 +52,9 @@ class Block(Cell):
         block_str = ""
         for i in range(CELL_IN_BLOCK):
             for j in range(CELL_IN_BLOCK):
-                block_str += str(self.cell[i][j]) + " " + str(self.block_num) + '\n'  
+                block_str += str(self.get_cell(i, j, 0, 0, 1, 1)) + " " + str(self.block_num) + '\n'
         return block_str
-    
+
     def show_block_number(self):
         """
         Get the block number as a string.
@@ -45,50 +63,25 @@ class Block(Cell):
             str: The block number.
         """
         return str(self.block_num)
-        
-    def draw(self, window, color):
+
+    def draw(self, window, color, x, y, cell_size, line_width, rows=range(CELL_IN_BLOCK), cols=range(CELL_IN_BLOCK)):
         """
         Draw the block and its cells on the window.
 
         Args:
             window: The Pygame window surface to draw on.
             color: The color of the lines to draw.
+            x (int): The x-coordinate of the top-left corner of the block.
+            y (int): The y-coordinate of the top-left corner of the block.
+            cell_size (int): The size of each cell in the block.
+            line_width (int): The width of the lines to draw.
+            rows (range, optional): The rows of cells to draw, all of them by default.
+            cols (range, optional): The columns of cells to draw, all of them by default.
         """
         # Draw the block outline
-        pygame.draw.rect(window, (128,128,128), (self.x, self.y, self.cell_size * CELL_IN_BLOCK, self.cell_size * CELL_IN_BLOCK), width=1)
+        pygame.draw.rect(window, (128,128,128), (x, y, cell_size * CELL_IN_BLOCK, cell_size * CELL_IN_BLOCK), width=1)
         # Draw the cells in the block
-        for i in range(CELL_IN_BLOCK):
-            for j in range(CELL_IN_BLOCK):
-                self.cell[i][j].draw(window, color)
-        
-    def move(self, dx, dy):
-        """
-        Move the block and its cells by the specified amount.
-
-        Args:
-            dx (int): The amount to move in the x-direction.
-            dy (int): The amount to move in the y-direction.
-        """
-        self.x += dx
-        self.y += dy
-        # Move each cell in the block
-        for row in self.cell:
-            for cell in row:
-                cell.x += dx
-                cell.y += dy
-                
-    def reset_pos(self, x, y):
-        '''
-        Resets the positions of the block and its cells to the specified position.
-
-        Args:
-            x (int): The x-coordinate of the top-left corner of the block.
-            y (int): The y-coordinate of the top-left corner of the block.
-        '''
-        self.x = x
-        self.y = y
-        # Reset the position of each cell in the block
-        for row in range(CELL_IN_BLOCK):
-            for col in range(CELL_IN_BLOCK):
-                self.cell[row][col].x = x + col * self.cell_size
-                self.cell[row][col].y = y + row * self.cell_size
+        for i in rows:
+            for j in cols:
+                draw_walls(window, color, x+j*cell_size, y+i*cell_size, cell_size, line_width,\
+                           self.connect_grid[self.offset+i*CELL_IN_BLOCK+j])
@@ -1,10 +1,32 @@
 import pygame
-from variables import LEFT, RIGHT, UP, DOWN
+from variables import LEFT, RIGHT, UP, DOWN, DIRECTION, DIRECTION_BIT
+
+def draw_walls(window, color, x, y, cell_size, line_width, mask):
+    """
+    Draw the walls of a single cell from its connect mask.
+
+    Args:
+        window: The Pygame window surface to draw on.
+        color: The color of the lines to draw.
+        x (int): The x-coordinate of the top-left corner of the cell.
+        y (int): The y-coordinate of the top-left corner of the cell.
+        cell_size (int): The size of the cell.
+        line_width (int): The width of the lines to draw.
+        mask (int): The connect mask of the cell (see DIRECTION_BIT).
+    """
+    if not mask & DIRECTION_BIT[LEFT]:
+        pygame.draw.line(window, color, (x, y), (x, y + 1 * cell_size), line_width)
+    if not mask & DIRECTION_BIT[UP]:
+        pygame.draw.line(window, color, (x, y), (x + 1 * cell_size, y), line_width)
+    if not mask & DIRECTION_BIT[RIGHT]:
+        pygame.draw.line(window, color, (x + 1 * cell_size, y), (x + 1 * cell_size, y + 1 * cell_size), line_width)
+    if not mask & DIRECTION_BIT[DOWN]:
+        pygame.draw.line(window, color, (x , y + 1 * cell_size), (x + 1 * cell_size, y + 1 * cell_size), line_width)
 
 class Cell:
-    """Class representing a cell in the grid."""
-    
-    def __init__(self, x, y, cell_size, line_width) -> None:
+    """Class representing a cell in the grid, as a view over one byte of a connect grid."""
+
+    def __init__(self, x, y, cell_size, line_width, connect_grid=None, index=0) -> None:
         """
         Initialize a cell.
 
@@ -13,13 +35,32 @@ class Cell:
             y (int): The y-coordinate of the top-left corner of the cell.
             cell_size (int): The size of the cell.
             line_width (int): The width of the lines to draw for the cell.
+            connect_grid (bytearray, optional): The grid holding the connect mask of the cell.
+                A private one-cell grid is created if omitted.
+            index (int, optional): The index of the cell's mask in connect_grid.
         """
         self.x = x
         self.y = y
         self.cell_size = cell_size
         self.line_width = line_width
-        self.connect = []
-        
+        self.connect_grid = connect_grid if connect_grid is not None else bytearray(1)
+        self.index = index
+
+    @property
+    def connect(self):
+        """
+        list: The directions in which the cell is open, in DIRECTION order.
+        """
+        mask = self.connect_grid[self.index]
+        return [direction for direction in DIRECTION if mask & DIRECTION_BIT[direction]]
+
+    @connect.setter
+    def connect(self, directions):
+        mask = 0
+        for direction in directions:
+            mask |= DIRECTION_BIT[direction]
+        self.connect_grid[self.index] = mask
+
     def __str__(self):
         """
         Return a string representation of the cell.
@@ -28,7 +69,7 @@ class Cell:
             str: String representation of the cell.
         """
         return f'x:{self.x} y:{self.y} connect: {self.connect}'
-    
+
     def draw(self, window, color):
         """
         Draw the maze wall on the window.
@@ -37,11 +78,4 @@ class Cell:
             window: The Pygame window surface to draw on.
             color: The color of the lines to draw.
         """
-        if LEFT not in self.connect:
-            pygame.draw.line(window, color, (self.x, self.y), (self.x, self.y + 1 * self.cell_size), self.line_width)
-        if UP not in self.connect:
-            pygame.draw.line(window, color, (self.x, self.y), (self.x + 1 * self.cell_size, self.y), self.line_width)
-        if RIGHT not in self.connect:
-            pygame.draw.line(window, color, (self.x + 1 * self.cell_size, self.y), (self.x + 1 * self.cell_size, self.y + 1 * self.cell_size), self.line_width)
-        if DOWN not in self.connect:
-            pygame.draw.line(window, color, (self.x , self.y + 1 * self.cell_size), (self.x + 1 * self.cell_size, self.y + 1 * self.cell_size), self.line_width)                         
+        draw_walls(window, color, self.x, self.y, self.cell_size, self.line_width, self.connect_grid[self.index])
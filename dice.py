@@ -1,3 +1,4 @@
+import random
 from variables import *
 class Dice:
     def __init__(self, lower_bound, upper_bound):
@@ -11,13 +12,16 @@ class Dice:
         self.lower_bound = lower_bound
         self.upper_bound = upper_bound
     
-    def roll_dice(self):
+    def roll_dice(self, rng=None):
         """
         Roll the dice and return the result.
 
+        Args:
+            rng (random.Random, optional): The generator to roll with, the global random module if None.
+
         Returns:
             int: A random number between the lower and upper bounds.
         """
-        global my_seed
-        my_seed += 1
-        return random.choice(range(self.lower_bound, self.upper_bound+1))
\ No newline at end of file
+        if rng is None:
+            rng = random
+        return rng.choice(range(self.lower_bound, self.upper_bound+1))
\ No newline at end of file
@@ -0,0 +1,99 @@
+import pygame
+from variables import *
+
+class DirtyRects:
+    """Class keeping the areas of the window drawn since the last display update.
+
+    Drawing code marks the rects it draws on, usually with the rect returned by
+    blit, fill or pygame.draw, and update only pushes those areas to the screen.
+    Overlapping rects are merged as they are marked, so the HUD cells of one panel
+    end up as a single rect. Once an area covers the whole window the display is
+    updated at once, like pygame.display.update() without arguments.
+    """
+
+    def __init__(self):
+        """
+        Initialize a dirty rect tracker with nothing to update.
+        """
+        self.rects = []
+        self.full = False
+        self.updates = 0
+        self.full_updates = 0
+        self.rects_pushed = 0
+
+    def mark(self, rect):
+        """
+        Mark an area of the window as drawn.
+
+        Args:
+            rect: The area drawn on, as a pygame.Rect or an (x, y, width, height) tuple. None is ignored.
+        """
+        if rect is None or self.full:
+            return
+        rect = pygame.Rect(rect)
+        screen = pygame.display.get_surface()
+        if screen is not None:
+            rect = rect.clip(screen.get_rect())
+            if rect == screen.get_rect():
+                self.mark_screen()
+                return
+        if rect.width == 0 or rect.height == 0:
+            return
+        # Merge with the rects it overlaps until it overlaps none of them
+        index = rect.collidelist(self.rects)
+        while index != -1:
+            rect.union_ip(self.rects.pop(index))
+            index = rect.collidelist(self.rects)
+        self.rects.append(rect)
+
+    def mark_screen(self):
+        """
+        Mark the whole window as drawn.
+        """
+        self.full = True
+        self.rects.clear()
+
+    def update(self):
+        """
+        Push the areas drawn since the last update to the screen and forget them.
+        """
+        self.updates += 1
+        if self.full:
+            self.full_updates += 1
+            pygame.display.update()
+        elif self.rects:
+            self.rects_pushed += len(self.rects)
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full = False
+
+    def __str__(self):
+        """
+        Return a string representation of the update statistics.
+
+        Returns:
+            str: String representation of the tracker.
+        """
+        return f'updates:{self.updates} full:{self.full_updates} rects:{self.rects_pushed}'
+
+# The dirty rects of the game window
+DIRTY_RECTS = DirtyRects()
+
+def mark_dirty(rect):
+    """
+    Mark an area of the game window as drawn (see DirtyRects.mark).
+
+    Args:
+        rect: The area drawn on, for example the rect returned by blit.
+
+    Returns:
+        The rect, so a draw call can be wrapped: mark_dirty(window.blit(image, pos)).
+    """
+    DIRTY_RECTS.mark(rect)
+    return rect
+
+def update_display():
+    """
+    Push the areas of the game window drawn since the last update to the screen.
+    """
+    DIRTY_RECTS.update()
@@ -0,0 +1,770 @@
+import random
+import concurrent.futures
+from variables import *
+from maze import Maze
+from player import Player
+from Item import Item, Coin, Sword, Meat, Coke, Shield, FinishFlag
+from dice import Dice
+from enemy import Enemy
+from helper import Helper
+from spatial_index import SpatialIndex
+from rng import RandomStreams
+import skill
+import solver
+
+# The game rules, without any drawing or sound: game_play.py renders a GameState and turns input into actions.
+
+def check_up_validate(maze: Maze, player: Player):
+    """
+    Check if moving up from the player's current position is a valid move within the maze.
+
+    Args:
+        maze (Maze): The Maze object representing the maze.
+        player (Player): The Player object representing the player.
+
+    Returns:
+        bool: True if moving up is valid, False otherwise.
+    """
+    block_row, block_col = maze.get_block_number_index(player.block_number)
+    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
+    if player.cell_row == 0 and block_row == 0:
+        return False
+    if player.cell_row > 0:
+        up_pos = (block_row, block_col, player.cell_row - 1, player.cell_col)
+    elif player.cell_row == 0 and block_row > 0:
+        up_pos = (block_row - 1, block_col, CELL_IN_BLOCK - 1, player.cell_col)
+    return maze.is_connected(curr_pos, UP) and maze.is_connected(up_pos, DOWN)
+
+def check_down_validate(maze: Maze, player: Player):
+    """
+    Check if moving down from the player's current position is a valid move within the maze.
+
+    Args:
+        maze (Maze): The Maze object representing the maze.
+        player (Player): The Player object representing the player.
+
+    Returns:
+        bool: True if moving down is valid, False otherwise.
+    """
+    block_row, block_col = maze.get_block_number_index(player.block_number)
+    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
+    if player.cell_row == CELL_IN_BLOCK - 1 and block_row == maze.block_in_maze - 1:
+        return False
+    if player.cell_row < CELL_IN_BLOCK - 1:
+        down_pos = (block_row, block_col, player.cell_row + 1, player.cell_col)
+    elif player.cell_row == CELL_IN_BLOCK - 1 and block_row < maze.block_in_maze - 1:
+        down_pos = (block_row + 1, block_col, 0, player.cell_col)
+    return maze.is_connected(curr_pos, DOWN) and maze.is_connected(down_pos, UP)
+
+def check_left_validate(maze: Maze, player: Player):
+    """
+    Check if moving left from the player's current position is a valid move within the maze.
+
+    Args:
+        maze (Maze): The Maze object representing the maze.
+        player (Player): The Player object representing the player.
+
+    Returns:
+        bool: True if moving left is valid, False otherwise.
+    """
+    block_row, block_col = maze.get_block_number_index(player.block_number)
+    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
+    if player.cell_col == 0 and block_col == 0:
+        return False
+    if player.cell_col > 0:
+        left_pos = (block_row, block_col, player.cell_row, player.cell_col - 1)
+    elif player.cell_col == 0 and block_col > 0:
+        left_pos = (block_row, block_col - 1, player.cell_row, CELL_IN_BLOCK - 1)
+    return maze.is_connected(curr_pos, LEFT) and maze.is_connected(left_pos, RIGHT)
+
+def check_right_validate(maze: Maze, player: Player):
+    """
+    Check if moving right from the player's current position is a valid move within the maze.
+
+    Args:
+        maze (Maze): The Maze object representing the maze.
+        player (Player): The Player object representing the player.
+
+    Returns:
+        bool: True if moving right is valid, False otherwise.
+    """
+    block_row, block_col = maze.get_block_number_index(player.block_number)
+    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
+    if player.cell_col == CELL_IN_BLOCK - 1 and block_col == maze.block_in_maze - 1:
+        return False
+    if player.cell_col < CELL_IN_BLOCK - 1:
+        right_pos = (block_row, block_col, player.cell_row, player.cell_col + 1)
+    elif player.cell_col == CELL_IN_BLOCK - 1 and block_col < maze.block_in_maze - 1:
+        right_pos = (block_row, block_col + 1, player.cell_row, 0)
+    return maze.is_connected(curr_pos, RIGHT) and maze.is_connected(right_pos, LEFT)
+
+def create_easy_enemy(player:Player, block_in_maze, pos_set:set, rng=random):
+    """
+    Create easy enemies.
+
+    Args:
+        player: The player object.
+        block_in_maze: The number of blocks in each row and column of the maze.
+        pos_set: The set of positions.
+        rng: The generator of the enemy stats and positions, the global random module by default.
+
+    Returns:
+        dict: Dictionary of easy enemies.
+    """
+    enemy_dict = {}
+    for name in EASY_ENEMY_LIST:
+        image_path = f"assets/image/enemy/{name}/{name}.png"
+        attack = EASY_ENEMY_ATTACK + rng.choice([-1,0,1])
+        defense = EASY_ENEMY_DEFENSE + rng.choice([-1,0,1])
+        life = EASY_ENEMY_LIFE + rng.choice([-1,0,1]) * ENEMY_LIFE_VARIATION
+        attack_dice = Dice(*EASY_ENEMY_DICE)
+        defense_dice = Dice(*EASY_ENEMY_DICE)
+        pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        
+        # Generate random position for the enemy ensuring uniqueness
+        while pos in pos_set:
+            pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        pos_set.add(pos)
+        block_number = pos[0] * block_in_maze + pos[1]
+        key = (block_number, pos[2], pos[3])
+        enemy = Enemy(name, life, attack, defense, attack_dice, defense_dice, pos, block_in_maze, image_path, key)
+        enemy_dict[key] = enemy
+        
+    return enemy_dict
+
+def create_medium_enemy(player:Player, block_in_maze, pos_set:set, rng=random):
+    """
+    Create medium enemies.
+
+    Args:
+        player: The player object.
+        block_in_maze: The number of blocks in each row and column of the maze.
+        pos_set: The set of positions.
+        rng: The generator of the enemy stats and positions, the global random module by default.
+
+    Returns:
+        dict: Dictionary of medium enemies.
+    """
+    enemy_dict = {}
+    for name in MEDIUM_ENEMY_LIST:
+        image_path = f"assets/image/enemy/{name}/{name}.png"
+        attack = MEDIUM_ENEMY_ATTACK + rng.choice([-1,0,1])
+        defense = MEDIUM_ENEMY_DEFENSE + rng.choice([-1,0,1])
+        life = MEDIUM_ENEMY_LIFE + rng.choice([-1,0,1]) * ENEMY_LIFE_VARIATION
+        attack_dice = Dice(*MEDIUM_ENEMY_DICE)
+        defense_dice = Dice(*MEDIUM_ENEMY_DICE)
+        
+        # Generate random position for the enemy ensuring uniqueness
+        pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        while pos in pos_set:
+            pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        block_number = pos[0] * block_in_maze + pos[1]
+        key = (block_number, pos[2], pos[3])
+        enemy = Enemy(name, life, attack, defense, attack_dice, defense_dice, pos, block_in_maze, image_path, key)
+        enemy_dict[key] = enemy
+    return enemy_dict
+
+def create_hard_enemy(player:Player, block_in_maze, pos_set:set, rng=random):
+    """
+    Create hard enemies.
+
+    Args:
+        player: The player object.
+        block_in_maze: The number of blocks in each row and column of the maze.
+        pos_set: The set of positions.
+        rng: The generator of the enemy stats and positions, the global random module by default.
+
+    Returns:
+        dict: Dictionary of hard enemies.
+    """
+    enemy_dict = {}
+    for name in HARD_ENEMY_LIST:
+        image_path = f"assets/image/enemy/{name}/{name}.png"
+        attack = HARD_ENEMY_ATTACK + rng.choice([-1,0,1])
+        defense = HARD_ENEMY_DEFENSE + rng.choice([-1,0,1])
+        life = HARD_ENEMY_LIFE + rng.choice([-1,0,1]) * ENEMY_LIFE_VARIATION
+        attack_dice = Dice(*HARD_ENEMY_DICE)
+        defense_dice = Dice(*HARD_ENEMY_DICE)
+        
+        # Generate random position for the enemy ensuring uniqueness
+        pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        while pos in pos_set:
+            pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        block_number = pos[0] * block_in_maze + pos[1]
+        key = (block_number, pos[2], pos[3])
+        enemy = Enemy(name, life, attack, defense, attack_dice, defense_dice, pos, block_in_maze, image_path, key)
+        enemy_dict[key] = enemy
+    return enemy_dict
+
+def generate_random_position(block_in_maze, pos_set:set, rng=random):
+    """
+    Generate a random position for game elements in the maze.
+
+    Args:
+        block_in_maze (int): The number of blocks in the maze.
+        pos_set (set): A set containing existing positions in the maze.
+        rng (random.Random, optional): The generator of the position, the global random module by default.
+
+    Returns:
+        tuple: A tuple representing the generated position.
+    """
+    pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        
+    # avoid overlap with finish flag
+    while pos in pos_set:
+        pos = (rng.choice(range(block_in_maze)),rng.choice(range(block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+    
+    pos_set.add(pos)
+    return pos
+
+def create_item_dict(item_class, block_in_maze, counts_dict, pos_set, rng=random):
+    """
+    Create a dictionary of items with randomly generated positions in the maze.
+
+    Args:
+        item_class: The class of the item to be created.
+        block_in_maze (int): The number of blocks in the maze.
+        counts_dict (dict): A dictionary containing the count of items for each block configuration.
+        pos_set (set): A set containing existing positions in the maze.
+        rng (random.Random, optional): The generator of the positions, the global random module by default.
+
+    Returns:
+        dict: A dictionary containing items with their positions as keys.
+    """
+    item_dict = {}
+    count = counts_dict[block_in_maze]
+    for i in range(count):
+        pos = generate_random_position(block_in_maze, pos_set, rng)
+        block_number = pos[0] * block_in_maze + pos[1]
+        key = (block_number, pos[2], pos[3])
+        item_dict[key] = item_class(pos, block_in_maze, key)
+    return item_dict
+
+def collect_item(item:Item, player:Player, item_type:str, rng=random):
+    """
+    Collect an item and apply its effects on the player.
+
+    Args:
+        item (Item): The item object to be collected.
+        player (Player): The player object.
+        item_type (str): The type of the item.
+        rng (random.Random, optional): The generator of the coke effect, the global random module by default.
+
+    Returns:
+        None
+    """
+    item.collect = True
+    if item_type == "coin":
+        player.coin += 1
+    elif item_type == "sword":
+        player.attack += 1
+    elif item_type == "meat":
+        player.maximum_life += 10
+        player.life += 20
+        if player.life > player.maximum_life:
+            player.life = player.maximum_life
+    elif item_type == "coke":
+        num = rng.choice(range(4))
+        if num == 0 and player.attack_dice.lower_bound < player.attack_dice.upper_bound:
+            player.attack_dice.lower_bound += 1
+        elif num == 1:
+            player.attack_dice.upper_bound += 1
+        elif num == 2 and player.defense_dice.lower_bound < player.defense_dice.upper_bound:
+            player.defense_dice.lower_bound += 1
+        elif num == 3:
+            player.defense_dice.upper_bound += 1 
+    elif item_type == "shield":
+        player.defense += 1
+
+def create_helper():
+    """
+    Create helper objects and store them in a dictionary.
+
+    Returns:
+        dict: A dictionary containing helper objects with helper names as keys.
+    """
+    helper_dict = {}
+    helper_dict["Zoro"] = Helper("Zoro", 10, skill.never_die, 3, ["game", "battle"], "after_defense")
+    helper_dict["Sanji"] = Helper("Sanji", 8, skill.huge_damage, 1, ["battle"], "right_away")
+    helper_dict["Nami"] = Helper("Nami", 8, skill.remove_defense, 5, ["battle"], "before_attack")
+    helper_dict["Usopp"] = Helper("Usopp", 6, skill.escape, 1, ["battle"], "right_away")
+    helper_dict["Chopper"] = Helper("Chopper", 3, skill.add_life, 10, ["game", "battle"], "before_attack")
+    helper_dict["Brook"] = Helper("Brook", 7, skill.half_the_attack, 3, ["battle"], "before_attack")
+    return helper_dict
+
+def update_helper_param(player:Player, enemy:Enemy):
+    """
+    Update helper skill parameters based on the player and enemy attributes.
+
+    Args:
+        player (Player): The player object.
+        enemy (Enemy): The enemy object.
+
+    Returns:
+        dict: A dictionary containing helper parameters with helper names as keys.
+    """
+    helper_param_dict = {}
+    helper_param_dict["Zoro"] = [player]
+    helper_param_dict["Sanji"] = [player, enemy]
+    helper_param_dict["Nami"] = [enemy]
+    helper_param_dict["Usopp"] = [player, enemy]
+    helper_param_dict["Chopper"] = [player, player.maximum_life//5]
+    helper_param_dict["Brook"] = [enemy]
+    return helper_param_dict
+
+def check_helper_validate(player:Player, mode:str, helper:Helper):
+    """
+    Check if a helper is valid for activation.
+
+    Args:
+        player (Player): The player object.
+        mode (str): The current game mode.
+        helper (Helper): The helper object to be checked.
+
+    Returns:
+        bool: True if the helper can be activated, False otherwise.
+    """
+    return player.coin >= helper.cost and mode in helper.allow_mode and helper.available
+
+def update_player_attribute_after_winning_battle(player:Player, enemy:Enemy):
+    """
+    Update player's attributes after winning a battle.
+
+    Args:
+        player: The Player object.
+        enemy: The Enemy object defeated by the player.
+    """
+    enemy.defeated = True
+    player.attack += enemy.attack // 10
+    player.defense += enemy.defense // 5
+    player.maximum_life += enemy.initial_life // 10
+    player.life += enemy.initial_life // 10
+    player.fame += enemy.fame
+
+def update_helper_activate(helper_dict:dict[str,Helper]):
+    """
+    Update the activation status of helpers. (Use after battle)
+
+    Args:
+        helper_dict: A dictionary containing helper objects.
+    """
+    for helper in helper_dict.values():
+        if helper.activate and "game" not in helper.allow_mode:
+            helper.activate = False
+
+def use_skill(player:Player, enemy:Enemy, helper:Helper):
+    """
+    Use the skill of a helper and count down its remaining rounds.
+
+    Args:
+        player (Player): The player object.
+        enemy (Enemy): The enemy object being battled, or None in game mode.
+        helper (Helper): The helper whose skill is used.
+    """
+    helper_param_dict = update_helper_param(player, enemy)
+    helper.use_skill(*helper_param_dict[helper.name])
+    helper.reduce_remaining_rounds()
+    if helper.rounds <= 0:
+        helper.activate = False
+
+class GameState:
+    """Class keeping the state of one game and applying its rules.
+
+    The state changes only through actions:
+        ("move", direction): Move the player "up", "down", "left" or "right" in game mode.
+        ("helper", name): Activate a helper, in game or battle mode.
+        ("exchange_mode",): Switch between game mode and block exchange mode.
+        ("exchange", block_number): Exchange the block of the player with another block, in block exchange mode.
+        ("roll",): Roll the dice for the current turn of the battle, in battle mode.
+
+    Applying an action yields events telling what happened, in order, so a renderer can
+    show each one while the state is still as it was at that moment:
+        ("move", direction), ("step_damage",), ("helper_skill", helper), ("collect", item_type, item),
+        ("battle_start", enemy), ("helper_activated", helper), ("player_attack", damage),
+        ("enemy_attack", damage), ("round_end",), ("battle_end", enemy), ("mode", mode),
+        ("exchange", input_block_index, current_block_index) and ("game_over", result).
+    The damage of an attack event is taken off once the renderer asks for the next event.
+    Actions that are not allowed in the current state yield nothing.
+    """
+
+    def __init__(self, block_in_maze, on_maze_generated=None, seed=None):
+        """
+        Generate the maze and set up the player, the items, the enemies and the helpers of a new game.
+
+        Args:
+            block_in_maze (int): The number of blocks in each row and column of the maze.
+            on_maze_generated (callable, optional): Called with (maze, solution_path) after the maze is
+                generated and before its blocks are shuffled, for example to save it.
+            seed (int, optional): The seed of the game, my_seed if None. The maze, its shuffle, the
+                items, the enemies and the combat each draw from their own stream derived from it.
+        """
+        self.block_in_maze = block_in_maze
+        self.seed = my_seed if seed is None else seed
+        self.streams = RandomStreams(self.seed)
+        # The renderer draws this maze as the large view and moves its position; the rules only use its cells
+        self.maze = Maze(0, 0, block_in_maze, LARGE_MAZE_CELL_SIZE, 10)
+        self.solution_path = self.maze.generate_maze(self.streams.seed("maze"))
+        if on_maze_generated is not None:
+            on_maze_generated(self.maze, self.solution_path)
+        self.maze.randomize(self.streams.seed("randomize"))
+
+        # Initialize position set with start and end
+        pos_set = set()
+        start = self.solution_path[0]
+        end = self.solution_path[-1]
+        pos_set.add(start)
+        pos_set.add(end)
+
+        # Set up item dictionaries, player, enemy, and helper objects
+        self.player = Player(start, self.maze)
+        coin_counts = {3: EASY_COIN_COUNT, 4: MEDIUM_COIN_COUNT, 5: HARD_COIN_COUNT}
+        sword_counts = {3: EASY_SWORD_COUNT, 4: MEDIUM_SWORD_COUNT, 5: HARD_SWORD_COUNT}
+        meat_counts = {3: EASY_MEAT_COUNT, 4: MEDIUM_MEAT_COUNT, 5: HARD_MEAT_COUNT}
+        coke_counts = {3: EASY_COKE_COUNT, 4:MEDIUM_COKE_COUNT, 5: HARD_COKE_COUNT}
+        shield_counts = {3: EASY_SHIELD_COUNT, 4:MEDIUM_SHIELD_COUNT, 5:HARD_SHIELD_COUNT}
+        items_rng = self.streams.get("items")
+        self.item_dict = {
+            "coin": create_item_dict(Coin, block_in_maze, coin_counts, pos_set, items_rng),
+            "sword": create_item_dict(Sword, block_in_maze, sword_counts, pos_set, items_rng),
+            "meat": create_item_dict(Meat, block_in_maze, meat_counts, pos_set, items_rng),
+            "coke": create_item_dict(Coke, block_in_maze, coke_counts, pos_set, items_rng),
+            "shield": create_item_dict(Shield, block_in_maze, shield_counts, pos_set, items_rng),
+        }
+        finish_flag_block_number = end[0] * block_in_maze + end[1]
+        key = (finish_flag_block_number, end[2], end[3])
+        self.finish_flag = FinishFlag(end, block_in_maze, key)
+        self.item_dict["finish_flag"] = {key: self.finish_flag}
+
+        # Keep the distance of every cell to the finish flag, repaired after each block exchange
+        self.finish_distance = solver.DistanceField(self.maze, self.finish_flag.block_number, self.finish_flag.cell_row, self.finish_flag.cell_col)
+
+        enemies_rng = self.streams.get("enemies")
+        if block_in_maze == 3:
+            self.enemy_dict = create_easy_enemy(self.player, block_in_maze, pos_set, enemies_rng)
+        elif block_in_maze == 4:
+            self.enemy_dict = create_medium_enemy(self.player, block_in_maze, pos_set, enemies_rng)
+        else:
+            self.enemy_dict = create_hard_enemy(self.player, block_in_maze, pos_set, enemies_rng)
+        self.helper_dict = create_helper()
+
+        # Index the items and enemies by block, so interactions and drawing only look around the player
+        self.entity_index = SpatialIndex()
+        for item_type, items in self.item_dict.items():
+            self.entity_index.add_all(item_type, items)
+        self.entity_index.add_all("enemy", self.enemy_dict)
+
+        self.mode = "game"
+        self.enemy = None
+        self.turn = "attack"
+        self.game_over = False
+        self.result = None
+
+    def describe_level(self):
+        """
+        Describe the level generated for this game, as plain data that can be compared or sent between processes.
+
+        Returns:
+            dict: The "seed", "block_in_maze", "connect_grid" (bytes), "block_number_index", "solution_path",
+            "items" (sorted keys by item type) and "enemies" ((key, name, life, attack, defense) tuples, sorted).
+        """
+        return {"seed": self.seed,
+                "block_in_maze": self.block_in_maze,
+                "connect_grid": bytes(self.maze.connect_grid),
+                "block_number_index": list(self.maze.block_number_index),
+                "solution_path": list(self.solution_path),
+                "items": {item_type: sorted(items) for item_type, items in self.item_dict.items()},
+                "enemies": sorted((key, enemy.name, enemy.life, enemy.attack, enemy.defense) for key, enemy in self.enemy_dict.items())}
+
+    def step(self, action):
+        """
+        Apply an action.
+
+        Args:
+            action (tuple): The action (see the class docstring).
+
+        Returns:
+            list: The events of the action.
+        """
+        return list(self.play(action))
+
+    def play(self, action):
+        """
+        Apply an action step by step, yielding its events as they happen.
+
+        Args:
+            action (tuple): The action (see the class docstring).
+
+        Yields:
+            tuple: The events of the action.
+        """
+        if self.game_over:
+            return
+        name = action[0]
+        if name == "move" and self.mode == "game":
+            yield from self.play_move(action[1])
+        elif name == "helper":
+            yield from self.play_helper(action[1])
+        elif name == "exchange_mode" and self.mode in ("game", "exchange_block"):
+            self.mode = "exchange_block" if self.mode == "game" else "game"
+            yield ("mode", self.mode)
+        elif name == "exchange" and self.mode == "exchange_block":
+            yield from self.play_exchange(action[1])
+        elif name == "roll" and self.mode == "battle":
+            yield from self.play_roll()
+
+    def get_player_pos(self):
+        """
+        Get the current position of the player.
+
+        Returns:
+            tuple: The position (block_row, block_col, cell_row, cell_col).
+        """
+        return self.maze.get_pos(self.player.block_number, self.player.cell_row, self.player.cell_col)
+
+    def get_hint_path(self):
+        """
+        Get the shortest way from the player to the finish flag.
+
+        Returns:
+            list: The positions of the path, empty if the finish flag cannot be reached.
+        """
+        return self.finish_distance.path(self.get_player_pos())
+
+    def play_move(self, direction):
+        """
+        Move the player, then handle the step count, the game mode helpers, the items and the enemies of the new cell.
+
+        Args:
+            direction (str): "up", "down", "left" or "right".
+
+        Yields:
+            tuple: The events of the move.
+        """
+        player = self.player
+        if direction == "up" and check_up_validate(self.maze, player):
+            player.move_up(self.maze)
+        elif direction == "down" and check_down_validate(self.maze, player):
+            player.move_down(self.maze)
+        elif direction == "left" and check_left_validate(self.maze, player):
+            player.move_left(self.maze)
+        elif direction == "right" and check_right_validate(self.maze, player):
+            player.move_right(self.maze)
+        else:
+            return
+        yield ("move", direction)
+
+        # Minus player life according to the step count
+        player.step += 1
+        if player.step % STEP_COUNT == 0:
+            player.life -= 1
+            yield ("step_damage",)
+
+        # Activate helper skills if applicable
+        for helper in self.helper_dict.values():
+            if helper.activate and "game" in helper.allow_mode:
+                use_skill(player, None, helper)
+                yield ("helper_skill", helper)
+
+        # Collect the items of the cell; the finish flag and enemies are handled below
+        cell = self.entity_index.get_cell(player.block_number, player.cell_row, player.cell_col)
+        for item_type, item in list(cell.items()):
+            if item_type not in ("finish_flag", "enemy"):
+                collect_item(item, player, item_type, self.streams.get("items"))
+                self.entity_index.remove(item_type, item)
+                yield ("collect", item_type, item)
+
+        # Check if the player is encountering an enemy; the move ends with the battle
+        enemy = cell.get("enemy")
+        if enemy is not None and enemy.defeated == False:
+            self.mode = "battle"
+            self.enemy = enemy
+            self.turn = "attack"
+            yield ("battle_start", enemy)
+            return
+        yield from self.play_arrival()
+
+    def play_arrival(self):
+        """
+        End the game if the player reached the finish flag or has no life left.
+
+        Yields:
+            tuple: The game over event, if any.
+        """
+        player = self.player
+        if "finish_flag" in self.entity_index.get_cell(player.block_number, player.cell_row, player.cell_col):
+            self.game_over, self.result = True, "win"
+        elif player.life <= 0:
+            self.game_over, self.result = True, "lose"
+        else:
+            return
+        yield ("game_over", self.result)
+
+    def play_helper(self, name):
+        """
+        Activate a helper if the player can afford it in the current mode, and use it right away if its skill says so.
+
+        Args:
+            name (str): The name of the helper.
+
+        Yields:
+            tuple: The events of the activation.
+        """
+        helper = self.helper_dict[name]
+        if not check_helper_validate(self.player, self.mode, helper):
+            return
+        helper.activate = True
+        helper.available = False
+        self.player.coin -= helper.cost
+        yield ("helper_activated", helper)
+        if self.mode == "battle":
+            yield from self.play_helper_effect("right_away")
+
+    def play_exchange(self, block_number):
+        """
+        Exchange the block at a position with the block of the player.
+
+        Args:
+            block_number (int): The position of the other block, counted row by row.
+
+        Yields:
+            tuple: The exchange event, if the position is in the maze.
+        """
+        if block_number not in range(self.block_in_maze * self.block_in_maze):
+            return
+        input_block_index = (block_number // self.block_in_maze, block_number % self.block_in_maze)
+        current_block_index = self.maze.get_block_number_index(self.player.block_number)
+        self.maze.exchange_block(input_block_index, current_block_index)
+        self.finish_distance.update_after_exchange(input_block_index, current_block_index)
+        yield ("exchange", input_block_index, current_block_index)
+
+    def play_helper_effect(self, execution_time):
+        """
+        Use the skills of the active helpers executed at a given time of the battle.
+
+        Args:
+            execution_time (str): The time of the battle (see SKILL_EXECUTION_TIME_LIST).
+
+        Yields:
+            tuple: The events of the skills, and the end of the battle if the enemy is defeated.
+
+        Returns:
+            bool: True if the battle is over.
+        """
+        player, enemy = self.player, self.enemy
+        for helper in self.helper_dict.values():
+            if helper.activate and helper.skill_execution_time == execution_time:
+                use_skill(player, enemy, helper)
+                yield ("helper_skill", helper)
+            if enemy.life <= 0:
+                update_player_attribute_after_winning_battle(player, enemy)
+                update_helper_activate(self.helper_dict)
+                yield from self.play_battle_end()
+                return True
+            if enemy.defeated:
+                update_helper_activate(self.helper_dict)
+                yield from self.play_battle_end()
+                return True
+        return False
+
+    def play_roll(self):
+        """
+        Roll the dice of the current turn: the player attacks in the attack turn and defends in the defense turn.
+
+        Yields:
+            tuple: The events of the turn.
+        """
+        player, enemy = self.player, self.enemy
+        if self.turn == "attack":
+            if (yield from self.play_helper_effect("before_attack")):
+                return
+
+            # Roll dice for player's attack and enemy's defense
+            combat_rng = self.streams.get("combat")
+            player_attack_dice = player.attack_dice.roll_dice(combat_rng)
+            enemy_defense_dice = enemy.defense_dice.roll_dice(combat_rng)
+            player_damage = player.attack * player_attack_dice - enemy.defense * enemy_defense_dice
+            if player_damage < 0:
+                player_damage = 0
+            yield ("player_attack", player_damage)
+
+            # Update enemy's life after player's attack
+            enemy.life -= player_damage
+            if enemy.life <= 0:
+                update_player_attribute_after_winning_battle(player, enemy)
+                update_helper_activate(self.helper_dict)
+                yield from self.play_battle_end()
+                return
+            if (yield from self.play_helper_effect("after_attack")):
+                return
+            self.turn = "defense"
+        else:
+            if (yield from self.play_helper_effect("before_defense")):
+                return
+
+            # Roll dice for player's defense and enemy's attack
+            combat_rng = self.streams.get("combat")
+            player_defense_dice = player.defense_dice.roll_dice(combat_rng)
+            enemy_attack_dice = enemy.attack_dice.roll_dice(combat_rng)
+            enemy_damage = enemy.attack * enemy_attack_dice - player.defense * player_defense_dice
+            if enemy_damage < 0:
+                enemy_damage = 0
+            yield ("enemy_attack", enemy_damage)
+            player.life -= enemy_damage
+
+            if (yield from self.play_helper_effect("after_defense")):
+                return
+            if player.life <= 0:
+                yield from self.play_battle_end()
+                return
+            self.turn = "attack"
+        yield ("round_end",)
+
+        # Reset enemy's defense and attack attributes
+        enemy.defense = enemy.initial_defense
+        enemy.attack = enemy.initial_attack
+
+    def play_battle_end(self):
+        """
+        Leave battle mode, forgetting the enemy if it is defeated, and check whether the game is over.
+
+        Yields:
+            tuple: The end of the battle and the game over event, if any.
+        """
+        enemy = self.enemy
+        self.mode = "game"
+        self.enemy = None
+        if enemy.defeated:
+            self.entity_index.remove("enemy", enemy)
+        yield ("battle_end", enemy)
+        yield from self.play_arrival()
+
+def generate_level_task(task):
+    """
+    Generate the level of one game seed, in a worker process of generate_levels.
+
+    Args:
+        task (tuple): The (block_in_maze, seed) of the level.
+
+    Returns:
+        dict: The level, as returned by GameState.describe_level.
+    """
+    block_in_maze, seed = task
+    return GameState(block_in_maze, seed=seed).describe_level()
+
+def generate_levels(block_in_maze, seeds, processes=None):
+    """
+    Generate the levels of many game seeds over a process pool.
+
+    Every game draws only from its own random streams, so a level is the same whichever
+    process generates it and whatever the number of processes.
+
+    Args:
+        block_in_maze (int): The number of blocks in each row and column of the mazes.
+        seeds (list): The game seeds.
+        processes (int, optional): The number of worker processes, the number of CPUs if None.
+
+    Returns:
+        list: The levels in the order of the seeds, as returned by GameState.describe_level.
+    """
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(generate_level_task, [(block_in_maze, seed) for seed in seeds]))
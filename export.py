@@ -0,0 +1,208 @@
+import struct
+import zlib
+import numpy as np
+from variables import *
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+BLOCK_OUTLINE_COLOR = (128, 128, 128)
+# The image only uses four colors, so it is written with a palette and one byte per pixel
+PALETTE = (WHITE, BLOCK_OUTLINE_COLOR, DARK_BROWN, RED)
+BACKGROUND_PIXEL, OUTLINE_PIXEL, WALL_PIXEL, SOLUTION_PIXEL = range(len(PALETTE))
+
+def grid_mask_rows(maze, first_row, last_row):
+    """
+    Get the connect masks of a range of grid rows as a NumPy array, following the current block arrangement.
+
+    Only the block rows covering the range are copied out of the connect grid.
+
+    Args:
+        maze: The Maze object.
+        first_row (int): The first grid row (inclusive).
+        last_row (int): The last grid row (exclusive).
+
+    Returns:
+        numpy.ndarray: The masks, of shape (last_row - first_row, size).
+    """
+    block_in_maze = maze.block_in_maze
+    size = block_in_maze * CELL_IN_BLOCK
+    blocks = np.frombuffer(maze.connect_grid, dtype=np.uint8).reshape(block_in_maze, block_in_maze, CELL_IN_BLOCK, CELL_IN_BLOCK)
+    first_block_row, last_block_row = first_row // CELL_IN_BLOCK, (last_row - 1) // CELL_IN_BLOCK + 1
+    rows = blocks[first_block_row:last_block_row].transpose(0, 2, 1, 3).reshape(-1, size)
+    start = first_row - first_block_row * CELL_IN_BLOCK
+    return rows[start:start + last_row - first_row]
+
+def line_pixels(length, cell_size, line_width):
+    """
+    Map every pixel along one axis to the nearest cell boundary and tell whether it lies on a wall line.
+
+    Args:
+        length (int): The number of pixels along the axis.
+        cell_size (int): The size of each cell in pixels.
+        line_width (int): The width of the wall lines in pixels.
+
+    Returns:
+        tuple: (boundary, on_line) arrays of shape (length,).
+    """
+    pixels = np.arange(length)
+    boundary = (pixels + cell_size // 2) // cell_size
+    # pygame.draw.line puts (line_width - 1) // 2 pixels before the line and the rest after it
+    offset = pixels - boundary * cell_size + (line_width - 1) // 2
+    on_line = (offset >= 0) & (offset < line_width)
+    return boundary, on_line
+
+def solution_rects(maze, path):
+    """
+    Convert a solution path into axis-aligned pixel rectangles, following Maze.draw_sol_line.
+
+    Args:
+        maze: The Maze object (its position is ignored, the image starts at 0, 0).
+        path (list): The solution path containing positions.
+
+    Returns:
+        numpy.ndarray: Rectangles (x0, y0, x1, y1) with exclusive ends, sorted by y0.
+    """
+    cell_size, half_width = maze.cell_size, (maze.line_width - 1) // 2
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    rects = []
+
+    def add_segment(x0, y0, x1, y1):
+        # Like pygame.draw.line, the line covers both end points and is only thickened across its direction
+        if x0 == x1:
+            rects.append((x0 - half_width, min(y0, y1), x0 - half_width + maze.line_width, max(y0, y1) + 1))
+        else:
+            rects.append((min(x0, x1), y0 - half_width, max(x0, x1) + 1, y0 - half_width + maze.line_width))
+
+    for pos_1, pos_2 in zip(path, path[1:]):
+        row_1, col_1 = pos_1[0] * CELL_IN_BLOCK + pos_1[2], pos_1[1] * CELL_IN_BLOCK + pos_1[3]
+        row_2, col_2 = pos_2[0] * CELL_IN_BLOCK + pos_2[2], pos_2[1] * CELL_IN_BLOCK + pos_2[3]
+        center_1 = (col_1 * cell_size + cell_size // 2, row_1 * cell_size + cell_size // 2)
+        center_2 = (col_2 * cell_size + cell_size // 2, row_2 * cell_size + cell_size // 2)
+        if abs(row_2 - row_1) < size - 1 and abs(col_2 - col_1) < size - 1:
+            add_segment(*center_1, *center_2)
+        else:
+            # The step wraps around the maze: draw half a cell towards each edge
+            row_step = 0 if row_1 == row_2 else (-1 if row_2 > row_1 else 1)
+            col_step = 0 if col_1 == col_2 else (-1 if col_2 > col_1 else 1)
+            add_segment(*center_1, center_1[0] + col_step * cell_size // 2, center_1[1] + row_step * cell_size // 2)
+            add_segment(*center_2, center_2[0] - col_step * cell_size // 2, center_2[1] - row_step * cell_size // 2)
+    rects = np.array(rects, dtype=np.int64).reshape(-1, 4)
+    return rects[np.argsort(rects[:, 1], kind="stable")]
+
+def render_rows(maze, first_y, last_y, column_boundary, column_on_line, rects, strip):
+    """
+    Rasterize a horizontal strip of the maze image as palette indices.
+
+    Args:
+        maze: The Maze object.
+        first_y (int): The first pixel row of the strip (inclusive).
+        last_y (int): The last pixel row of the strip (exclusive).
+        column_boundary (numpy.ndarray): The nearest vertical boundary of every pixel column.
+        column_on_line (numpy.ndarray): Whether every pixel column lies on a vertical wall line.
+        rects (numpy.ndarray): The solution rectangles from solution_rects.
+        strip (numpy.ndarray): The array to fill, of shape (last_y - first_y, width).
+    """
+    cell_size = maze.cell_size
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    width = size * cell_size
+    block_size = cell_size * CELL_IN_BLOCK
+    ys = np.arange(first_y, last_y)
+
+    # Masks of every grid row the strip touches, with one extra row on each side
+    first_row = max(first_y // cell_size - 1, 0)
+    last_row = min((last_y - 1) // cell_size + 2, size)
+    masks = grid_mask_rows(maze, first_row, last_row)
+    no_left = (masks & DIRECTION_BIT[LEFT]) == 0
+    no_right = (masks & DIRECTION_BIT[RIGHT]) == 0
+    no_up = (masks & DIRECTION_BIT[UP]) == 0
+    no_down = (masks & DIRECTION_BIT[DOWN]) == 0
+    pad = np.zeros((masks.shape[0], 1), dtype=bool)
+
+    # Vertical wall on boundary k of a row: LEFT wall of cell k or RIGHT wall of cell k - 1
+    vertical = np.concatenate([no_left, pad], axis=1) | np.concatenate([pad, no_right], axis=1)
+    # A line drawn along a cell also covers the first pixel of the next cell
+    row_a = np.clip(ys // cell_size - first_row, 0, masks.shape[0] - 1)
+    row_b = np.clip((ys - 1) // cell_size - first_row, 0, masks.shape[0] - 1)
+    on_boundary_start = (ys % cell_size == 0)[:, None]
+    vertical_rows = vertical[row_a] | (vertical[row_b] & on_boundary_start)
+    vertical_pixels = vertical_rows[:, column_boundary] & column_on_line[None, :]
+
+    # Horizontal wall on boundary k of a column: UP wall of row k or DOWN wall of row k - 1
+    row_boundary, row_on_line = line_pixels(last_y, cell_size, maze.line_width)
+    row_boundary, row_on_line = row_boundary[first_y:], row_on_line[first_y:]
+    pad_row = np.zeros((1, size), dtype=bool)
+    horizontal = np.concatenate([no_up, pad_row], axis=0) | np.concatenate([pad_row, no_down], axis=0)
+    boundary_index = np.clip(row_boundary - first_row, 0, horizontal.shape[0] - 1)
+    columns = np.arange(width)
+    column_a = np.minimum(columns // cell_size, size - 1)
+    column_b = np.clip((columns - 1) // cell_size, 0, size - 1)
+    on_column_start = (columns % cell_size == 0)[None, :]
+    horizontal_rows = horizontal[boundary_index]
+    horizontal_pixels = (horizontal_rows[:, column_a] | (horizontal_rows[:, column_b] & on_column_start)) & row_on_line[:, None]
+
+    strip[:] = BACKGROUND_PIXEL
+    # Block outlines first, walls are drawn over them
+    outline_columns = (columns % block_size == 0) | (columns % block_size == block_size - 1)
+    outline_rows = (ys % block_size == 0) | (ys % block_size == block_size - 1)
+    strip[:, outline_columns] = OUTLINE_PIXEL
+    strip[outline_rows] = OUTLINE_PIXEL
+    strip[vertical_pixels | horizontal_pixels] = WALL_PIXEL
+
+    # Solution segments crossing the strip
+    if len(rects):
+        candidates = rects[(rects[:, 1] < last_y) & (rects[:, 3] > first_y)]
+        for x0, y0, x1, y1 in candidates:
+            strip[max(y0, first_y) - first_y:min(y1, last_y) - first_y, max(x0, 0):min(x1, width)] = SOLUTION_PIXEL
+
+def write_png_chunk(fh, chunk_type, data):
+    """
+    Write one PNG chunk (length, type, data and CRC).
+
+    Args:
+        fh: The binary file to write to.
+        chunk_type (bytes): The four-letter chunk type.
+        data (bytes): The chunk data.
+    """
+    fh.write(struct.pack(">I", len(data)))
+    fh.write(chunk_type)
+    fh.write(data)
+    fh.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)) & 0xffffffff))
+
+def save_maze_png(maze, file_name, solution_path=None, strip_bytes=EXPORT_STRIP_BYTES):
+    """
+    Save an image of the maze as a palette PNG, rasterized with NumPy and encoded strip by strip.
+
+    Only one horizontal strip of at most strip_bytes of pixels (plus the masks of the grid rows
+    it touches) is held in memory at a time, so very large mazes can be exported. The walls are
+    drawn over all the block outlines, where Maze.draw lets the outline of the next block cover
+    the walls of the previous one; otherwise the image matches Maze.draw pixel for pixel.
+
+    Args:
+        maze: The Maze object, drawn from its top-left corner whatever its position.
+        file_name (str): The name of the PNG file to write.
+        solution_path (list, optional): A solution path to draw over the maze.
+        strip_bytes (int, optional): The maximum size in bytes of one strip of pixels.
+    """
+    cell_size = int(maze.cell_size)
+    if cell_size != maze.cell_size:
+        raise ValueError("save_maze_png needs an integer cell size")
+    width = height = maze.block_in_maze * CELL_IN_BLOCK * cell_size
+    column_boundary, column_on_line = line_pixels(width, cell_size, maze.line_width)
+    rects = solution_rects(maze, solution_path) if solution_path else np.zeros((0, 4), dtype=np.int64)
+    strip_height = max(1, strip_bytes // (width + 1))
+    # Every scanline starts with filter type 0 (none), followed by one palette index per pixel
+    scanlines = np.zeros((strip_height, width + 1), dtype=np.uint8)
+    compressor = zlib.compressobj(6)
+    with open(file_name, "wb") as fh:
+        fh.write(PNG_SIGNATURE)
+        # 8-bit palette indices, no interlacing
+        write_png_chunk(fh, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+        write_png_chunk(fh, b"PLTE", bytes(channel for color in PALETTE for channel in color))
+        for first_y in range(0, height, strip_height):
+            last_y = min(first_y + strip_height, height)
+            rows = scanlines[:last_y - first_y]
+            render_rows(maze, first_y, last_y, column_boundary, column_on_line, rects, rows[:, 1:])
+            data = compressor.compress(rows)
+            if data:
+                write_png_chunk(fh, b"IDAT", data)
+        write_png_chunk(fh, b"IDAT", compressor.flush())
+        write_png_chunk(fh, b"IEND", b"")
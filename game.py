@@ -1,11 +1,14 @@
 import pygame
 from variables import *
 import game_play 
+from preloader import PRELOADER
+from artifact_writer import ARTIFACT_WRITER
 
 def main():
     pygame.init() # Initialize pygame
     
     window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT)) # Create game window
+    PRELOADER.start() # Load the images, fonts and sounds in the background while the menu shows
     game_state = "menu" # Initialize game state to "menu"
     block_number = 3
     
@@ -17,6 +20,7 @@ def main():
         elif game_state == "game_over": # Game over
             game_state = game_play.game_over(window, player, result)
             
+    ARTIFACT_WRITER.close() # Finish writing the output files
     pygame.quit()
     
 if __name__ == "__main__":
@@ -1,19 +1,35 @@
+import os
 import pygame
-import random
 import time
 from variables import *
-from maze import Maze
+from maze import Maze, MazeView, MazeCache
 from player import Player
-from Item import Item, Coin, Sword, Meat, Coke, Shield, FinishFlag
-from dice import Dice
+from Item import Item
 from enemy import Enemy
 from helper import Helper
-import skill
+from engine import GameState, check_helper_validate
+from battle_odds import request_battle_odds, prefetch_battle_odds
+import export
+from image_cache import load_image
+from sound_bank import SOUND_BANK, play_sound, play_music
+from text_cache import get_font, render_text
+from dirty_rects import mark_dirty, update_display
+from spatial_index import SpatialIndex
+from loop_driver import get_events, wait_for_channel
+from artifact_writer import ARTIFACT_WRITER
+
+# Event posted by the battle odds worker when the odds the battle screen waits for are ready
+BATTLE_ODDS_EVENT = pygame.event.custom_type()
 
 def save_image(maze: Maze, find_sol, file_name, solution_path):
     """
     Save an image of the maze to a file.
 
+    The image is drawn right away and encoded by the artifact writer in the background.
+    Images larger than EXPORT_PIXEL_LIMIT are rasterized with NumPy and streamed to a PNG
+    strip by strip (see export.save_maze_png) instead of being drawn on one full-size surface;
+    the extension of file_name is then replaced by .png.
+
     Args:
         maze (Maze): The Maze object representing the maze to be saved.
         find_sol (bool): Flag indicating whether a solution path is found.
@@ -23,123 +39,72 @@ def save_image(maze: Maze, find_sol, file_name, solution_path):
     Returns:
         None
     """
+    if not ARTIFACT_WRITER.is_enabled(file_name):
+        return
+    image_size = maze.block_in_maze*CELL_IN_BLOCK*maze.cell_size
+    if image_size * image_size > EXPORT_PIXEL_LIMIT:
+        # The export reads the maze while it runs, so it gets a snapshot the game cannot change
+        ARTIFACT_WRITER.submit(file_name, export.save_maze_png, maze.snapshot(), os.path.splitext(file_name)[0] + ".png", \
+                               solution_path if find_sol else None)
+        return
     output_maze_surface = pygame.Surface((maze.block_in_maze*CELL_IN_BLOCK*maze.cell_size, maze.block_in_maze*CELL_IN_BLOCK*maze.cell_size))
     output_maze_surface.fill(WHITE)
     maze.draw(output_maze_surface, DARK_BROWN)
     if find_sol is True:
         maze.draw_sol(solution_path, output_maze_surface)
-    pygame.image.save(output_maze_surface, file_name)
+    ARTIFACT_WRITER.submit(file_name, pygame.image.save, output_maze_surface, file_name)
     
-def show_maze_on_window(maze: Maze, window: pygame.Surface, surface: pygame.Surface, pos):
+def create_maze_cache(maze: Maze, width, height):
     """
-    Draw the maze on a surface and then render it to the window at the specified position.
+    Create the pre-rendered image of a maze, in the colors of its kind of view.
 
     Args:
         maze (Maze): The Maze object representing the maze to be drawn.
-        window (pygame.Surface): The window surface where the maze will be rendered.
-        surface (pygame.Surface): The surface to draw the maze on.
-        pos (tuple): The position to render the maze on the window.
+        width (int): The width of the visible part of the maze.
+        height (int): The height of the visible part of the maze.
 
     Returns:
-        None
+        MazeCache: The cache of the maze.
     """
-    
     if maze.cell_size == SMALL_MAZE_CELL_SIZE:
-        surface.fill(DARK_BROWN)
-        maze.draw(surface, LIGHT_BROWN)
-    else:
-        surface.fill(LIGHT_BROWN)
-        maze.draw(surface, DARK_BROWN)
-    # maze.draw(surface, LINE_COLOR)
-    window.blit(surface, pos)
-    
-def check_up_validate(maze: Maze, player: Player):
-    """
-    Check if moving up from the player's current position is a valid move within the maze.
-
-    Args:
-        maze (Maze): The Maze object representing the maze.
-        player (Player): The Player object representing the player.
+        return MazeCache(maze, width, height, DARK_BROWN, LIGHT_BROWN)
+    return MazeCache(maze, width, height, LIGHT_BROWN, DARK_BROWN)
 
-    Returns:
-        bool: True if moving up is valid, False otherwise.
+def show_maze_on_window(maze: Maze, window: pygame.Surface, maze_cache: MazeCache, pos):
     """
-    block_row, block_col = maze.get_block_number_index(player.block_number)
-    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
-    if player.cell_row == 0 and block_row == 0:
-        return False
-    if player.cell_row > 0:
-        up_pos = (block_row, block_col, player.cell_row - 1, player.cell_col)
-    elif player.cell_row == 0 and block_row > 0:
-        up_pos = (block_row - 1, block_col, CELL_IN_BLOCK - 1, player.cell_col)
-    return UP in maze.block[curr_pos[0]][curr_pos[1]].cell[curr_pos[2]][curr_pos[3]].connect and \
-           DOWN in maze.block[up_pos[0]][up_pos[1]].cell[up_pos[2]][up_pos[3]].connect
-           
-def check_down_validate(maze: Maze, player: Player):
-    """
-    Check if moving down from the player's current position is a valid move within the maze.
+    Render the visible part of the maze to the window at the specified position.
 
-    Args:
-        maze (Maze): The Maze object representing the maze.
-        player (Player): The Player object representing the player.
-
-    Returns:
-        bool: True if moving down is valid, False otherwise.
-    """
-    block_row, block_col = maze.get_block_number_index(player.block_number)
-    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
-    if player.cell_row == CELL_IN_BLOCK - 1 and block_row == maze.block_in_maze - 1:
-        return False
-    if player.cell_row < CELL_IN_BLOCK - 1:
-        down_pos = (block_row, block_col, player.cell_row + 1, player.cell_col)
-    elif player.cell_row == CELL_IN_BLOCK - 1 and block_row < maze.block_in_maze - 1:
-        down_pos = (block_row + 1, block_col, 0, player.cell_col)
-    return DOWN in maze.block[curr_pos[0]][curr_pos[1]].cell[curr_pos[2]][curr_pos[3]].connect and \
-           UP in maze.block[down_pos[0]][down_pos[1]].cell[down_pos[2]][down_pos[3]].connect
-           
-def check_left_validate(maze: Maze, player: Player):
-    """
-    Check if moving left from the player's current position is a valid move within the maze.
+    The maze is drawn once into its cache; each call only blits the visible part and marks it
+    for the next display update.
 
     Args:
-        maze (Maze): The Maze object representing the maze.
-        player (Player): The Player object representing the player.
+        maze (Maze): The Maze object representing the maze to be drawn.
+        window (pygame.Surface): The window surface where the maze will be rendered.
+        maze_cache (MazeCache): The pre-rendered image of the maze.
+        pos (tuple): The position to render the maze on the window.
 
     Returns:
-        bool: True if moving left is valid, False otherwise.
+        None
     """
-    block_row, block_col = maze.get_block_number_index(player.block_number)
-    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
-    if player.cell_col == 0 and block_col == 0:
-        return False
-    if player.cell_col > 0:
-        left_pos = (block_row, block_col, player.cell_row, player.cell_col - 1)
-    elif player.cell_col == 0 and block_col > 0:
-        left_pos = (block_row, block_col - 1, player.cell_row, CELL_IN_BLOCK - 1)
-    return LEFT in maze.block[curr_pos[0]][curr_pos[1]].cell[curr_pos[2]][curr_pos[3]].connect and \
-           RIGHT in maze.block[left_pos[0]][left_pos[1]].cell[left_pos[2]][left_pos[3]].connect
-           
-def check_right_validate(maze: Maze, player: Player):
+    mark_dirty(maze_cache.draw(window, pos))
+    
+def show_hint_in_maze(window: pygame.Surface, maze: Maze, path):
     """
-    Check if moving right from the player's current position is a valid move within the maze.
+    Draw a path on the large maze as a hint, clipped to the visible part of the maze.
 
     Args:
-        maze (Maze): The Maze object representing the maze.
-        player (Player): The Player object representing the player.
+        window (pygame.Surface): The window surface where the hint will be displayed.
+        maze (Maze): The large maze object.
+        path (list): The path to draw, as positions (block_row, block_col, cell_row, cell_col).
 
     Returns:
-        bool: True if moving right is valid, False otherwise.
+        None
     """
-    block_row, block_col = maze.get_block_number_index(player.block_number)
-    curr_pos = (block_row, block_col, player.cell_row, player.cell_col)
-    if player.cell_col == CELL_IN_BLOCK - 1 and block_col == maze.block_in_maze - 1:
-        return False
-    if player.cell_col < CELL_IN_BLOCK - 1:
-        right_pos = (block_row, block_col, player.cell_row, player.cell_col + 1)
-    elif player.cell_col == CELL_IN_BLOCK - 1 and block_col < maze.block_in_maze - 1:
-        right_pos = (block_row, block_col + 1, player.cell_row, 0)
-    return RIGHT in maze.block[curr_pos[0]][curr_pos[1]].cell[curr_pos[2]][curr_pos[3]].connect and \
-           LEFT in maze.block[right_pos[0]][right_pos[1]].cell[right_pos[2]][right_pos[3]].connect
+    screen_maze = MazeView(maze, maze.x + LARGE_SCREEN_POS[0], maze.y + LARGE_SCREEN_POS[1], maze.cell_size, maze.line_width)
+    window.set_clip(pygame.Rect(LARGE_SCREEN_POS[0], LARGE_SCREEN_POS[1], VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5))
+    screen_maze.draw_sol(path, window)
+    mark_dirty(window.get_clip())
+    window.set_clip(None)
 
 def show_text_in_button(window:pygame.Surface, surface:pygame.Surface, output_text:str, pos:tuple):
     """
@@ -154,17 +119,17 @@ def show_text_in_button(window:pygame.Surface, surface:pygame.Surface, output_te
     Returns:
         None
     """
-    font = pygame.font.Font(pygame.font.get_default_font(), 25)
+    font = get_font(pygame.font.get_default_font(), 25)
     if pos == (EXCHANGE_BLOCK_BUTTON_RECT_POS[0], EXCHANGE_BLOCK_BUTTON_RECT_POS[1]):
         surface.fill(RED)
-        text = font.render(output_text , True , WHITE)
+        text = render_text(font, output_text, WHITE)
     else:
         surface.fill(WHITE)
-        text = font.render(output_text , True , BLACK)
+        text = render_text(font, output_text, BLACK)
     
     text_width, text_height = text.get_rect().size
     surface.blit(text, ((surface.get_width()-text_width)/2,(surface.get_height()-text_height)/2))
-    window.blit(surface, pos)
+    mark_dirty(window.blit(surface, pos))
     # pygame.display.update()
 
 def show_player_in_small_maze(window: pygame.Surface, small_maze: Maze):
@@ -178,9 +143,8 @@ def show_player_in_small_maze(window: pygame.Surface, small_maze: Maze):
     Returns:
         None
     """
-    red_circle_image = pygame.image.load("assets/image/red-circle.png")
-    small_player_image = pygame.transform.smoothscale(red_circle_image, (small_maze.cell_size, small_maze.cell_size))
-    window.blit(small_player_image, (SMALL_SCREEN_POS[0]+(SMALL_SCREEN_WIDTH)/2, SMALL_SCREEN_POS[1]+(SMALL_SCREEN_HEIGHT)/2))
+    small_player_image = load_image("assets/image/red-circle.png", (small_maze.cell_size, small_maze.cell_size))
+    mark_dirty(window.blit(small_player_image, (SMALL_SCREEN_POS[0]+(SMALL_SCREEN_WIDTH)/2, SMALL_SCREEN_POS[1]+(SMALL_SCREEN_HEIGHT)/2)))
 
 def show_player_in_maze(window:pygame.Surface, image):
     """
@@ -193,7 +157,7 @@ def show_player_in_maze(window:pygame.Surface, image):
     Returns:
         None
     """
-    window.blit(image, (LARGE_SCREEN_POS[0]+(VISIBLE_WIDTH)/2, LARGE_SCREEN_POS[1]+(VISIBLE_HEIGHT)/2))
+    mark_dirty(window.blit(image, (LARGE_SCREEN_POS[0]+(VISIBLE_WIDTH)/2, LARGE_SCREEN_POS[1]+(VISIBLE_HEIGHT)/2)))
 
 def show_number_in_middle_maze(window:pygame.Surface, middle_maze: Maze):
     """
@@ -207,16 +171,15 @@ def show_number_in_middle_maze(window:pygame.Surface, middle_maze: Maze):
         None
     """
     block_size = middle_maze.cell_size * CELL_IN_BLOCK
-    font = pygame.font.Font(pygame.font.get_default_font(), int(block_size * 0.8))
+    font = get_font(pygame.font.get_default_font(), int(block_size * 0.8))
     
     for row in range(middle_maze.block_in_maze):
         for col in range(middle_maze.block_in_maze):
             rect = pygame.Rect(LARGE_SCREEN_POS[0]+col*block_size, LARGE_SCREEN_POS[1]+row*block_size,\
                                 block_size, block_size)
-            text = font.render(f"{row*middle_maze.block_in_maze+col}" , True , BLACK) 
-            text.set_alpha(64)
+            text = render_text(font, f"{row*middle_maze.block_in_maze+col}", BLACK, alpha=64)
             text_rect = text.get_rect(center=rect.center)
-            window.blit(text, text_rect)
+            mark_dirty(window.blit(text, text_rect))
 
 def show_player_in_middle_maze(window:pygame.Surface, middle_maze: Maze, player:Player):
     """
@@ -230,54 +193,53 @@ def show_player_in_middle_maze(window:pygame.Surface, middle_maze: Maze, player:
     Returns:
         None
     """
-    red_circle_image = pygame.image.load("assets/image/red-circle.png")
-    middle_maze_player_image = pygame.transform.smoothscale(red_circle_image, (middle_maze.cell_size, middle_maze.cell_size))
+    middle_maze_player_image = load_image("assets/image/red-circle.png", (middle_maze.cell_size, middle_maze.cell_size))
     # window.blit(middle_maze_surface, LARGE_SCREEN_POS)
     block_row, block_col = middle_maze.get_block_number_index(player.block_number)
     block_size = middle_maze.cell_size * CELL_IN_BLOCK
     pos_x, pos_y = (block_col * block_size + player.cell_col * middle_maze.cell_size, \
                     block_row * block_size + player.cell_row * middle_maze.cell_size)
-    window.blit(middle_maze_player_image, (LARGE_SCREEN_POS[0]+pos_x, LARGE_SCREEN_POS[1]+pos_y))
+    mark_dirty(window.blit(middle_maze_player_image, (LARGE_SCREEN_POS[0]+pos_x, LARGE_SCREEN_POS[1]+pos_y)))
 
-def show_mazes_and_players_in_game_mode(window, maze, maze_surface, small_maze, small_maze_surface, image):
+def show_mazes_and_players_in_game_mode(window, maze, maze_cache, small_maze, small_maze_cache, image):
     """
     Display mazes and players in the game mode on the window.
 
     Args:
         window: The window surface where the mazes and players will be displayed.
         maze: The large maze object.
-        maze_surface: The surface representing the large maze.
+        maze_cache: The pre-rendered image of the large maze.
         small_maze: The small maze object.
-        small_maze_surface: The surface representing the small maze.
+        small_maze_cache: The pre-rendered image of the small maze.
         image: The image representing the player.
 
     Returns:
         None
     """
     if image =="default":
-        image = pygame.image.load("assets/image/move_right/frame_2.png")
-    show_maze_on_window(maze, window, maze_surface, LARGE_SCREEN_POS)
-    show_maze_on_window(small_maze, window, small_maze_surface, SMALL_SCREEN_POS)
+        image = load_image("assets/image/move_right/frame_2.png")
+    show_maze_on_window(maze, window, maze_cache, LARGE_SCREEN_POS)
+    show_maze_on_window(small_maze, window, small_maze_cache, SMALL_SCREEN_POS)
     show_player_in_maze(window, image)
     show_player_in_small_maze(window, small_maze)
     
-def show_mazes_and_players_in_exchange_mode(window, middle_maze, middle_maze_surface, small_maze, small_maze_surface, player):
+def show_mazes_and_players_in_exchange_mode(window, middle_maze, middle_maze_cache, small_maze, small_maze_cache, player):
     """
     Display the mazes and player in the exchange mode on the window.
 
     Args:
         window: The window surface where the mazes and players will be displayed.
         middle_maze: The middle maze object.
-        middle_maze_surface: The surface representing the middle maze.
+        middle_maze_cache: The pre-rendered image of the middle maze.
         small_maze: The small maze object.
-        small_maze_surface: The surface representing the small maze.
+        small_maze_cache: The pre-rendered image of the small maze.
         player: The player object.
 
     Returns:
         None
     """
-    show_maze_on_window(middle_maze, window, middle_maze_surface, LARGE_SCREEN_POS)
-    show_maze_on_window(small_maze, window, small_maze_surface, SMALL_SCREEN_POS)
+    show_maze_on_window(middle_maze, window, middle_maze_cache, LARGE_SCREEN_POS)
+    show_maze_on_window(small_maze, window, small_maze_cache, SMALL_SCREEN_POS)
     show_player_in_small_maze(window, small_maze)
     show_player_in_middle_maze(window, middle_maze, player)  
     show_number_in_middle_maze(window, middle_maze) 
@@ -303,135 +265,21 @@ def center_player_on_maze(player:Player, maze:Maze):
     else:
         maze.move(-pos_x + (VISIBLE_WIDTH)/2, -pos_y + (VISIBLE_HEIGHT)/2)
         
-def update_player_on_step_change(player:Player):
+def get_range_on_screen(maze:Maze):
     """
-    Minus player life according to the step count.
+    Get the range of cells of a maze that show on its screen at the current maze position.
 
     Args:
-        player: The player object.
+        maze: The large or small Maze object.
 
     Returns:
-        None
+        tuple: (first_row, last_row, first_col, last_col) of the cells in grid coordinates, end excluded.
     """
-    if player.step % STEP_COUNT == 0:
-        sound_effect = pygame.mixer.Sound('assets/sounds/hurt.wav')
-        sound_effect.play()
-        player.life -= 1
-        
-def create_easy_enemy(player:Player, block_in_maze, pos_set:set):
-    """
-    Create easy enemies.
-
-    Args:
-        player: The player object.
-        block_in_maze: The number of blocks in each row and column of the maze.
-        pos_set: The set of positions.
-
-    Returns:
-        dict: Dictionary of easy enemies.
-    """
-    global my_seed
-    enemy_dict = {}
-    for name in EASY_ENEMY_LIST:
-        image_path = f"assets/image/enemy/{name}/{name}.png"
-        attack = 10 + random.choice([-1,0,1])
-        my_seed += 1
-        defense = 3 + random.choice([-1,0,1])
-        my_seed += 1
-        life = 250 + random.choice([-1,0,1]) * 20
-        my_seed += 1
-        attack_dice = Dice(1,3)
-        defense_dice = Dice(1,3)
-        my_seed += 1
-        pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-        
-        # Generate random position for the enemy ensuring uniqueness
-        while pos in pos_set:
-            my_seed += 1
-            pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-        pos_set.add(pos)
-        block_number = pos[0] * block_in_maze + pos[1]
-        key = (block_number, pos[2], pos[3])
-        enemy = Enemy(name, life, attack, defense, attack_dice, defense_dice, pos, block_in_maze, image_path, key)
-        enemy_dict[key] = enemy
-        
-    return enemy_dict
-
-def create_medium_enemy(player:Player, block_in_maze, pos_set:set):
-    """
-    Create medium enemies.
-
-    Args:
-        player: The player object.
-        block_in_maze: The number of blocks in each row and column of the maze.
-        pos_set: The set of positions.
-
-    Returns:
-        dict: Dictionary of medium enemies.
-    """
-    global my_seed
-    my_seed += 1
-    enemy_dict = {}
-    for name in MEDIUM_ENEMY_LIST:
-        image_path = f"assets/image/enemy/{name}/{name}.png"
-        attack = 13 + random.choice([-1,0,1])
-        my_seed += 1
-        defense = 4 + random.choice([-1,0,1])
-        my_seed += 1
-        life = 400 + random.choice([-1,0,1]) * 20
-        my_seed += 1
-        attack_dice = Dice(1,4)
-        defense_dice = Dice(1,4)
-        
-        # Generate random position for the enemy ensuring uniqueness
-        pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-        while pos in pos_set:
-            my_seed += 1
-            pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-        block_number = pos[0] * block_in_maze + pos[1]
-        key = (block_number, pos[2], pos[3])
-        enemy = Enemy(name, life, attack, defense, attack_dice, defense_dice, pos, block_in_maze, image_path, key)
-        enemy_dict[key] = enemy
-        my_seed += 1
-    return enemy_dict
-
-def create_hard_enemy(player:Player, block_in_maze, pos_set:set):
-    """
-    Create hard enemies.
-
-    Args:
-        player: The player object.
-        block_in_maze: The number of blocks in each row and column of the maze.
-        pos_set: The set of positions.
-
-    Returns:
-        dict: Dictionary of hard enemies.
-    """
-    global my_seed
-    my_seed += 1
-    enemy_dict = {}
-    for name in HARD_ENEMY_LIST:
-        image_path = f"assets/image/enemy/{name}/{name}.png"
-        attack = 15 + random.choice([-1,0,1])
-        my_seed += 1
-        defense = 5 + random.choice([-1,0,1])
-        my_seed += 1
-        life = 500 + random.choice([-1,0,1]) * 20
-        my_seed += 1
-        attack_dice = Dice(1,6)
-        defense_dice = Dice(1,6)
-        
-        # Generate random position for the enemy ensuring uniqueness
-        pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-        while pos in pos_set:
-            my_seed += 1
-            pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-        block_number = pos[0] * block_in_maze + pos[1]
-        key = (block_number, pos[2], pos[3])
-        enemy = Enemy(name, life, attack, defense, attack_dice, defense_dice, pos, block_in_maze, image_path, key)
-        enemy_dict[key] = enemy
-        my_seed += 1
-    return enemy_dict
+    if maze.cell_size == SMALL_MAZE_CELL_SIZE:
+        screen_rect = pygame.Rect(0, 0, SMALL_SCREEN_WIDTH, SMALL_SCREEN_HEIGHT)
+    else:
+        screen_rect = pygame.Rect(0, 0, VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5)
+    return maze.visible_range(screen_rect)
 
 def check_show_enemy(player:Player, maze:Maze, enemy:Enemy):
     """
@@ -461,25 +309,24 @@ def check_show_enemy(player:Player, maze:Maze, enemy:Enemy):
 
     return x_condition and y_condition
 
-def show_enemy_in_maze(enemy_dict:dict[tuple,Enemy], maze:Maze, window:pygame.Surface, player:Player):
+def show_enemy_in_maze(entity_index:SpatialIndex, maze:Maze, window:pygame.Surface, player:Player):
     """
     Show enemies on the maze.
 
     Args:
-        enemy_dict: Dictionary containing enemy positions and Enemy objects.
+        entity_index: The spatial index of the items and enemies.
         maze: The Maze object.
         window: The pygame window.
         player: The player object.
     """
-    for enemy in enemy_dict.values():
-        if maze.cell_size == SMALL_MAZE_CELL_SIZE:
-            image = pygame.image.load("assets/image/danger.png")
-            enemy_image = pygame.transform.smoothscale(image, (maze.cell_size, maze.cell_size))
-        else:
-            image = pygame.image.load(enemy.image_path)
-            enemy_image = pygame.transform.smoothscale(image, (maze.cell_size, maze.cell_size))
+    # Only the blocks on screen are looked up, whatever the number of enemies
+    for enemy in entity_index.get_in_range(maze, "enemy", *get_range_on_screen(maze)):
         if check_show_enemy(player, maze, enemy):
             enemy.visible = True
+            if maze.cell_size == SMALL_MAZE_CELL_SIZE:
+                enemy_image = load_image("assets/image/danger.png", (maze.cell_size, maze.cell_size))
+            else:
+                enemy_image = load_image(enemy.image_path, (maze.cell_size, maze.cell_size))
             enemy_pos_x, enemy_pos_y = enemy.get_absolute_pos(maze)
             player_pos_x, player_pos_y = player.get_absolute_pos(maze)
             if maze.cell_size == SMALL_MAZE_CELL_SIZE:
@@ -488,25 +335,24 @@ def show_enemy_in_maze(enemy_dict:dict[tuple,Enemy], maze:Maze, window:pygame.Su
             else:
                 screen_middle_x = LARGE_SCREEN_POS[0]+(VISIBLE_WIDTH)/2
                 screen_middle_y = LARGE_SCREEN_POS[1]+(VISIBLE_HEIGHT)/2
-            window.blit(enemy_image, (screen_middle_x+(enemy_pos_x-player_pos_x), screen_middle_y+(enemy_pos_y-player_pos_y)))
+            mark_dirty(window.blit(enemy_image, (screen_middle_x+(enemy_pos_x-player_pos_x), screen_middle_y+(enemy_pos_y-player_pos_y))))
     
-def show_enemy_in_middle_maze(window:pygame.Surface, middle_maze:Maze, enemy_dict:dict[tuple,Enemy]):
+def show_enemy_in_middle_maze(window:pygame.Surface, middle_maze:Maze, entity_index:SpatialIndex):
     """
     Show enemies in the middle maze.
 
     Args:
         window: The pygame window.
         middle_maze: The middle maze object.
-        enemy_dict: Dictionary containing enemy positions and Enemy objects.
+        entity_index: The spatial index of the items and enemies.
     """
-    for enemy in enemy_dict.values():
+    for enemy in entity_index.get_all("enemy"):
         if enemy.visible == False or enemy.defeated == True:
             continue
         
-        image = pygame.image.load("assets/image/danger.png")
-        enemy_image = pygame.transform.smoothscale(image, (middle_maze.cell_size, middle_maze.cell_size))
+        enemy_image = load_image("assets/image/danger.png", (middle_maze.cell_size, middle_maze.cell_size))
         pos_x, pos_y = enemy.get_absolute_pos(middle_maze)
-        window.blit(enemy_image, (LARGE_SCREEN_POS[0]+pos_x, LARGE_SCREEN_POS[1]+pos_y))
+        mark_dirty(window.blit(enemy_image, (LARGE_SCREEN_POS[0]+pos_x, LARGE_SCREEN_POS[1]+pos_y)))
         
 def show_enemy_attribute_icon(window:pygame.Surface):
     """
@@ -533,7 +379,7 @@ def show_enemy_attribute_icon(window:pygame.Surface):
         positions[icon] = (ENEMY_INFORMATION_POS[0] + x_offset, ENEMY_INFORMATION_POS[1] + y_offset)
     
     for icon, image in images.items():
-        window.blit(image, positions[icon])
+        mark_dirty(window.blit(image, positions[icon]))
 
 def show_enemy_attribute_value(window:pygame.Surface, enemy:Enemy):
     """
@@ -543,7 +389,7 @@ def show_enemy_attribute_value(window:pygame.Surface, enemy:Enemy):
         window: The pygame window.
         enemy: The Enemy object whose attributes need to be displayed.
     """
-    font = pygame.font.Font(pygame.font.get_default_font(), 25)
+    font = get_font(pygame.font.get_default_font(), 25)
     text_list = [f"{enemy.life}", f"{enemy.attack}", f"{enemy.defense}", f"{enemy.fame}", \
                 f"{enemy.attack_dice.lower_bound}~{enemy.attack_dice.upper_bound}",\
                 f"{enemy.defense_dice.lower_bound}~{enemy.defense_dice.upper_bound}"]
@@ -554,10 +400,10 @@ def show_enemy_attribute_value(window:pygame.Surface, enemy:Enemy):
         y_offset = (idx % 3) * 30  # Calculate the y offset based on the row
         rect = pygame.Rect(ENEMY_INFORMATION_TEXT_RECT_POS[0]+x_offset, ENEMY_INFORMATION_TEXT_RECT_POS[1]+y_offset,\
                             ENEMY_INFORMATION_TEXT_RECT_POS[2], ENEMY_INFORMATION_TEXT_RECT_POS[3])
-        text = font.render(text , True , BLACK)
+        text = render_text(font, text, BLACK)
         text_rect = text.get_rect(center=rect.center)
-        pygame.draw.rect(window, LIGHT_GRAY, rect)
-        window.blit(text, text_rect)
+        mark_dirty(pygame.draw.rect(window, LIGHT_GRAY, rect))
+        mark_dirty(window.blit(text, text_rect))
         
 def show_player_attribute_icon_in_battle(window:pygame.Surface):
     """
@@ -584,7 +430,7 @@ def show_player_attribute_icon_in_battle(window:pygame.Surface):
         positions[icon] = (PLAYER_INFORMATION_BATTLE_POS[0] + x_offset, PLAYER_INFORMATION_BATTLE_POS[1] + y_offset)
     
     for icon, image in images.items():
-        window.blit(image, positions[icon])
+        mark_dirty(window.blit(image, positions[icon]))
 
 def show_player_attribute_value_in_battle(window:pygame.Surface, player:Player):
     """
@@ -594,7 +440,7 @@ def show_player_attribute_value_in_battle(window:pygame.Surface, player:Player):
         window: The pygame window.
         player: The Player object whose attributes need to be displayed.
     """
-    font = pygame.font.Font(pygame.font.get_default_font(), 25)
+    font = get_font(pygame.font.get_default_font(), 25)
     text_list = [f"{player.life}", f"{player.attack}", f"{player.defense}", f"{player.fame}", \
                 f"{player.attack_dice.lower_bound}~{player.attack_dice.upper_bound}",\
                 f"{player.defense_dice.lower_bound}~{player.defense_dice.upper_bound}"]
@@ -605,10 +451,10 @@ def show_player_attribute_value_in_battle(window:pygame.Surface, player:Player):
         y_offset = (idx % 3) * 30  # Calculate the y offset based on the row
         rect = pygame.Rect(PLAYER_INFORMATION_TEXT_BATTLE_RECT_POS[0]+x_offset, PLAYER_INFORMATION_TEXT_BATTLE_RECT_POS[1]+y_offset,\
                             PLAYER_INFORMATION_TEXT_BATTLE_RECT_POS[2], PLAYER_INFORMATION_TEXT_BATTLE_RECT_POS[3])
-        text = font.render(text , True , BLACK)
+        text = render_text(font, text, BLACK)
         text_rect = text.get_rect(center=rect.center)
-        pygame.draw.rect(window, LIGHT_GRAY, rect)
-        window.blit(text, text_rect)
+        mark_dirty(pygame.draw.rect(window, LIGHT_GRAY, rect))
+        mark_dirty(window.blit(text, text_rect))
 
 def show_turn_icon(window:pygame.Surface, turn:str):
     """
@@ -623,73 +469,12 @@ def show_turn_icon(window:pygame.Surface, turn:str):
     sword_image = load_and_resize_image("assets/image/sword.png", (TURN_ICON_IMAGE_SIZE, TURN_ICON_IMAGE_SIZE))
     defense_image = load_and_resize_image("assets/image/defense.png", (TURN_ICON_IMAGE_SIZE, TURN_ICON_IMAGE_SIZE))
     if turn == "attack":
-        window.blit(sword_image, player_turn_pos)
-        window.blit(defense_image, enemy_turn_pos)
+        mark_dirty(window.blit(sword_image, player_turn_pos))
+        mark_dirty(window.blit(defense_image, enemy_turn_pos))
     else:
-        window.blit(defense_image, player_turn_pos)
-        window.blit(sword_image, enemy_turn_pos)       
+        mark_dirty(window.blit(defense_image, player_turn_pos))
+        mark_dirty(window.blit(sword_image, enemy_turn_pos))       
         
-def update_player_attribute_after_winning_battle(player:Player, enemy:Enemy):
-    """
-    Update player's attributes after winning a battle.
-
-    Args:
-        player: The Player object.
-        enemy: The Enemy object defeated by the player.
-    """
-    enemy.defeated = True
-    player.attack += enemy.attack // 10
-    player.defense += enemy.defense // 5
-    player.maximum_life += enemy.initial_life // 10
-    player.life += enemy.initial_life // 10
-    player.fame += enemy.fame
-    
-def use_skill_during_battle(player:Player, enemy:Enemy, window:pygame.Surface, helper:Helper):
-    """
-    Use a skill during battle mode.
-
-    Args:
-        player: The Player object.
-        enemy: The Enemy object being battled.
-        window: The pygame window.
-        helper: The Helper object representing the skill being used.
-    """
-    helper_param_dict = update_helper_param(player, enemy)
-    helper.use_skill(*helper_param_dict[helper.name])
-    helper.reduce_remaining_rounds()
-    if helper.rounds <= 0:
-        helper.activate = False
-    show_enemy_attribute_value(window, enemy)
-    show_player_attribute_value_in_battle(window, player)
-    show_player_attribute_value(window, player)
-    
-def use_skill_in_game_mode(player:Player, window:pygame.Surface, helper:Helper):
-    """
-    Use a skill in game mode.
-
-    Args:
-        player: The Player object.
-        window: The pygame window.
-        helper: The Helper object representing the skill being used.
-    """
-    helper_param_dict = update_helper_param(player, None)
-    helper.use_skill(*helper_param_dict[helper.name])
-    helper.reduce_remaining_rounds()
-    if helper.rounds <= 0:
-        helper.activate = False
-    show_player_attribute_value(window, player)
-    
-def update_helper_activate(helper_dict:dict[str,Helper]):
-    """
-    Update the activation status of helpers. (Use after battle)
-
-    Args:
-        helper_dict: A dictionary containing helper objects.
-    """
-    for helper in helper_dict.values():
-        if helper.activate and "game" not in helper.allow_mode:
-            helper.activate = False
-
 def show_helper_effect(window:pygame.Surface, helper:Helper):
     """
     Display the visual effect of a helper's skill.
@@ -698,15 +483,11 @@ def show_helper_effect(window:pygame.Surface, helper:Helper):
         window: The pygame window.
         helper: The Helper object whose effect is being displayed.
     """
-    pygame.mixer.set_num_channels(2)
-    voice = pygame.mixer.Channel(1)
     image = load_and_resize_image(f"assets/image/portrait/{helper.name}_effect.jpg", (730, 730))
-    window.blit(image, (LARGE_SCREEN_POS[0], LARGE_SCREEN_POS[1]))
-    pygame.display.update()
-    sound_effect = pygame.mixer.Sound(f'assets/sounds/{helper.name}_effect.wav')
-    voice.play(sound_effect)
-    while voice.get_busy():
-        continue
+    mark_dirty(window.blit(image, (LARGE_SCREEN_POS[0], LARGE_SCREEN_POS[1])))
+    update_display()
+    voice = SOUND_BANK.play_voice(f'{helper.name}_effect.wav')
+    wait_for_channel(voice)
     
 def show_player_damage(window:pygame.Surface, player_damage):
     """
@@ -716,12 +497,12 @@ def show_player_damage(window:pygame.Surface, player_damage):
         window: The pygame window.
         player_damage: The amount of damage taken by the player.
     """
-    font = pygame.font.Font(pygame.font.get_default_font(), 25)
-    text = font.render(f"-{player_damage}", True , RED)
+    font = get_font(pygame.font.get_default_font(), 25)
+    text = render_text(font, f"-{player_damage}", RED)
     rect = pygame.Rect(PLAYER_DAMAGE_RECT_POS)
     text_rect = text.get_rect(center=rect.center)
-    window.blit(text, text_rect)
-    pygame.display.update()
+    mark_dirty(window.blit(text, text_rect))
+    update_display()
     
 def show_enemy_damage(window:pygame.Surface, enemy_damage):
     """
@@ -731,259 +512,222 @@ def show_enemy_damage(window:pygame.Surface, enemy_damage):
         window: The pygame window.
         enemy_damage: The amount of damage taken by the enemy.
     """
-    font = pygame.font.Font(pygame.font.get_default_font(), 25)
-    text = font.render(f"-{enemy_damage}", True , RED)
+    font = get_font(pygame.font.get_default_font(), 25)
+    text = render_text(font, f"-{enemy_damage}", RED)
     rect = pygame.Rect(ENEMY_DAMAGE_RECT_POS)
     text_rect = text.get_rect(center=rect.center)
-    window.blit(text, text_rect)
-    pygame.display.update()
+    mark_dirty(window.blit(text, text_rect))
+    update_display()
          
-def handle_helper_effect(window:pygame.Surface, helper_dict:dict[str,Helper], enemy:Enemy, player:Player, execution_time:str, mode:str):
+def show_helper_skill(window:pygame.Surface, state:GameState):
     """
-    Handle the effect of a helper's skill during battle.
+    Display the attributes changed by a helper's skill.
+
+    Args:
+        window: The pygame window.
+        state: The GameState the skill was used in.
+    """
+    if state.mode == "battle":
+        show_enemy_attribute_value(window, state.enemy)
+        show_player_attribute_value_in_battle(window, state.player)
+    show_player_attribute_value(window, state.player)
+    show_helper(window, state.helper_dict, state.player, state.mode)
+
+def show_helper_activation(window:pygame.Surface, state:GameState, helper:Helper):
+    """
+    Display the activation of a helper: the coins paid, the helper portraits and the helper's effect.
+
+    Args:
+        window: The pygame window.
+        state: The GameState the helper was activated in.
+        helper: The Helper object activated.
+    """
+    show_player_attribute_value(window, state.player)
+    show_helper(window, state.helper_dict, state.player, state.mode)
+    show_helper_effect(window, helper)
+
+def show_battle_odds(window:pygame.Surface, odds):
+    """
+    Display the odds of the battle under the dice instruction.
+
+    Args:
+        window: The pygame window.
+        odds: The win probability and the expected life change, as returned by request_battle_odds,
+            or None while they are being computed.
+    """
+    rect = pygame.Rect(BATTLE_ODDS_RECT_POS)
+    battle_background_image = load_and_resize_image("assets/image/battle_background.png", (VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5))
+    mark_dirty(window.blit(battle_background_image, rect, rect.move(-LARGE_SCREEN_POS[0], -LARGE_SCREEN_POS[1])))
+    font = get_font(pygame.font.get_default_font(), 25)
+    if odds is None:
+        text = render_text(font, "Computing Battle Odds...", BLACK)
+    else:
+        win_probability, life_change = odds
+        text = render_text(font, f"Win Chance {win_probability:.1%}   Expected Life Change {round(life_change):+d}", BLACK)
+    mark_dirty(window.blit(text, text.get_rect(center=rect.center)))
+
+def show_battle_scene(window:pygame.Surface, player:Player, enemy:Enemy, turn:str, sprites, odds):
+    """
+    Redraw the battle scene with the given sprites and update the display.
 
     Args:
         window: The pygame window.
-        helper_dict: A dictionary containing helper objects.
-        enemy: The Enemy object being battled.
         player: The Player object.
-        execution_time: The time at which the skill is executed.
-    
-    Returns:
-        str: The result of the battle ("win" if enemy is defeated, None otherwise).
+        enemy: The Enemy object being battled.
+        turn: The current turn ("attack" or "defense").
+        sprites: The (image, pos) pairs to draw over the background, in order.
+        odds: The odds of the battle to show.
     """
-    for helper in helper_dict.values():
-        if helper.activate and helper.skill_execution_time == execution_time:
-            use_skill_during_battle(player, enemy, window, helper)
-            show_helper(window, helper_dict, player, mode)
-        if enemy.life <= 0:
-            update_player_attribute_after_winning_battle(player, enemy)
-            update_helper_activate(helper_dict)
-            return "win"
-        if enemy.defeated:
-            update_helper_activate(helper_dict)
-            return "win" 
-   
-def battle(player:Player, enemy:Enemy, window:pygame.Surface, helper_dict:dict[str,Helper], helper_rect_dict:dict[str, pygame.Rect]):
+    battle_background_image = load_and_resize_image("assets/image/battle_background.png", (VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5))
+    mark_dirty(window.blit(battle_background_image, LARGE_SCREEN_POS))
+    for image, pos in sprites:
+        mark_dirty(window.blit(image, pos))
+    font = get_font(pygame.font.get_default_font(), 25)
+    text = render_text(font, "Press R To Roll Dice", BLACK)
+    text_width, text_height = text.get_rect().size
+    mark_dirty(window.blit(text, (LARGE_SCREEN_POS[0]+20+(VISIBLE_WIDTH-text_width)//2,280)))
+    show_battle_odds(window, odds)
+    show_enemy_attribute_value(window, enemy)
+    show_enemy_attribute_icon(window)
+    show_player_attribute_value_in_battle(window, player)
+    show_player_attribute_icon_in_battle(window)
+    show_player_attribute_value(window, player)
+    show_turn_icon(window, turn)
+    update_display()
+
+def post_battle_odds_event():
+    """
+    Wake up the battle loop once the odds it waits for are ready; called on the battle odds worker thread.
+    """
+    pygame.event.post(pygame.event.Event(BATTLE_ODDS_EVENT))
+
+def battle(state:GameState, window:pygame.Surface, helper_rect_dict:dict[str, pygame.Rect]):
     """
-    Function to handle the battle between the player and an enemy.
+    Function to show the battle between the player and an enemy, until the battle is over.
 
     Args:
-        player (Player): The player object.
-        enemy (Enemy): The enemy object.
+        state (GameState): The game state, in battle mode.
         window (pygame.Surface): The pygame window.
-        helper_dict (dict): Dictionary containing helper objects.
         helper_rect_dict (dict): Dictionary containing helper rectangles.
     """
-    mode = "battle"
+    player, enemy, helper_dict = state.player, state.enemy, state.helper_dict
     cursor_state = "arrow"
-    turn = "attack"
     pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
     
     # Load and play the battle music
-    pygame.mixer.music.load('assets/sounds/Luffy Fierce Attack.mp3')
-    pygame.mixer.music.play(-1)
+    play_music('Luffy Fierce Attack.mp3')
     
     # Load and display battle background image
     battle_background_image = load_and_resize_image("assets/image/battle_background.png", (VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5))
-    window.blit(battle_background_image, LARGE_SCREEN_POS)
+    mark_dirty(window.blit(battle_background_image, LARGE_SCREEN_POS))
     
     # Display the enemy image
     enemy_image = load_and_resize_image(enemy.image_path, (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE)) 
-    window.blit(enemy_image, (460, 600))
+    mark_dirty(window.blit(enemy_image, (460, 600)))
     
     # Display player image
     player_image = load_and_resize_image("assets/image/move_left/frame_2.png", (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE))
-    window.blit(player_image, (800, 600))
+    mark_dirty(window.blit(player_image, (800, 600)))
     
     # Display instruction for rolling dice
-    font = pygame.font.Font(pygame.font.get_default_font(), 25)
-    text = font.render("Press R To Roll Dice", True , BLACK)
+    font = get_font(pygame.font.get_default_font(), 25)
+    text = render_text(font, "Press R To Roll Dice", BLACK)
     text_width, text_height = text.get_rect().size
-    window.blit(text, (LARGE_SCREEN_POS[0]+20+(VISIBLE_WIDTH-text_width)//2,280))
+    mark_dirty(window.blit(text, (LARGE_SCREEN_POS[0]+20+(VISIBLE_WIDTH-text_width)//2,280)))
+    
+    # Display the odds of the battle, updated after each round and each helper activation; they are
+    # computed on the battle odds worker, along with the odds of activating each affordable helper
+    odds = request_battle_odds(player, enemy, state.turn, helper_dict, post_battle_odds_event)
+    show_battle_odds(window, odds)
+    prefetch_battle_odds(player, [enemy], helper_dict, [name for name, helper in helper_dict.items() if check_helper_validate(player, state.mode, helper)])
     
     # Display turn icon, player and enemy attribute icons, and their values
-    show_turn_icon(window, turn)
-    show_helper(window, helper_dict, player, mode)
+    show_turn_icon(window, state.turn)
+    show_helper(window, helper_dict, player, state.mode)
     show_enemy_attribute_icon(window)
     show_enemy_attribute_value(window, enemy)
     show_player_attribute_icon_in_battle(window)
     show_player_attribute_value_in_battle(window, player)
     
-    pygame.display.update()
-    pygame.image.save(window, "./output/Battle.jpeg")
+    update_display()
+    ARTIFACT_WRITER.save_surface(window, "./output/Battle.jpeg")
     
+    standing_sprites = [(enemy_image, (460, 600)), (player_image, (800, 600))]
     
-    running = True 
-    global my_seed
-    
-    while running:
-        for event in pygame.event.get():
+    while True:
+        for event in get_events():
             
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and turn == "attack":
-                    
-                    # Handle the effect of helper skill before player's attack
-                    result = handle_helper_effect(window, helper_dict, enemy, player, "before_attack", mode)
-                    if result == "win":
-                        return
-                        
-                    # Roll dice for player's attack and enemy's defense
-                    player_attack_dice = player.attack_dice.roll_dice()
-                    enemy_defense_dice = enemy.defense_dice.roll_dice()
-                    enemy_defense_image = load_and_resize_image(f"assets/image/enemy/{enemy.name}/defend.png", (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE))
-                    
-                    # Display frames for player's attack animation
-                    frames_folder = "./assets/image/attack"
-                    frame_files = [f"{frames_folder}/attack_{i}.png" for i in range(1, 4)]
-                    frames = [load_and_resize_image(file, (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE)) for file in frame_files]
-                    for image, pos in zip(frames, PLAYER_ATTACK_POS_LIST):
-                        window.blit(battle_background_image, LARGE_SCREEN_POS)
-                        if image == frames[-1]:
-                            window.blit(enemy_defense_image, (460, 600))
-                        else:
-                            window.blit(enemy_image, (460, 600))
-                        window.blit(image, pos)
-                        window.blit(text, (LARGE_SCREEN_POS[0]+20+(VISIBLE_WIDTH-text_width)//2,280))
-                        show_enemy_attribute_value(window, enemy)
-                        show_enemy_attribute_icon(window)
-                        show_player_attribute_value_in_battle(window, player)
-                        show_player_attribute_icon_in_battle(window)
-                        show_player_attribute_value(window, player)
-                        show_turn_icon(window, turn)
-                        pygame.display.update()
-                        # pygame.time.delay(DELAY_TIME)
-                     
-                    # Calculate player's damage to the enemy   
-                    player_damage = player.attack * player_attack_dice - enemy.defense * enemy_defense_dice
-                    if player_damage < 0:
-                        player_damage = 0
-                    show_player_damage(window, player_damage)
-                    sound_effect = pygame.mixer.Sound('assets/sounds/attack.wav')
-                    sound_effect.play()
-                    time.sleep(0.5)
-                    
-                    # Update enemy's life after player's attack
-                    enemy.life -= player_damage
-                    if enemy.life <= 0:
-                        update_player_attribute_after_winning_battle(player, enemy)
-                        update_helper_activate(helper_dict)
-                        return 
-                    
-                    # Handle the effect of helper skill after player's attack
-                    result = handle_helper_effect(window, helper_dict, enemy, player, "after_attack", mode)
-                    if result == "win":
-                        return
-                    
-                    # Change turn to defense
-                    turn = "defense"
-                    
-                elif event.key == pygame.K_r and turn == "defense":
-                    # Handle the effect of helper skill before enemy's attack
-                    result = handle_helper_effect(window, helper_dict, enemy, player, "before_defense", mode)
-                    if result == "win":
-                        return
-                    
-                    # Roll dice for player's defense and enemy's attack
-                    player_defense_dice = player.defense_dice.roll_dice()
-                    enemy_attack_dice = enemy.attack_dice.roll_dice()
-                    player_defense_image = load_and_resize_image(f"assets/image/defend.png", (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE))
-                    frame_files = [f"./assets/image/enemy/{enemy.name}/attack_{i}.png" for i in range(1, 4)]
-                    frames = [load_and_resize_image(file, (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE)) for file in frame_files]
-                    for image, pos in zip(frames, ENEMY_ATTACK_POS_LIST):
-                        window.blit(battle_background_image, LARGE_SCREEN_POS)
-                        if image == frames[-1]:
-                            window.blit(player_defense_image, (800, 600))
-                        else:
-                            window.blit(player_image, (800, 600))
-                        window.blit(image, pos)
-                        window.blit(text, (LARGE_SCREEN_POS[0]+20+(VISIBLE_WIDTH-text_width)//2,280))
-                        show_enemy_attribute_value(window, enemy)
-                        show_enemy_attribute_icon(window)
-                        show_player_attribute_value_in_battle(window, player)
-                        show_player_attribute_icon_in_battle(window)
-                        show_player_attribute_value(window, player)
-                        show_turn_icon(window, turn)
-                        pygame.display.update()
-                        
-                    # Calculate enemy's damage to the player
-                    enemy_damage = enemy.attack * enemy_attack_dice - player.defense * player_defense_dice
-                    if enemy_damage < 0:
-                        enemy_damage = 0
-                    show_enemy_damage(window, enemy_damage)
-                    sound_effect = pygame.mixer.Sound('assets/sounds/hurt.wav')
-                    sound_effect.play()
-                    time.sleep(0.5)
-                    player.life -= enemy_damage
-                    
-                    # Handle the effect of helper skill after enemy's attack
-                    result = handle_helper_effect(window, helper_dict, enemy, player, "after_defense", mode)
-                    if result == "win":
+                if event.key == pygame.K_r:
+                    # Roll the dice of the current turn and show each step of it
+                    for game_event in state.play(("roll",)):
+                        if game_event[0] == "helper_skill":
+                            show_helper_skill(window, state)
+                        elif game_event[0] == "player_attack":
+                            # Display frames for player's attack animation
+                            enemy_defense_image = load_and_resize_image(f"assets/image/enemy/{enemy.name}/defend.png", (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE))
+                            frames_folder = "assets/image/attack"
+                            frame_files = [f"{frames_folder}/attack_{i}.png" for i in range(1, 4)]
+                            frames = [load_and_resize_image(file, (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE)) for file in frame_files]
+                            for image, pos in zip(frames, PLAYER_ATTACK_POS_LIST):
+                                defender_image = enemy_defense_image if image == frames[-1] else enemy_image
+                                show_battle_scene(window, player, enemy, state.turn, [(defender_image, (460, 600)), (image, pos)], odds)
+                            show_player_damage(window, game_event[1])
+                            play_sound('attack.wav')
+                            time.sleep(0.5)
+                        elif game_event[0] == "enemy_attack":
+                            # Display frames for enemy's attack animation
+                            player_defense_image = load_and_resize_image(f"assets/image/defend.png", (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE))
+                            frame_files = [f"assets/image/enemy/{enemy.name}/attack_{i}.png" for i in range(1, 4)]
+                            frames = [load_and_resize_image(file, (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE)) for file in frame_files]
+                            for image, pos in zip(frames, ENEMY_ATTACK_POS_LIST):
+                                defender_image = player_defense_image if image == frames[-1] else player_image
+                                show_battle_scene(window, player, enemy, state.turn, [(defender_image, (800, 600)), (image, pos)], odds)
+                            show_enemy_damage(window, game_event[1])
+                            play_sound('hurt.wav')
+                            time.sleep(0.5)
+                        elif game_event[0] == "round_end":
+                            # Redraw the battle scene after each round
+                            odds = request_battle_odds(player, enemy, state.turn, helper_dict, post_battle_odds_event)
+                            show_battle_scene(window, player, enemy, state.turn, standing_sprites, odds)
+                    if state.mode != "battle":
                         return
-                    
-                    # Check if player's life is below 0
-                    if player.life <= 0:
-                        return
-                    
-                    turn = "attack"
-                
-                # Redraw the battle scene after each action
-                window.blit(battle_background_image, LARGE_SCREEN_POS)
-                window.blit(enemy_image, (460, 600))
-                window.blit(player_image, (800, 600))
-                window.blit(text, (LARGE_SCREEN_POS[0]+20+(VISIBLE_WIDTH-text_width)//2,280))
-                show_enemy_attribute_value(window, enemy)
-                show_enemy_attribute_icon(window)
-                show_player_attribute_value_in_battle(window, player)
-                show_player_attribute_icon_in_battle(window)
-                show_player_attribute_value(window, player)
-                show_turn_icon(window, turn)
-                pygame.display.update()
-                
-                # Reset enemy's defense and attack attributes
-                enemy.defense = enemy.initial_defense
-                enemy.attack = enemy.initial_attack
-                # print(enemy.life, player.life)
+                else:
+                    # Redraw the battle scene after each action
+                    show_battle_scene(window, player, enemy, state.turn, standing_sprites, odds)
             
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 # Play sound effect on mouse click
-                sound_effect = pygame.mixer.Sound('assets/sounds/mouse-click.mp3')
-                sound_effect.play()
+                play_sound('mouse-click.mp3')
                 
-                # Check if a helper is clicked and available, then activate it
-                for name, helper in helper_dict.items():
-                    if helper_rect_dict[name].collidepoint(event.pos) and check_helper_validate(player, mode, helper):
-                        helper.activate = True
-                        helper.available = False
-                        player.coin -= helper.cost
-                        show_player_attribute_value(window, player)
-                        show_helper(window, helper_dict, player, mode)
-                        show_helper_effect(window, helper)
-                        pygame.display.update()
-                        
-                        # Handle the effect of helper skill right away
-                        result = handle_helper_effect(window, helper_dict, enemy, player, "right_away", mode)
-                        if result == "win":
-                            return      
+                # Check if a helper is clicked, then activate it if it is available
+                for name in helper_dict:
+                    if helper_rect_dict[name].collidepoint(event.pos):
+                        for game_event in state.play(("helper", name)):
+                            if game_event[0] == "helper_activated":
+                                show_helper_activation(window, state, game_event[1])
+                                update_display()
+                            elif game_event[0] == "helper_skill":
+                                show_helper_skill(window, state)
+                        if state.mode != "battle":
+                            return
+                        odds = request_battle_odds(player, enemy, state.turn, helper_dict, post_battle_odds_event)
                          
                 # Redraw the battle scene after each action
-                window.blit(battle_background_image, LARGE_SCREEN_POS)
-                window.blit(enemy_image, (460, 600))
-                window.blit(player_image, (800, 600))
-                window.blit(text, (LARGE_SCREEN_POS[0]+20+(VISIBLE_WIDTH-text_width)//2,280))
-                show_enemy_attribute_value(window, enemy)
-                show_enemy_attribute_icon(window)
-                show_player_attribute_value_in_battle(window, player)
-                show_player_attribute_icon_in_battle(window)
-                show_player_attribute_value(window, player)
-                show_turn_icon(window, turn)
-                pygame.display.update()
+                show_battle_scene(window, player, enemy, state.turn, standing_sprites, odds)
+        
+        # Show the odds once the worker has computed them
+        if odds is None:
+            odds = request_battle_odds(player, enemy, state.turn, helper_dict, post_battle_odds_event)
+            if odds is not None:
+                show_battle_odds(window, odds)
+                update_display()
         
         new_cursor_state = "arrow"         
             
         # Change cursor to hand icon if hovering over a helper and validate
         for helper, helper_rect in helper_rect_dict.items():
-            if helper_rect.collidepoint(pygame.mouse.get_pos()) and check_helper_validate(player, mode, helper_dict[helper]):
+            if helper_rect.collidepoint(pygame.mouse.get_pos()) and check_helper_validate(player, state.mode, helper_dict[helper]):
                 new_cursor_state = "hand"
         
         if new_cursor_state != cursor_state:
@@ -992,21 +736,21 @@ def battle(player:Player, enemy:Enemy, window:pygame.Surface, helper_dict:dict[s
             else:
                 pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
             cursor_state = new_cursor_state
-                    
+
 def load_and_resize_image(image_path, size):
     """
     Load an image from the given path and resize it to the specified size.
 
+    The image comes from the shared image cache, so it is only read and resized once.
+
     Args:
         image_path (str): The path to the image file.
         size (tuple): The size to resize the image to.
 
     Returns:
-        pygame.Surface: The resized image.
+        pygame.Surface: The resized image, shared with other callers.
     """
-    image = pygame.image.load(image_path).convert_alpha()
-    resize_image = pygame.transform.smoothscale(image, size)
-    return resize_image
+    return load_image(image_path, size, alpha=True)
 
 def show_player_attribute_value(window:pygame.Surface, player:Player):
     """
@@ -1016,7 +760,7 @@ def show_player_attribute_value(window:pygame.Surface, player:Player):
         window (pygame.Surface): The pygame window.
         player (Player): The player object.
     """
-    font = pygame.font.Font(pygame.font.get_default_font(), 25)
+    font = get_font(pygame.font.get_default_font(), 25)
     text_list = [f"{player.life}/{player.maximum_life}", f"{player.attack}", f"{player.defense}", f"{player.step}",\
                 f"{player.coin}", f"{player.attack_dice.lower_bound}~{player.attack_dice.upper_bound}",\
                 f"{player.defense_dice.lower_bound}~{player.defense_dice.upper_bound}", f"{player.fame}"]
@@ -1028,12 +772,12 @@ def show_player_attribute_value(window:pygame.Surface, player:Player):
         rect = pygame.Rect(PLAYER_INFORMATION_TEXT_RECT_POS[0]+x_offset, PLAYER_INFORMATION_TEXT_RECT_POS[1]+y_offset,\
                             PLAYER_INFORMATION_TEXT_RECT_POS[2], PLAYER_INFORMATION_TEXT_RECT_POS[3])
         if idx == 0 and player.life <= player.maximum_life // 5:
-            text = font.render(text , True , RED)
+            text = render_text(font, text, RED)
         else:
-            text = font.render(text , True , BLACK)
+            text = render_text(font, text, BLACK)
         text_rect = text.get_rect(center=rect.center)
-        pygame.draw.rect(window, LIGHT_BROWN, rect)
-        window.blit(text, text_rect)
+        mark_dirty(pygame.draw.rect(window, LIGHT_BROWN, rect))
+        mark_dirty(window.blit(text, text_rect))
 
 def show_player_attribute_icon(window:pygame.Surface):
     """
@@ -1060,7 +804,7 @@ def show_player_attribute_icon(window:pygame.Surface):
         positions[icon] = (PLAYER_INFORMATION_POS[0] + x_offset, PLAYER_INFORMATION_POS[1] + y_offset)
     
     for icon, image in images.items():
-        window.blit(image, positions[icon])
+        mark_dirty(window.blit(image, positions[icon]))
         
 def show_helper(window:pygame.Surface, helper_dict:dict[str,Helper], player:Player, mode:str):
     """
@@ -1092,7 +836,7 @@ def show_helper(window:pygame.Surface, helper_dict:dict[str,Helper], player:Play
         positions[helper] = (HELPER_PORTRAIT_POS[0] + x_offset, HELPER_PORTRAIT_POS[1] + y_offset)
     
     for helper, image in images.items():
-        window.blit(image, positions[helper])
+        mark_dirty(window.blit(image, positions[helper]))
         if helper_dict[helper].activate:
             pygame.draw.rect(window, RED, (positions[helper][0], positions[helper][1],\
                                             HELPER_PORTRAIT_SIZE, HELPER_PORTRAIT_SIZE), 3)
@@ -1108,7 +852,7 @@ def show_helper_cost(window:pygame.Surface, helper_dict:dict[str,Helper]):
     image_path = f"assets/image/coin.png"
     coin_image = load_and_resize_image(image_path, (HELPER_COIN_SIZE, HELPER_COIN_SIZE))
         
-    font = pygame.font.Font(pygame.font.get_default_font(), 15)
+    font = get_font(pygame.font.get_default_font(), 15)
     text_list = []
     for helper in helper_dict.values():
         text_list.append(f"{helper.cost}")
@@ -1120,30 +864,14 @@ def show_helper_cost(window:pygame.Surface, helper_dict:dict[str,Helper]):
         y_offset = y_offsets[idx // 3]  # Calculate the y offset based on the row
         rect = pygame.Rect(HELPER_RECT_POS[0]+x_offset, HELPER_RECT_POS[1]+y_offset,\
                             HELPER_RECT_POS[2], HELPER_RECT_POS[3])
-        text = font.render(text , True , BLACK)
+        text = render_text(font, text, BLACK)
         text_rect = text.get_rect(center=rect.center)
         top_right_corner = text_rect.topright
         # pygame.draw.rect(window, LIGHT_BROWN, rect)
-        window.blit(text, text_rect)
+        mark_dirty(window.blit(text, text_rect))
         # Show the coin after the cost text
-        window.blit(coin_image, (top_right_corner[0]+5, top_right_corner[1]))
+        mark_dirty(window.blit(coin_image, (top_right_corner[0]+5, top_right_corner[1])))
               
-def create_helper():
-    """
-    Create helper objects and store them in a dictionary.
-
-    Returns:
-        dict: A dictionary containing helper objects with helper names as keys.
-    """
-    helper_dict = {}
-    helper_dict["Zoro"] = Helper("Zoro", 10, skill.never_die, 3, ["game", "battle"], "after_defense")
-    helper_dict["Sanji"] = Helper("Sanji", 8, skill.huge_damage, 1, ["battle"], "right_away")
-    helper_dict["Nami"] = Helper("Nami", 8, skill.remove_defense, 5, ["battle"], "before_attack")
-    helper_dict["Usopp"] = Helper("Usopp", 6, skill.escape, 1, ["battle"], "right_away")
-    helper_dict["Chopper"] = Helper("Chopper", 3, skill.add_life, 10, ["game", "battle"], "before_attack")
-    helper_dict["Brook"] = Helper("Brook", 7, skill.half_the_attack, 3, ["battle"], "before_attack")
-    return helper_dict
-
 def create_helper_rect_dict():
     helper_rect_dict = {}
     y_offsets = [0, 95]
@@ -1156,40 +884,6 @@ def create_helper_rect_dict():
     return helper_rect_dict
     
 
-def update_helper_param(player:Player, enemy:Enemy):
-    """
-    Update helper skill parameters based on the player and enemy attributes.
-
-    Args:
-        player (Player): The player object.
-        enemy (Enemy): The enemy object.
-
-    Returns:
-        dict: A dictionary containing helper parameters with helper names as keys.
-    """
-    helper_param_dict = {}
-    helper_param_dict["Zoro"] = [player]
-    helper_param_dict["Sanji"] = [player, enemy]
-    helper_param_dict["Nami"] = [enemy]
-    helper_param_dict["Usopp"] = [player, enemy]
-    helper_param_dict["Chopper"] = [player, player.maximum_life//5]
-    helper_param_dict["Brook"] = [enemy]
-    return helper_param_dict
-   
-def check_helper_validate(player:Player, mode:str, helper:Helper):
-    """
-    Check if a helper is valid for activation.
-
-    Args:
-        player (Player): The player object.
-        mode (str): The current game mode.
-        helper (Helper): The helper object to be checked.
-
-    Returns:
-        bool: True if the helper can be activated, False otherwise.
-    """
-    return player.coin >= helper.cost and mode in helper.allow_mode and helper.available
-  
 def show_menu_page_background(window:pygame.Surface):
     """
     Display the background image and title text on the menu page.
@@ -1197,64 +891,19 @@ def show_menu_page_background(window:pygame.Surface):
     Args:
         window (pygame.Surface): The pygame window.
     """
-    window.fill(BEIGE)
-    image = pygame.image.load("assets/image/Home page.png")
-    menu_image = pygame.transform.smoothscale(image, (SCREEN_WIDTH, 1080))
-    window.blit(menu_image, (0,0))
+    mark_dirty(window.fill(BEIGE))
+    menu_image = load_image("assets/image/Home page.png", (SCREEN_WIDTH, 1080))
+    mark_dirty(window.blit(menu_image, (0,0)))
     
-    font = pygame.font.Font("assets/font/one piece font.ttf", 100)
-    text = font.render("ONE PIECE" , True , BLACK)
+    font = get_font("assets/font/one piece font.ttf", 100)
+    text = render_text(font, "ONE PIECE", BLACK)
     text_width, text_height = text.get_rect().size
-    window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 40))
+    mark_dirty(window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 40)))
     
-    text = font.render("MAZE GAME" , True , BLACK)
+    text = render_text(font, "MAZE GAME", BLACK)
     text_width, text_height = text.get_rect().size
-    window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 140))
+    mark_dirty(window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 140)))
    
-def generate_random_position(block_in_maze, pos_set:set):
-    """
-    Generate a random position for game elements in the maze.
-
-    Args:
-        block_in_maze (int): The number of blocks in the maze.
-        pos_set (set): A set containing existing positions in the maze.
-
-    Returns:
-        tuple: A tuple representing the generated position.
-    """
-    global my_seed
-    pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-        
-    # avoid overlap with finish flag
-    while pos in pos_set:
-        my_seed += 1
-        pos = (random.choice(range(block_in_maze)),random.choice(range(block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
-    
-    pos_set.add(pos)
-    return pos
-
-def create_item_dict(item_class, block_in_maze, counts_dict, pos_set):
-    """
-    Create a dictionary of items with randomly generated positions in the maze.
-
-    Args:
-        item_class: The class of the item to be created.
-        block_in_maze (int): The number of blocks in the maze.
-        counts_dict (dict): A dictionary containing the count of items for each block configuration.
-        pos_set (set): A set containing existing positions in the maze.
-
-    Returns:
-        dict: A dictionary containing items with their positions as keys.
-    """
-    item_dict = {}
-    count = counts_dict[block_in_maze]
-    for i in range(count):
-        pos = generate_random_position(block_in_maze, pos_set)
-        block_number = pos[0] * block_in_maze + pos[1]
-        key = (block_number, pos[2], pos[3])
-        item_dict[key] = item_class(pos, block_in_maze, key)
-    return item_dict
-
 def check_show_item(player:Player, maze:Maze, item:Item):
     """
     Check if an item should be shown on the screen based on the player's position and maze configuration.
@@ -1283,12 +932,12 @@ def check_show_item(player:Player, maze:Maze, item:Item):
 
     return x_condition and y_condition
 
-def show_items_in_maze(item_dict:dict[tuple, Item], maze:Maze, window:pygame.Surface, player:Player, item_type:str):
+def show_items_in_maze(entity_index:SpatialIndex, maze:Maze, window:pygame.Surface, player:Player, item_type:str):
     """
     Show items in the maze on the screen.
 
     Args:
-        item_dict (dict): A dictionary containing items with their positions as keys.
+        entity_index (SpatialIndex): The spatial index of the items and enemies.
         maze (Maze): The maze object.
         window (pygame.Surface): The pygame window.
         player (Player): The player object.
@@ -1296,7 +945,9 @@ def show_items_in_maze(item_dict:dict[tuple, Item], maze:Maze, window:pygame.Sur
     """
     item_image_path = f"assets/image/{item_type}.png"
     item_image = load_and_resize_image(item_image_path, (maze.cell_size, maze.cell_size))
-    for item in item_dict.values():
+    blits = []
+    # Only the blocks on screen are looked up, whatever the number of items
+    for item in entity_index.get_in_range(maze, item_type, *get_range_on_screen(maze)):
         if check_show_item(player, maze, item):
             item.visible = True
             item_pos_x, item_pos_y = item.get_absolute_pos(maze)
@@ -1307,129 +958,52 @@ def show_items_in_maze(item_dict:dict[tuple, Item], maze:Maze, window:pygame.Sur
             else:
                 screen_middle_x = LARGE_SCREEN_POS[0]+(VISIBLE_WIDTH)/2
                 screen_middle_y = LARGE_SCREEN_POS[1]+(VISIBLE_HEIGHT)/2
-            window.blit(item_image, (screen_middle_x+(item_pos_x-player_pos_x), screen_middle_y+(item_pos_y-player_pos_y)))
+            blits.append((item_image, (screen_middle_x+(item_pos_x-player_pos_x), screen_middle_y+(item_pos_y-player_pos_y))))
+    window.blits(blits, doreturn=False)
 
-def show_items_in_middle_maze(window:pygame.Surface, middle_maze:Maze, item_dict:dict[tuple, Item], item_type):
+def show_items_in_middle_maze(window:pygame.Surface, middle_maze:Maze, entity_index:SpatialIndex, item_type):
     """
     Show items in the middle maze on the screen.
 
     Args:
         window (pygame.Surface): The pygame window.
         middle_maze (Maze): The middle maze object.
-        item_dict (dict): A dictionary containing items with their positions as keys.
+        entity_index (SpatialIndex): The spatial index of the items and enemies.
         item_type (str): The type of item to be shown.
     """
     item_image_path = f"assets/image/{item_type}.png"
     middle_image = load_and_resize_image(item_image_path, (middle_maze.cell_size, middle_maze.cell_size))
-    for item in item_dict.values():
+    blits = []
+    for item in entity_index.get_all(item_type):
         if item.collect or item.visible == False:
             continue
         pos_x, pos_y = item.get_absolute_pos(middle_maze)
-        window.blit(middle_image, (LARGE_SCREEN_POS[0] + pos_x, LARGE_SCREEN_POS[1] + pos_y))
-
-def collect_item(item:Item, player:Player, item_type:str):
-    """
-    Collect an item and apply its effects on the player.
+        blits.append((middle_image, (LARGE_SCREEN_POS[0] + pos_x, LARGE_SCREEN_POS[1] + pos_y)))
+    window.blits(blits, doreturn=False)
 
-    Args:
-        item (Item): The item object to be collected.
-        player (Player): The player object.
-        item_type (str): The type of the item.
-
-    Returns:
-        None
-    """
-    sound_effect = pygame.mixer.Sound(f"assets/sounds/{item_type}.mp3")
-    sound_effect.play()
-    item.collect = True
-    if item_type == "coin":
-        player.coin += 1
-    elif item_type == "sword":
-        player.attack += 1
-    elif item_type == "meat":
-        player.maximum_life += 10
-        player.life += 20
-        if player.life > player.maximum_life:
-            player.life = player.maximum_life
-    elif item_type == "coke":
-        num = random.choice(range(4))
-        if num == 0 and player.attack_dice.lower_bound < player.attack_dice.upper_bound:
-            player.attack_dice.lower_bound += 1
-        elif num == 1:
-            player.attack_dice.upper_bound += 1
-        elif num == 2 and player.defense_dice.lower_bound < player.defense_dice.upper_bound:
-            player.defense_dice.lower_bound += 1
-        elif num == 3:
-            player.defense_dice.upper_bound += 1 
-    elif item_type == "shield":
-        player.defense += 1
-    
-def handle_item_interaction(player:Player, item_dict:dict[str, dict[tuple, Item]]):
-    """
-    Handle the interaction between the player and items in the maze.
-
-    Args:
-        player (Player): The player object.
-        item_dict (dict): A dictionary containing items (dict) with their positions as keys.
-
-    Returns:
-        None
-    """
-    key = (player.block_number, player.cell_row, player.cell_col)
-    for item_type, items in item_dict.items():
-        if key in items.keys() and items[key].collect == False and item_type != "finish_flag": # finish flag will not handle here
-            collect_item(items[key], player, item_type)
-            
-def handle_player_interaction(player, helper_dict, helper_rect_dict, item_dict, enemy_dict, window):
+def save_original_maze(maze:Maze, solution_path):
     """
-    Handle player interaction with helpers, items, and enemies.
+    Save the solution path and the images of a newly generated maze, before its blocks are shuffled.
 
     Args:
-        player (Player): The player object.
-        helper_dict (dict): A dictionary containing helpers.
-        helper_rect_dict (dict): A dictionary containing helper rectangles.
-        item_dict (dict): A dictionary containing items with their positions as keys.
-        enemy_dict (dict): A dictionary containing enemies with their positions as keys.
-        window (pygame.Surface): The window surface.
-
-    Returns:
-        tuple: A tuple containing game state and result. The game state can be "game" or "game_over". 
-        The result can be "win" or "lose".
+        maze (Maze): The generated maze.
+        solution_path (list): The path from the start to the finish flag.
     """
-    player.step += 1
-    update_player_on_step_change(player)
-    
-    # Activate helper skills if applicable
-    for helper in helper_dict.values():
-        if helper.activate and "game" in helper.allow_mode:
-            use_skill_in_game_mode(player, window, helper)
-            show_helper(window, helper_dict, player, "game")
-    
-    # Handle interaction with items
-    handle_item_interaction(player, item_dict)
-    
-    # Check if the player is encountering an enemy
-    key = (player.block_number, player.cell_row, player.cell_col)
-    if key in enemy_dict.keys() and enemy_dict[key].defeated == False:
-        battle(player, enemy_dict[key], window, helper_dict, helper_rect_dict)
-        pygame.mixer.music.load('assets/sounds/Overtaken.mp3')
-        pygame.mixer.music.play(-1)
-        
-    # Check if the player has reached the finish flag
-    if key in item_dict["finish_flag"].keys():
-        return ("game_over", "win")
-    
-    # Check if the player's life is depleted
-    if player.life <= 0:
-        return ("game_over", "lose")
+    maze.show_block_number()
     
-    # If none of the game over conditions are met, continue the game
-    return ("game", None) 
+    # Save the solution path and solution image
+    path_text = "block_row, block_col, cell_row, cell_col\n" + "".join(str(pos)+'\n' for pos in solution_path)
+    ARTIFACT_WRITER.save_text(path_text, "./output/path.txt")
+    # print(solution_path)
+    save_image(maze, False, "./output/maze.jpg", solution_path)
+    save_image(maze, True, "./output/solution.jpg", solution_path)
 
 def play_game(window:pygame.Surface, block_in_maze):
     """
     Function to start and run the game.
 
+    The rules are applied by a GameState; this function turns input into its actions and shows their events.
+
     Args:
         window (pygame.Surface): The window surface for rendering.
         block_in_maze (int): The number of blocks in each row and column of the maze.
@@ -1440,101 +1014,48 @@ def play_game(window:pygame.Surface, block_in_maze):
         The result can be "win" or "lose".
     """
     # Initialize surfaces for different elements of the game
-    maze_surface = pygame.Surface((VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5))
-    small_maze_surface = pygame.Surface((SMALL_SCREEN_WIDTH,SMALL_SCREEN_HEIGHT))
-    middle_maze_surface = pygame.Surface((VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5))
     exchange_block_button_surface = pygame.Surface((EXCHANGE_BLOCK_BUTTON_RECT_POS[2], EXCHANGE_BLOCK_BUTTON_RECT_POS[3]))
     input_box_surface = pygame.Surface((INPUT_BOX_RECT_POS[2], INPUT_BOX_RECT_POS[3]))
     
-    # Play background music and set maze properties
-    sound_effect = pygame.mixer.Sound('assets/sounds/set sail.ogg')
-    sound_effect.play()
-    pygame.mixer.music.load('assets/sounds/Overtaken.mp3')
-    pygame.mixer.music.play(-1)
-    maze = Maze(0, 0, block_in_maze, LARGE_MAZE_CELL_SIZE, 10)
-    small_maze = Maze(0, 0, block_in_maze, SMALL_MAZE_CELL_SIZE, 3)
-    middle_maze = Maze(0, 0, block_in_maze, VISIBLE_WIDTH/(block_in_maze*CELL_IN_BLOCK), 4 )
-    
-    # Generate the original mazes
-    solution_path = maze.generate_maze(my_seed)
-    small_maze.generate_maze(my_seed)
-    middle_maze.generate_maze(my_seed)
-    maze.show_block_number()
-    
-    # Save the solution path and solution image
-    with open("./output/path.txt", "w") as fh:
-        fh.write("block_row, block_col, cell_row, cell_col\n")
-        for pos in solution_path:
-            fh.write(str(pos)+'\n')
-    # print(solution_path)
-    save_image(maze, False, "./output/maze.jpg", solution_path)
-    save_image(maze, True, "./output/solution.jpg", solution_path)
-    
-    # Randomize the maze and save it as randomize_maze.jpg
-    maze.randomize(my_seed)
-    save_image(maze, False, "./output/randomize_maze.jpg", solution_path)
-    small_maze.randomize(my_seed)
-    middle_maze.randomize(my_seed)
-    
-    # Initialize position set with start and end
-    pos_set = set()
-    start = solution_path[0]
-    # start = solution_path[-2]
-    end = solution_path[-1]
-    pos_set.add(start)
-    pos_set.add(end)
-    
-    # Set up item dictionaries, player, enemy, and helper objects
-    player = Player(start, maze)
-    coin_counts = {3: EASY_COIN_COUNT, 4: MEDIUM_COIN_COUNT, 5: HARD_COIN_COUNT}
-    sword_counts = {3: EASY_SWORD_COUNT, 4: MEDIUM_SWORD_COUNT, 5: HARD_SWORD_COUNT}
-    meat_counts = {3: EASY_MEAT_COUNT, 4: MEDIUM_MEAT_COUNT, 5: HARD_MEAT_COUNT}
-    coke_counts = {3: EASY_COKE_COUNT, 4:MEDIUM_COKE_COUNT, 5: HARD_COKE_COUNT}
-    shield_counts = {3: EASY_SHIELD_COUNT, 4:MEDIUM_SHIELD_COUNT, 5:HARD_SHIELD_COUNT}
+    # Play background music
+    play_sound('set sail.ogg')
+    play_music('Overtaken.mp3')
     
-    coin_dict = create_item_dict(Coin, block_in_maze, coin_counts, pos_set)
-    sword_dict = create_item_dict(Sword, block_in_maze, sword_counts, pos_set)
-    meat_dict = create_item_dict(Meat, block_in_maze, meat_counts, pos_set)
-    coke_dict = create_item_dict(Coke, block_in_maze, coke_counts, pos_set)
-    shield_dict = create_item_dict(Shield, block_in_maze, shield_counts, pos_set)
-    
-    finish_flag_dict = {}
-    end = solution_path[-1]
-    finish_flag_block_number = end[0] * block_in_maze + end[1]
-    key = (finish_flag_block_number, end[2], end[3])
-    finish_flag_dict[key] = FinishFlag(end, block_in_maze, key)
+    # Generate and randomize the maze, and place the player, items and enemies; the large maze is the one of the game
+    state = GameState(block_in_maze, save_original_maze)
+    maze, player = state.maze, state.player
+    item_dict, helper_dict, entity_index = state.item_dict, state.helper_dict, state.entity_index
+    helper_rect_dict = create_helper_rect_dict()
     
-    item_dict = {
-        "coin": coin_dict,
-        "sword": sword_dict,
-        "meat": meat_dict,
-        "coke": coke_dict,
-        "shield": shield_dict,
-        "finish_flag": finish_flag_dict
-    }
+    # Compute the odds of the battles on the battle odds worker ahead of them, again whenever the player's stats change
+    prefetch_battle_odds(player, state.enemy_dict.values(), helper_dict)
     
-    if block_in_maze == 3:
-        enemy_dict = create_easy_enemy(player, block_in_maze, pos_set)
-    elif block_in_maze == 4:
-        enemy_dict = create_medium_enemy(player, block_in_maze, pos_set)
-    else:
-        enemy_dict = create_hard_enemy(player, block_in_maze, pos_set)
-    helper_dict = create_helper()
-    helper_rect_dict = create_helper_rect_dict()
+    # The small and middle mazes are views sharing the topology of the large maze
+    small_maze = MazeView(maze, 0, 0, SMALL_MAZE_CELL_SIZE, 3)
+    middle_maze = MazeView(maze, 0, 0, VISIBLE_WIDTH/(block_in_maze*CELL_IN_BLOCK), 4 )
+    # Each maze is rendered once, on its first draw, and only the visible part is blitted afterwards
+    maze_cache = create_maze_cache(maze, VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5)
+    small_maze_cache = create_maze_cache(small_maze, SMALL_SCREEN_WIDTH, SMALL_SCREEN_HEIGHT)
+    middle_maze_cache = create_maze_cache(middle_maze, VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5)
     
+    # Save the randomized maze, and its solution if the finish flag can be reached without exchanging blocks
+    save_image(maze, False, "./output/randomize_maze.jpg", state.solution_path)
+    randomize_solution_path = state.get_hint_path()
+    if randomize_solution_path:
+        save_image(maze, True, "./output/randomize_solution.jpg", randomize_solution_path)
     
     # Initialize game window and display initial elements
-    window.fill(BEIGE)
+    mark_dirty(window.fill(BEIGE))
     image = load_and_resize_image("assets/image/Game Background.png", (SCREEN_WIDTH,SCREEN_HEIGHT)) 
-    window.blit(image, (0,0))
+    mark_dirty(window.blit(image, (0,0)))
     center_player_on_maze(player, maze)
     center_player_on_maze(player, small_maze)
-    show_mazes_and_players_in_game_mode(window, maze, maze_surface, small_maze, small_maze_surface, "default")
-    for item_type, item in item_dict.items():
-        show_items_in_maze(item, maze, window, player, item_type)
-        show_items_in_maze(item, small_maze, window, player, item_type)
-    show_enemy_in_maze(enemy_dict, maze, window, player)
-    show_enemy_in_maze(enemy_dict, small_maze, window, player)
+    show_mazes_and_players_in_game_mode(window, maze, maze_cache, small_maze, small_maze_cache, "default")
+    for item_type in item_dict:
+        show_items_in_maze(entity_index, maze, window, player, item_type)
+        show_items_in_maze(entity_index, small_maze, window, player, item_type)
+    show_enemy_in_maze(entity_index, maze, window, player)
+    show_enemy_in_maze(entity_index, small_maze, window, player)
     show_player_attribute_icon(window)
     show_player_attribute_value(window, player)
     show_helper(window, helper_dict, player, "game")
@@ -1543,54 +1064,55 @@ def play_game(window:pygame.Surface, block_in_maze):
     # Show exchange block and input box
     exchange_block_rect = pygame.Rect(EXCHANGE_BLOCK_BUTTON_RECT_POS)
     input_box_rect = pygame.Rect(INPUT_BOX_RECT_POS)
-    pygame.draw.rect(window, WHITE, input_box_rect)
+    mark_dirty(pygame.draw.rect(window, WHITE, input_box_rect))
     show_text_in_button(window, exchange_block_button_surface, "Exchange Block", (EXCHANGE_BLOCK_BUTTON_RECT_POS[0], EXCHANGE_BLOCK_BUTTON_RECT_POS[1]))
 
     # Show the initial screen
-    pygame.display.update()
-    pygame.image.save(window, "./output/Initial start.jpeg")
+    update_display()
+    ARTIFACT_WRITER.save_surface(window, "./output/Initial start.jpeg")
     
     # Print the block number after randomize to terminal
     maze.show_block_number()
     print(maze.get_block_number_list())
     
+    # The direction moved with each key, and the way the mazes move on screen to keep the player centered
+    move_keys = {pygame.K_u: "up", pygame.K_d: "down", pygame.K_l: "left", pygame.K_r: "right"}
+    maze_offsets = {"up": (0, 1), "down": (0, -1), "left": (1, 0), "right": (-1, 0)}
     
     cursor_state = "arrow"
     input_text = ""
-    input_box_active = False
-    mode = "game"
     running = True
 
     # Main game loop
     while running:
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 return ("quit", player, "win")
             if event.type == pygame.KEYDOWN:
                 # Handle key presses for movement and input
-                if mode == "exchange_block":
+                if state.mode == "exchange_block":
                     if event.key == pygame.K_RETURN:
                         # Exchange the input block with current block
-                        if input_text != "" and int(input_text) in range(maze.block_in_maze*maze.block_in_maze):
-                            input_block_row, input_block_col = (int(input_text) // maze.block_in_maze, int(input_text) % maze.block_in_maze)
-                            current_block_index = maze.get_block_number_index(player.block_number)
-                            current_block_row, current_block_col = current_block_index[0], current_block_index[1]
-                            maze.exchange_block((input_block_row, input_block_col), (current_block_row, current_block_col))
-                            small_maze.exchange_block((input_block_row, input_block_col), (current_block_row, current_block_col))
-                            middle_maze.exchange_block((input_block_row, input_block_col), (current_block_row, current_block_col))
-                            
-                            # Print the block number after exchange to the terminal
-                            maze.show_block_number()
-                            
-                            # Update the screen
-                            center_player_on_maze(player, small_maze)
-                            center_player_on_maze(player, maze)
-                            show_mazes_and_players_in_exchange_mode(window, middle_maze, middle_maze_surface, small_maze, small_maze_surface, player)
-                            for item_type, item in item_dict.items():
-                                show_items_in_middle_maze(window, middle_maze, item, item_type)
-                                show_items_in_maze(item, small_maze, window, player, item_type)
-                            show_enemy_in_middle_maze(window, middle_maze, enemy_dict)
-                            show_enemy_in_maze(enemy_dict, small_maze, window, player)
+                        if input_text != "":
+                            for game_event in state.play(("exchange", int(input_text))):
+                                for maze_cache_to_update in (maze_cache, small_maze_cache, middle_maze_cache):
+                                    maze_cache_to_update.render_block(*game_event[1])
+                                    maze_cache_to_update.render_block(*game_event[2])
+                                
+                                # Print the block number and the distance to the finish flag after exchange to the terminal
+                                maze.show_block_number()
+                                distance = state.finish_distance.distance(state.get_player_pos())
+                                print(f"Finish flag: {distance} steps away" if distance != -1 else "Finish flag: not reachable")
+                                
+                                # Update the screen
+                                center_player_on_maze(player, small_maze)
+                                center_player_on_maze(player, maze)
+                                show_mazes_and_players_in_exchange_mode(window, middle_maze, middle_maze_cache, small_maze, small_maze_cache, player)
+                                for item_type in item_dict:
+                                    show_items_in_middle_maze(window, middle_maze, entity_index, item_type)
+                                    show_items_in_maze(entity_index, small_maze, window, player, item_type)
+                                show_enemy_in_middle_maze(window, middle_maze, entity_index)
+                                show_enemy_in_maze(entity_index, small_maze, window, player)
                             
                         # Clear the input
                         input_text = ''
@@ -1603,125 +1125,105 @@ def play_game(window:pygame.Surface, block_in_maze):
                             input_text += event.unicode
                             
                     show_text_in_button(window, input_box_surface, input_text, (INPUT_BOX_RECT_POS[0], INPUT_BOX_RECT_POS[1]))
-                    pygame.display.update()
-                    pygame.image.save(window, "./output/After Exchange.jpeg")
+                    update_display()
+                    ARTIFACT_WRITER.save_surface(window, "./output/After Exchange.jpeg")
                     
-                elif mode == "game":
-                    # Initialize variables for player movement
-                    validate_move_flag = False
-                    direction = ""
-                    game_state = "game"
-                    result = None
+                elif state.mode == "game":
+                    # Show the way to the finish flag as a hint until the next move
+                    if event.key == pygame.K_h:
+                        show_hint_in_maze(window, maze, state.get_hint_path())
+                        update_display()
                     
-                    # Check which key is pressed and validate movement in that direction
-                    if event.key == pygame.K_u:
-                        if check_up_validate(maze, player):
-                            validate_move_flag = True
-                            direction = "up"
-                            player.move_up(maze)
-                            maze.move(0, maze.cell_size)
-                            small_maze.move(0, small_maze.cell_size)
-                    elif event.key == pygame.K_d:
-                        if check_down_validate(maze, player):
-                            validate_move_flag = True
-                            direction = "down"
-                            player.move_down(maze)
-                            maze.move(0, -maze.cell_size)
-                            small_maze.move(0, -small_maze.cell_size)
-                    elif event.key == pygame.K_l:
-                        if check_left_validate(maze, player):
-                            validate_move_flag = True
-                            direction = "left"
-                            player.move_left(maze)
-                            maze.move(maze.cell_size, 0)
-                            small_maze.move(small_maze.cell_size, 0)
-                    elif event.key == pygame.K_r:
-                        if check_right_validate(maze, player):
+                    # Move the player and show what happens on the way
+                    direction = move_keys.get(event.key)
+                    if direction is None:
+                        continue
+                    validate_move_flag = False
+                    for game_event in state.play(("move", direction)):
+                        if game_event[0] == "move":
                             validate_move_flag = True
-                            direction = "right"
-                            player.move_right(maze)
-                            maze.move(-maze.cell_size, 0)
-                            small_maze.move(-small_maze.cell_size, 0)
+                            offset_x, offset_y = maze_offsets[direction]
+                            maze.move(offset_x * maze.cell_size, offset_y * maze.cell_size)
+                            small_maze.move(offset_x * small_maze.cell_size, offset_y * small_maze.cell_size)
+                        elif game_event[0] == "step_damage":
+                            play_sound('hurt.wav')
+                        elif game_event[0] == "helper_skill":
+                            show_helper_skill(window, state)
+                        elif game_event[0] == "collect":
+                            play_sound(f"{game_event[1]}.mp3")
+                            prefetch_battle_odds(player, state.enemy_dict.values(), helper_dict)
+                        elif game_event[0] == "battle_start":
+                            battle(state, window, helper_rect_dict)
+                            play_music('Overtaken.mp3')
+                            prefetch_battle_odds(player, state.enemy_dict.values(), helper_dict)
                     
-                    # If movement is valid, handle player interaction
+                    # If movement is valid, show its result
                     if validate_move_flag == True:
-                        game_state, result = handle_player_interaction(player, helper_dict, helper_rect_dict, item_dict, enemy_dict, window) 
                         show_player_attribute_value(window, player)
                         
                         # Check if game is over after interaction
-                        if game_state =="game_over":
-                            return (game_state, player, result)
+                        if state.game_over:
+                            return ("game_over", player, state.result)
                         
                         # Load and display movement frames
-                        frames_folder = f"./assets/image/move_{direction}"
+                        frames_folder = f"assets/image/move_{direction}"
                         frame_files = [f"{frames_folder}/frame_{i}.png" for i in range(1, 3)]
-                        frames = [pygame.image.load(file) for file in frame_files]
+                        frames = [load_image(file) for file in frame_files]
                         
                         # Draw maze, items, enemies, and player in game mode
                         for image in frames:
-                            show_mazes_and_players_in_game_mode(window,maze, maze_surface, small_maze, small_maze_surface, image)
-                            for item_type, item in item_dict.items():
-                                show_items_in_maze(item, maze, window, player, item_type)
-                                show_items_in_maze(item, small_maze, window, player, item_type)
-                            show_enemy_in_maze(enemy_dict, maze, window, player)
-                            show_enemy_in_maze(enemy_dict, small_maze, window, player)
+                            show_mazes_and_players_in_game_mode(window,maze, maze_cache, small_maze, small_maze_cache, image)
+                            for item_type in item_dict:
+                                show_items_in_maze(entity_index, maze, window, player, item_type)
+                                show_items_in_maze(entity_index, small_maze, window, player, item_type)
+                            show_enemy_in_maze(entity_index, maze, window, player)
+                            show_enemy_in_maze(entity_index, small_maze, window, player)
                             show_helper(window, helper_dict, player, "game")
-                            pygame.display.update()
+                            update_display()
                             
             if event.type == pygame.MOUSEBUTTONDOWN:
-                sound_effect = pygame.mixer.Sound('assets/sounds/mouse-click.mp3')
-                sound_effect.play()
+                play_sound('mouse-click.mp3')
                 
-                # Handle mouse clicks for various interactions
-                if exchange_block_rect.collidepoint(event.pos) and mode == "game":
-                    # Switch to block exchange mode
-                    mode = "exchange_block"
-                    
-                    # Update the screen
-                    show_mazes_and_players_in_exchange_mode(window, middle_maze, middle_maze_surface, small_maze, small_maze_surface, player)
-                    for item_type, item in item_dict.items():
-                        show_items_in_middle_maze(window, middle_maze, item, item_type)
-                        show_items_in_maze(item, small_maze, window, player, item_type)
-                    show_enemy_in_middle_maze(window, middle_maze, enemy_dict)
-                    show_enemy_in_maze(enemy_dict, small_maze, window, player)
-                    show_text_in_button(window, exchange_block_button_surface, "Go Back", (EXCHANGE_BLOCK_BUTTON_RECT_POS[0], EXCHANGE_BLOCK_BUTTON_RECT_POS[1]))
-                    pygame.display.update()
-                    pygame.image.save(window, "./output/Exchange Mode.jpeg")
-                    
-                elif exchange_block_rect.collidepoint(event.pos) and mode == "exchange_block":
-                    # Return to game mode from block exchange mode
-                    mode = "game"
-                    
-                    # Update the screen
-                    show_mazes_and_players_in_game_mode(window, maze, maze_surface, small_maze, small_maze_surface, "default")
-                    show_enemy_in_maze(enemy_dict, maze, window, player)
-                    show_enemy_in_maze(enemy_dict, small_maze, window, player)
-                    for item_type, item in item_dict.items():
-                        show_items_in_maze(item, maze, window, player, item_type)
-                        show_items_in_maze(item, small_maze, window, player, item_type)
-                    show_text_in_button(window, exchange_block_button_surface, "Exchange Block", (EXCHANGE_BLOCK_BUTTON_RECT_POS[0], EXCHANGE_BLOCK_BUTTON_RECT_POS[1]))
-                    pygame.display.update()
+                # Switch between game mode and block exchange mode
+                if exchange_block_rect.collidepoint(event.pos):
+                    for game_event in state.play(("exchange_mode",)):
+                        if game_event[1] == "exchange_block":
+                            # Update the screen
+                            show_mazes_and_players_in_exchange_mode(window, middle_maze, middle_maze_cache, small_maze, small_maze_cache, player)
+                            for item_type in item_dict:
+                                show_items_in_middle_maze(window, middle_maze, entity_index, item_type)
+                                show_items_in_maze(entity_index, small_maze, window, player, item_type)
+                            show_enemy_in_middle_maze(window, middle_maze, entity_index)
+                            show_enemy_in_maze(entity_index, small_maze, window, player)
+                            show_text_in_button(window, exchange_block_button_surface, "Go Back", (EXCHANGE_BLOCK_BUTTON_RECT_POS[0], EXCHANGE_BLOCK_BUTTON_RECT_POS[1]))
+                            update_display()
+                            ARTIFACT_WRITER.save_surface(window, "./output/Exchange Mode.jpeg")
+                        else:
+                            # Update the screen
+                            show_mazes_and_players_in_game_mode(window, maze, maze_cache, small_maze, small_maze_cache, "default")
+                            show_enemy_in_maze(entity_index, maze, window, player)
+                            show_enemy_in_maze(entity_index, small_maze, window, player)
+                            for item_type in item_dict:
+                                show_items_in_maze(entity_index, maze, window, player, item_type)
+                                show_items_in_maze(entity_index, small_maze, window, player, item_type)
+                            show_text_in_button(window, exchange_block_button_surface, "Exchange Block", (EXCHANGE_BLOCK_BUTTON_RECT_POS[0], EXCHANGE_BLOCK_BUTTON_RECT_POS[1]))
+                            update_display()
                 
-                for name, helper in helper_dict.items():
-                    if helper_rect_dict[name].collidepoint(event.pos) and check_helper_validate(player, mode, helper):
+                for name in helper_dict:
+                    if helper_rect_dict[name].collidepoint(event.pos):
                         # Activate helper if clicked and conditions are met
-                        helper.activate = True
-                        helper.available = False
-                        player.coin -= helper.cost
-                        
-                        # Update player attibute and show helper effect
-                        show_player_attribute_value(window, player)
-                        show_helper(window, helper_dict, player, "game")
-                        show_helper_effect(window, helper)
-                        
-                        # Update the screen
-                        show_mazes_and_players_in_game_mode(window,maze, maze_surface, small_maze, small_maze_surface, "default")
-                        for item_type, item in item_dict.items():
-                            show_items_in_maze(item, maze, window, player, item_type)
-                            show_items_in_maze(item, small_maze, window, player, item_type)
-                        show_enemy_in_maze(enemy_dict, maze, window, player)
-                        show_enemy_in_maze(enemy_dict, small_maze, window, player)
-                        pygame.display.update()
+                        for game_event in state.play(("helper", name)):
+                            # Update player attibute and show helper effect
+                            show_helper_activation(window, state, game_event[1])
+                            
+                            # Update the screen
+                            show_mazes_and_players_in_game_mode(window,maze, maze_cache, small_maze, small_maze_cache, "default")
+                            for item_type in item_dict:
+                                show_items_in_maze(entity_index, maze, window, player, item_type)
+                                show_items_in_maze(entity_index, small_maze, window, player, item_type)
+                            show_enemy_in_maze(entity_index, maze, window, player)
+                            show_enemy_in_maze(entity_index, small_maze, window, player)
+                            update_display()
 
         # Change cursor appearance based on mouse position
         new_cursor_state = "arrow"
@@ -1730,7 +1232,7 @@ def play_game(window:pygame.Surface, block_in_maze):
             new_cursor_state = "hand"
             
         for helper, helper_rect in helper_rect_dict.items():
-            if helper_rect.collidepoint(pygame.mouse.get_pos()) and check_helper_validate(player, mode, helper_dict[helper]):
+            if helper_rect.collidepoint(pygame.mouse.get_pos()) and check_helper_validate(player, state.mode, helper_dict[helper]):
                 new_cursor_state = "hand"
         
         if new_cursor_state != cursor_state:
@@ -1755,8 +1257,7 @@ def show_menu(window:pygame.Surface):
                where n represents the difficulty level chosen (3 for easy, 4 for medium, 5 for hard).
     """
     # Load background music and play it on loop
-    pygame.mixer.music.load('assets/sounds/bgm_WeAre.wav')
-    pygame.mixer.music.play(-1)
+    play_music('bgm_WeAre.wav')
     
     # Define menu page buttons' rectangles
     new_game_rect = pygame.Rect(NEW_GAME_RECT_POS)
@@ -1770,20 +1271,20 @@ def show_menu(window:pygame.Surface):
     
     # Display menu page with buttons
     show_menu_page_background(window)
-    font = pygame.font.Font("assets/font/one piece font.ttf", 80)
+    font = get_font("assets/font/one piece font.ttf", 80)
     
     # Render and display "NEW GAME" button
-    text = font.render("NEW GAME" , True , WHITE)
+    text = render_text(font, "NEW GAME", WHITE)
     text_width, text_height = text.get_rect().size
-    window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 750))
+    mark_dirty(window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 750)))
     
     # Render and display "QUIT" button
-    text = font.render("QUIT" , True , WHITE)
+    text = render_text(font, "QUIT", WHITE)
     text_width, text_height = text.get_rect().size
-    window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 830))
+    mark_dirty(window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 830)))
     
     # Update display
-    pygame.display.update()
+    update_display()
     
     running = True
     at_menu_page = True
@@ -1791,12 +1292,11 @@ def show_menu(window:pygame.Surface):
     cursor_state = "arrow"
     
     while running: 
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                     return ("quit", 3)
             if event.type == pygame.MOUSEBUTTONDOWN:
-                sound_effect = pygame.mixer.Sound('assets/sounds/mouse-click.mp3')
-                sound_effect.play()
+                play_sound('mouse-click.mp3')
                 
                 # Handling clicks on menu page
                 if at_menu_page:
@@ -1806,25 +1306,25 @@ def show_menu(window:pygame.Surface):
                         show_menu_page_background(window)
                         
                         # Draw difficulty selection buttons
-                        pygame.draw.rect(window, WHITE, easy_rect, 2, border_radius=40)
-                        pygame.draw.rect(window, WHITE, medium_rect, 2, border_radius=40)
-                        pygame.draw.rect(window, WHITE, hard_rect, 2, border_radius=40)
+                        mark_dirty(pygame.draw.rect(window, WHITE, easy_rect, 2, border_radius=40))
+                        mark_dirty(pygame.draw.rect(window, WHITE, medium_rect, 2, border_radius=40))
+                        mark_dirty(pygame.draw.rect(window, WHITE, hard_rect, 2, border_radius=40))
                         
                         # Render and display difficulty selection buttons' text
-                        font = pygame.font.Font("assets/font/one piece font.ttf", 80)
-                        text = font.render("EASY" , True , WHITE)
+                        font = get_font("assets/font/one piece font.ttf", 80)
+                        text = render_text(font, "EASY", WHITE)
                         text_width, text_height = text.get_rect().size
-                        window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 650))
+                        mark_dirty(window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 650)))
                         
-                        text = font.render("MEDIUM" , True , WHITE)
+                        text = render_text(font, "MEDIUM", WHITE)
                         text_width, text_height = text.get_rect().size
-                        window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 750))
+                        mark_dirty(window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 750)))
                         
-                        text = font.render("HARD" , True , WHITE)
+                        text = render_text(font, "HARD", WHITE)
                         text_width, text_height = text.get_rect().size
-                        window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 850))
+                        mark_dirty(window.blit(text, ((SCREEN_WIDTH-text_width)/2+20, 850)))
                         
-                        pygame.display.update()
+                        update_display()
                         
                     if quit_rect.collidepoint(event.pos):
                         return ("quit", 3)
@@ -1877,16 +1377,16 @@ def game_over(window:pygame.Surface, player:Player, result:str):
              It can be "quit" to exit the game or "menu" to return to the main menu.
     """
     # Fill the window with beige color
-    window.fill(BEIGE)
+    mark_dirty(window.fill(BEIGE))
     
     cursor_state = "arrow"
     
     if result == "win":
         # Display winning screen
         image = load_and_resize_image("assets/image/brick_background.jpg", (SCREEN_WIDTH, 1080))
-        window.blit(image, (0,0))
+        mark_dirty(window.blit(image, (0,0)))
         image = load_and_resize_image("assets/image/wanted.png", (569, 800))
-        window.blit(image, (450, 50))
+        mark_dirty(window.blit(image, (450, 50)))
         
         # Calculate final fame
         final_fame = player.fame + (player.attack * (player.attack_dice.upper_bound + player.attack_dice.lower_bound) + \
@@ -1894,69 +1394,54 @@ def game_over(window:pygame.Surface, player:Player, result:str):
                                     - player.step * 100
                                     
         # Render and display final fame
-        font = pygame.font.Font("assets/font/one piece font.ttf", 60)
+        font = get_font("assets/font/one piece font.ttf", 60)
         rect = pygame.Rect((550, 700, 335, 60))
-        text = font.render(f"{final_fame}" , True , BLACK)
+        text = render_text(font, f"{final_fame}", BLACK)
         text_rect = text.get_rect(center=rect.center)
-        window.blit(text, text_rect)
-        pygame.display.update()
+        mark_dirty(window.blit(text, text_rect))
+        update_display()
         
-        # Play victory music
-        music_track = ["assets/sounds/pirate king.ogg","assets/sounds/Binks' Sake.mp3"]
-        for idx, music in enumerate(music_track):
-            pygame.mixer.music.load(music)
-            pygame.mixer.music.play()
-            if idx == 1:
-                pygame.mixer.music.play(-1)
-            else:
-                while pygame.mixer.music.get_busy():
-                    continue
+        # Play victory music, the second track looping once the first one ends
+        music_track = ["pirate king.ogg","Binks' Sake.mp3"]
+        play_music(music_track[0], 0, on_end=lambda: play_music(music_track[1]))
     
     else:
         # Display losing screen
-        music_track = ["assets/sounds/weak.mp3","assets/sounds/Mother Sea.mp3"]
+        music_track = ["weak.mp3","Mother Sea.mp3"]
         image = load_and_resize_image("assets/image/lose.jpg", (SCREEN_WIDTH, 1080))
-        window.blit(image, (0,0))
-        pygame.display.update()
+        mark_dirty(window.blit(image, (0,0)))
+        update_display()
         
-        # Play losing music
-        for idx, music in enumerate(music_track):
-            pygame.mixer.music.load(music)
-            pygame.mixer.music.play()
-            if idx == 1:
-                pygame.mixer.music.play(-1)
-            else:
-                while pygame.mixer.music.get_busy():
-                    continue
+        # Play losing music, the second track looping once the first one ends
+        play_music(music_track[0], 0, on_end=lambda: play_music(music_track[1]))
     
     # Define buttons' rectangles
     new_game_rect = pygame.Rect((450, 870, 285, 80))
     quit_rect = pygame.Rect((745, 870, 275, 80))
     
     # Draw buttons
-    pygame.draw.rect(window, WHITE, new_game_rect, width=2, border_radius=40)
-    pygame.draw.rect(window, WHITE, quit_rect, width=2, border_radius=40)
+    mark_dirty(pygame.draw.rect(window, WHITE, new_game_rect, width=2, border_radius=40))
+    mark_dirty(pygame.draw.rect(window, WHITE, quit_rect, width=2, border_radius=40))
     
     # Render and display text on buttons
-    font = pygame.font.Font("assets/font/one piece font.ttf", 60)
-    text = font.render("MENU" , True , WHITE)
+    font = get_font("assets/font/one piece font.ttf", 60)
+    text = render_text(font, "MENU", WHITE)
     text_rect = text.get_rect(center=new_game_rect.center)
-    window.blit(text, text_rect)
+    mark_dirty(window.blit(text, text_rect))
     
-    text = font.render("QUIT" , True , WHITE)
+    text = render_text(font, "QUIT", WHITE)
     text_rect = text.get_rect(center=quit_rect.center)
-    window.blit(text, text_rect)
+    mark_dirty(window.blit(text, text_rect))
     
-    pygame.display.update()
+    update_display()
     
     running = True
     while running: 
-        for event in pygame.event.get():
+        for event in get_events():
             if event.type == pygame.QUIT:
                 return "quit"
             if event.type == pygame.MOUSEBUTTONDOWN:
-                sound_effect = pygame.mixer.Sound('assets/sounds/mouse-click.mp3')
-                sound_effect.play()
+                play_sound('mouse-click.mp3')
                 if new_game_rect.collidepoint(event.pos):
                     time.sleep(1)
                     return "menu"
@@ -0,0 +1,375 @@
+import random
+import struct
+from collections import deque
+from variables import *
+
+# Registry of maze generation algorithms, filled by the register decorator below.
+# Each generator takes (maze, my_seed), carves a perfect maze into maze.connect_grid
+# on the toroidal grid used by Maze.wrap_around and returns a (start, end) pair of positions.
+# Generators draw from their own random.Random seeded with my_seed, never from the global
+# random module, so generations running side by side do not change each other's mazes.
+GENERATORS = {}
+
+# Header of a maze file: magic, block_in_maze, CELL_IN_BLOCK. The connect grid follows, block row by block row.
+MAZE_FILE_HEADER = struct.Struct("<4sII")
+MAZE_FILE_MAGIC = b"MAZE"
+
+def register(name):
+    """
+    Register a maze generation algorithm under the given name.
+
+    Args:
+        name (str): The name used to select the algorithm in Maze.generate.
+
+    Returns:
+        function: A decorator adding the function to GENERATORS.
+    """
+    def decorator(function):
+        GENERATORS[name] = function
+        return function
+    return decorator
+
+def random_grid_index(maze, rng):
+    """
+    Choose a random cell of the maze.
+
+    Args:
+        maze: The Maze object.
+        rng (random.Random): The random number generator of the generation.
+
+    Returns:
+        int: The grid index of the chosen cell.
+    """
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    return rng.randrange(size * size)
+
+def farthest_cell(maze, start_index):
+    """
+    Find the cell farthest from a start cell with a breadth-first search on the toroidal grid.
+
+    Args:
+        maze: The Maze object.
+        start_index (int): The grid index of the start cell.
+
+    Returns:
+        int: The grid index of the farthest reachable cell.
+    """
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    visited = bytearray(size * size)
+    visited[start_index] = 1
+    queue = deque([start_index])
+    index = start_index
+    while queue:
+        index = queue.popleft()
+        mask = maze.connect_grid[maze.cell_index(maze.grid_pos(index))]
+        for direction in DIRECTION:
+            if mask & DIRECTION_BIT[direction]:
+                neighbor = maze.grid_neighbor(index, direction)
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    queue.append(neighbor)
+    return index
+
+def find_start_end(maze, rng):
+    """
+    Choose the start and end of a perfect maze as the two ends of its longest path.
+
+    Two breadth-first sweeps are enough on a tree: the farthest cell from any cell is one
+    end of the longest path and the farthest cell from that end is the other end.
+
+    Args:
+        maze: The Maze object.
+        rng (random.Random): The random number generator of the generation.
+
+    Returns:
+        tuple: The start and end positions (block_row, block_col, cell_row, cell_col).
+    """
+    start = farthest_cell(maze, random_grid_index(maze, rng))
+    end = farthest_cell(maze, start)
+    return (maze.grid_pos(start), maze.grid_pos(end))
+
+@register("dfs")
+def depth_first_search(maze, my_seed):
+    """
+    Generate a maze with the depth-first search backtracker of Maze.generate_maze.
+
+    Args:
+        maze: The Maze object.
+        my_seed (int): Seed value for random number generation.
+
+    Returns:
+        tuple: The start and end of the longest path found during generation.
+    """
+    path = maze.generate_maze(my_seed)
+    return (path[0], path[-1])
+
+@register("kruskal")
+def kruskal(maze, my_seed):
+    """
+    Generate a maze with randomized Kruskal's algorithm.
+
+    Every cell owns a RIGHT and a DOWN wall (wrapping at the edges). The walls are shuffled
+    and removed whenever they separate two different sets of a union-find with path
+    compression and union by size.
+
+    Args:
+        maze: The Maze object.
+        my_seed (int): Seed value for random number generation.
+
+    Returns:
+        tuple: The start and end positions of the maze.
+    """
+    rng = random.Random(my_seed)
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    cell_count = size * size
+    parent = list(range(cell_count))
+    set_size = [1] * cell_count
+
+    def find(index):
+        root = index
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression
+        while parent[index] != root:
+            parent[index], index = root, parent[index]
+        return root
+
+    # Wall 2 * i is the RIGHT wall of cell i and wall 2 * i + 1 is its DOWN wall
+    walls = list(range(2 * cell_count))
+    rng.shuffle(walls)
+    remaining = cell_count - 1
+    for wall in walls:
+        index, down = divmod(wall, 2)
+        direction = DOWN if down else RIGHT
+        root_1 = find(index)
+        root_2 = find(maze.grid_neighbor(index, direction))
+        if root_1 == root_2:
+            continue
+        if set_size[root_1] < set_size[root_2]:
+            root_1, root_2 = root_2, root_1
+        parent[root_2] = root_1
+        set_size[root_1] += set_size[root_2]
+        maze.carve(index, direction)
+        remaining -= 1
+        if remaining == 0:
+            break
+    return find_start_end(maze, rng)
+
+@register("wilson")
+def wilson(maze, my_seed):
+    """
+    Generate a maze with Wilson's algorithm (loop-erased random walks).
+
+    Produces a uniform spanning tree of the toroidal grid. Each walk remembers only the last
+    direction taken out of every cell, which erases loops implicitly.
+
+    Args:
+        maze: The Maze object.
+        my_seed (int): Seed value for random number generation.
+
+    Returns:
+        tuple: The start and end positions of the maze.
+    """
+    rng = random.Random(my_seed)
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    cell_count = size * size
+    in_tree = bytearray(cell_count)
+    exit_direction = bytearray(cell_count)
+    in_tree[rng.randrange(cell_count)] = 1
+
+    for walk_start in range(cell_count):
+        if in_tree[walk_start]:
+            continue
+        # Random walk until the tree is hit, remembering the exit direction of each cell
+        index = walk_start
+        while not in_tree[index]:
+            exit_direction[index] = rng.randrange(4)
+            index = maze.grid_neighbor(index, DIRECTION[exit_direction[index]])
+        # Retrace the loop-erased walk and add it to the tree
+        index = walk_start
+        while not in_tree[index]:
+            in_tree[index] = 1
+            direction = DIRECTION[exit_direction[index]]
+            maze.carve(index, direction)
+            index = maze.grid_neighbor(index, direction)
+    return find_start_end(maze, rng)
+
+@register("binary_tree")
+def binary_tree(maze, my_seed):
+    """
+    Generate a maze with the binary tree algorithm.
+
+    Every cell opens either UP or LEFT, except along the first row and column which run
+    towards the root corner. The grid is shifted by a random offset first, so the seam of
+    the tree falls anywhere on the torus and the wrapped walls can be opened too.
+
+    Args:
+        maze: The Maze object.
+        my_seed (int): Seed value for random number generation.
+
+    Returns:
+        tuple: The start and end positions of the maze.
+    """
+    rng = random.Random(my_seed)
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    row_offset, col_offset = rng.randrange(size), rng.randrange(size)
+    for row in range(size):
+        for col in range(size):
+            index = ((row + row_offset) % size) * size + (col + col_offset) % size
+            if row > 0 and col > 0:
+                maze.carve(index, UP if rng.getrandbits(1) else LEFT)
+            elif row > 0:
+                maze.carve(index, UP)
+            elif col > 0:
+                maze.carve(index, LEFT)
+    return find_start_end(maze, rng)
+
+@register("sidewinder")
+def sidewinder(maze, my_seed):
+    """
+    Generate a maze with the sidewinder algorithm.
+
+    The first row is one open corridor. Every other row is split into random runs and each
+    run opens UP from one random cell. As with binary_tree the grid is shifted by a random
+    offset so the seam falls anywhere on the torus.
+
+    Args:
+        maze: The Maze object.
+        my_seed (int): Seed value for random number generation.
+
+    Returns:
+        tuple: The start and end positions of the maze.
+    """
+    rng = random.Random(my_seed)
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    row_offset, col_offset = rng.randrange(size), rng.randrange(size)
+    for row in range(size):
+        row_start = ((row + row_offset) % size) * size
+        run = []
+        for col in range(size):
+            index = row_start + (col + col_offset) % size
+            if row == 0:
+                if col < size - 1:
+                    maze.carve(index, RIGHT)
+                continue
+            run.append(index)
+            if col < size - 1 and rng.getrandbits(1):
+                maze.carve(index, RIGHT)
+            else:
+                maze.carve(rng.choice(run), UP)
+                run = []
+    return find_start_end(maze, rng)
+
+def eller_block_rows(block_in_maze, rng):
+    """
+    Generate a maze with Eller's algorithm, one block row at a time.
+
+    Only the set of every cell in the current row and the masks of the current block row are
+    kept, so memory stays bounded by one block row whatever the height of the maze. Each row
+    may also wrap from its last cell to its first; the last row never wraps down to the first
+    one, which would need the first row's sets. The result is still a perfect maze on the torus.
+
+    Args:
+        block_in_maze (int): The number of blocks in each row and column of the maze.
+        rng (random.Random): The random number generator of the generation.
+
+    Yields:
+        bytearray: The connect masks of one block row, in the layout of Maze.connect_grid.
+    """
+    size = block_in_maze * CELL_IN_BLOCK
+    block_row_cells = size * CELL_IN_BLOCK
+    right, left = DIRECTION_BIT[RIGHT], DIRECTION_BIT[LEFT]
+    up, down = DIRECTION_BIT[UP], DIRECTION_BIT[DOWN]
+    # Position of each column of a grid row inside a block row chunk (cell row 0)
+    chunk_col = [(col // CELL_IN_BLOCK) * CELL_IN_BLOCK * CELL_IN_BLOCK + col % CELL_IN_BLOCK for col in range(size)]
+    next_set = 0
+    sets = [-1] * size
+    row_masks = bytearray(size)
+    chunk = bytearray(block_row_cells)
+    
+    for row in range(size):
+        last_row = row == size - 1
+        # Cells not reached from the row above start a set of their own
+        for col in range(size):
+            if sets[col] == -1:
+                sets[col] = next_set
+                next_set += 1
+        
+        # Union-find over the set ids of this row
+        parent = {}
+        def find(set_id):
+            root = set_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while set_id != root:
+                parent[set_id], set_id = root, parent.get(set_id, set_id)
+            return root
+        
+        # Join neighbors in different sets, always on the last row; the last pair wraps around
+        for col in range(size if size > 1 else 0):
+            next_col = (col + 1) % size
+            root_1, root_2 = find(sets[col]), find(sets[next_col])
+            if root_1 != root_2 and (last_row or rng.getrandbits(1)):
+                parent[root_2] = root_1
+                row_masks[col] |= right
+                row_masks[next_col] |= left
+        sets = [find(set_id) for set_id in sets]
+        
+        # Open at least one cell of every set downwards
+        next_sets = [-1] * size
+        next_masks = bytearray(size)
+        if not last_row:
+            members = {}
+            for col in range(size):
+                members.setdefault(sets[col], []).append(col)
+            for set_id, cols in members.items():
+                down_cols = [col for col in cols if rng.getrandbits(1)]
+                if not down_cols:
+                    down_cols = [rng.choice(cols)]
+                for col in down_cols:
+                    row_masks[col] |= down
+                    next_masks[col] |= up
+                    next_sets[col] = set_id
+        
+        # Copy the finished row into the block row chunk
+        base = (row % CELL_IN_BLOCK) * CELL_IN_BLOCK
+        for col in range(size):
+            chunk[chunk_col[col] + base] = row_masks[col]
+        if row % CELL_IN_BLOCK == CELL_IN_BLOCK - 1:
+            yield chunk
+            chunk = bytearray(block_row_cells)
+        sets = next_sets
+        row_masks = next_masks
+
+def save_eller_maze(file_name, block_in_maze, my_seed):
+    """
+    Generate a maze with Eller's algorithm and stream it to a maze file block row by block row.
+
+    Args:
+        file_name (str): The name of the file to write.
+        block_in_maze (int): The number of blocks in each row and column of the maze.
+        my_seed (int): Seed value for random number generation.
+    """
+    with open(file_name, "wb") as fh:
+        fh.write(MAZE_FILE_HEADER.pack(MAZE_FILE_MAGIC, block_in_maze, CELL_IN_BLOCK))
+        for chunk in eller_block_rows(block_in_maze, random.Random(my_seed)):
+            fh.write(chunk)
+
+@register("eller")
+def eller(maze, my_seed):
+    """
+    Generate a maze in memory with Eller's algorithm (see eller_block_rows).
+
+    Args:
+        maze: The Maze object.
+        my_seed (int): Seed value for random number generation.
+
+    Returns:
+        tuple: The start and end positions of the maze.
+    """
+    rng = random.Random(my_seed)
+    offset = 0
+    for chunk in eller_block_rows(maze.block_in_maze, rng):
+        maze.connect_grid[offset:offset+len(chunk)] = chunk
+        offset += len(chunk)
+    return find_start_end(maze, rng)
@@ -0,0 +1,156 @@
+import threading
+import pygame
+from collections import OrderedDict
+from variables import *
+from atlas import load_manifest
+
+class ImageCache:
+    """Class keeping loaded and resized images, evicting the least recently used ones.
+
+    Images are keyed on (path, size, alpha) and the cache is bounded by the total
+    number of bytes of its surfaces. The surfaces returned are shared, so callers
+    must not draw on them.
+
+    When the atlases of atlas.py have been built, sprites found in the manifest
+    are cut out of one atlas per size instead of being loaded and scaled one by one.
+
+    The cache can be used from several threads (see preloader.py). Images are loaded
+    outside of the lock, so a thread never waits for another thread's file; if two
+    threads load the same image, the first one to finish is kept.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Initialize an image cache.
+
+        Args:
+            max_bytes (int): The maximum total size of the cached surfaces in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.images = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.atlas_sprites = None
+        self.lock = threading.Lock()
+
+    def find_sprite(self, path, size):
+        """
+        Find an image in the atlas manifest, which is read on first use.
+
+        Args:
+            path (str): The path to the image file.
+            size (tuple): The size of the image, or None for the original size.
+
+        Returns:
+            tuple: The (atlas path, rect) of the sprite, or None if no atlas contains it.
+        """
+        if self.atlas_sprites is None:
+            self.atlas_sprites = load_manifest()
+        if size is not None:
+            # Atlases hold square sprites, scaled to the truncated size like smoothscale does
+            if int(size[0]) != int(size[1]):
+                return None
+            size = int(size[0])
+        return self.atlas_sprites.get((path, size))
+
+    def get(self, path, size=None, alpha=False):
+        """
+        Get an image, loading and resizing it only if it is not cached yet.
+
+        Args:
+            path (str): The path to the image file.
+            size (tuple, optional): The size to resize the image to with smoothscale. The original size is kept if omitted.
+            alpha (bool, optional): Whether to convert the image with convert_alpha after loading it.
+
+        Returns:
+            pygame.Surface: The image.
+        """
+        key = (path, size, alpha)
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.hits += 1
+                self.images.move_to_end(key)
+                return image
+            self.misses += 1
+            sprite = self.find_sprite(path, size)
+        if sprite is not None:
+            atlas_path, rect = sprite
+            image = self.get(atlas_path, None, True).subsurface(rect)
+        elif size is None:
+            image = pygame.image.load(path)
+            if alpha:
+                image = image.convert_alpha()
+        else:
+            # The original image is cached too, so other sizes do not read the file again
+            image = pygame.transform.smoothscale(self.get(path, None, alpha), size)
+        with self.lock:
+            cached = self.images.get(key)
+            if cached is not None:
+                return cached
+            self.add(key, image)
+        return image
+
+    def add(self, key, image):
+        """
+        Add an image to the cache and evict the least recently used images beyond max_bytes.
+        Called with the lock held.
+
+        Args:
+            key (tuple): The (path, size, alpha) key of the image.
+            image (pygame.Surface): The image.
+        """
+        self.images[key] = image
+        self.total_bytes += image_bytes(image)
+        while self.total_bytes > self.max_bytes and len(self.images) > 1:
+            _, evicted = self.images.popitem(last=False)
+            self.total_bytes -= image_bytes(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove every image from the cache. The counters are kept.
+        """
+        with self.lock:
+            self.images.clear()
+            self.total_bytes = 0
+
+    def __str__(self):
+        """
+        Return a string representation of the cache statistics.
+
+        Returns:
+            str: String representation of the cache.
+        """
+        return f'images:{len(self.images)} bytes:{self.total_bytes} hits:{self.hits} misses:{self.misses} evictions:{self.evictions}'
+
+def image_bytes(image):
+    """
+    Get the size of the pixels of a surface in bytes.
+
+    Args:
+        image (pygame.Surface): The surface.
+
+    Returns:
+        int: The size in bytes.
+    """
+    return image.get_width() * image.get_height() * image.get_bytesize()
+
+# The image cache shared by the whole game
+IMAGE_CACHE = ImageCache(IMAGE_CACHE_MAX_BYTES)
+
+def load_image(path, size=None, alpha=False):
+    """
+    Get an image from the shared image cache (see ImageCache.get).
+
+    Args:
+        path (str): The path to the image file.
+        size (tuple, optional): The size to resize the image to.
+        alpha (bool, optional): Whether to convert the image with convert_alpha.
+
+    Returns:
+        pygame.Surface: The image.
+    """
+    return IMAGE_CACHE.get(path, size, alpha)
@@ -0,0 +1,87 @@
+import pygame
+from variables import *
+from sound_bank import SOUND_BANK
+
+# Event posted when a sound waited for with wait_for_channel ends
+SOUND_END_EVENT = pygame.event.custom_type()
+
+class LoopDriver:
+    """Class pacing the event loops of the game.
+
+    Each call to get_events is one frame: it waits for the rest of the frame time
+    with pygame.time.Clock, and when no event is queued it sleeps in
+    pygame.event.wait until one arrives or the idle timeout expires. An idle game
+    therefore wakes up a few times per second instead of spinning a core.
+    """
+
+    def __init__(self, fps, idle_timeout):
+        """
+        Initialize a loop driver.
+
+        Args:
+            fps (int): The maximum number of frames per second.
+            idle_timeout (int): The longest time to wait for an event when idle, in milliseconds.
+        """
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+
+    def get_events(self):
+        """
+        Wait for the next frame and get its events, like pygame.event.get().
+
+        Music end events are handed to the sound bank and not returned.
+
+        Returns:
+            list: The events of the frame, empty if the idle timeout expired.
+        """
+        self.clock.tick(self.fps)
+        events = pygame.event.get()
+        if not events:
+            event = pygame.event.wait(self.idle_timeout)
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+        return [event for event in events if not SOUND_BANK.handle_event(event)]
+
+    def wait_for_channel(self, channel):
+        """
+        Sleep until a channel stops playing, woken by its end event.
+
+        Events arriving in the meantime are put back in the queue in their order.
+
+        Args:
+            channel (pygame.mixer.Channel): The channel playing the sound.
+        """
+        channel.set_endevent(SOUND_END_EVENT)
+        pending = []
+        # get_busy is checked after every timeout, in case the sound ended before its end event was set
+        while channel.get_busy():
+            event = pygame.event.wait(self.idle_timeout)
+            if event.type == SOUND_END_EVENT:
+                break
+            if event.type != pygame.NOEVENT:
+                pending.append(event)
+        channel.set_endevent()
+        for event in pending:
+            pygame.event.post(event)
+
+# The loop driver shared by the event loops of the game
+LOOP_DRIVER = LoopDriver(TARGET_FPS, IDLE_WAIT_TIME)
+
+def get_events():
+    """
+    Wait for the next frame and get its events (see LoopDriver.get_events).
+
+    Returns:
+        list: The events of the frame.
+    """
+    return LOOP_DRIVER.get_events()
+
+def wait_for_channel(channel):
+    """
+    Sleep until a channel stops playing (see LoopDriver.wait_for_channel).
+
+    Args:
+        channel (pygame.mixer.Channel): The channel playing the sound.
+    """
+    LOOP_DRIVER.wait_for_channel(channel)
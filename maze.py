@@ -1,10 +1,65 @@
+import math
+import random
 import pygame
 from variables import *
 from cell import Cell
 from block import Block
+from generator import GENERATORS, MAZE_FILE_HEADER, MAZE_FILE_MAGIC
+
+def shuffle_directions(getrandbits, directions):
+    """
+    Shuffle a list of four directions in place the way random.Random.shuffle does, drawing the
+    same numbers from the generator, without its per-swap method calls.
+
+    This copies a CPython implementation detail: Random.shuffle swaps item i with item
+    _randbelow(i + 1) for i from 3 down to 1, and _randbelow_with_getrandbits(n) draws
+    getrandbits(n.bit_length()) until the value is below n. check_shuffle_directions
+    verifies it at import.
+
+    Args:
+        getrandbits (callable): The getrandbits method of the generator.
+        directions (list): The four directions to shuffle.
+    """
+    j = getrandbits(3)
+    while j > 3:
+        j = getrandbits(3)
+    directions[3], directions[j] = directions[j], directions[3]
+    j = getrandbits(2)
+    while j > 2:
+        j = getrandbits(2)
+    directions[2], directions[j] = directions[j], directions[2]
+    j = getrandbits(2)
+    while j > 1:
+        j = getrandbits(2)
+    directions[1], directions[j] = directions[j], directions[1]
+
+def check_shuffle_directions():
+    """
+    Check that shuffle_directions gives the same orders as random.Random.shuffle on this Python.
+
+    Returns:
+        bool: True if it does, otherwise generate_maze keeps random.Random.shuffle.
+    """
+    rng_1, rng_2 = random.Random(0), random.Random(0)
+    directions_1, directions_2 = DIRECTION.copy(), DIRECTION.copy()
+    for _ in range(1000):
+        rng_1.shuffle(directions_1)
+        shuffle_directions(rng_2.getrandbits, directions_2)
+        if directions_1 != directions_2:
+            return False
+    return rng_1.random() == rng_2.random()
+
+# Whether generate_maze can use shuffle_directions and still produce the same maze for a seed.
+# It relies on how CPython's Random.shuffle draws its numbers (see shuffle_directions).
+FAST_SHUFFLE = check_shuffle_directions()
 
 class Maze(Cell):
-    """Class representing a maze made up of blocks of cells."""
+    """Class representing a maze made up of blocks of cells.
+
+    A Maze owns the topology (connect grid, blocks and block number index) and
+    also acts as the view that draws it at its own position and cell size.
+    Further views of the same topology are created with MazeView.
+    """
     
     def __init__(self, x, y, block_in_maze, cell_size, line_width):
         """
@@ -22,8 +77,12 @@ class Maze(Cell):
         self.block_in_maze = block_in_maze
         self.cell_size = cell_size
         self.line_width = line_width
-        # Create a 2D array to hold blocks in the maze
-        self.block = [[Block(x+j*cell_size*CELL_IN_BLOCK, y+i*cell_size*CELL_IN_BLOCK, i*block_in_maze+j, cell_size, line_width) for j in range(block_in_maze)] for i in range(block_in_maze)]
+        # One connect mask (see DIRECTION_BIT) per cell, stored block by block so a block occupies a contiguous slice
+        self.connect_grid = bytearray(block_in_maze * block_in_maze * CELL_IN_BLOCK * CELL_IN_BLOCK)
+        # Create a 2D array to hold blocks in the maze, each one a view over its slice of the connect grid
+        self.block = [[Block(i*block_in_maze+j, self.connect_grid, (i*block_in_maze+j)*CELL_IN_BLOCK*CELL_IN_BLOCK) for j in range(block_in_maze)] for i in range(block_in_maze)]
+        # Map each block number to its (row, col); block[row][col].block_num is the inverse
+        self.block_number_index = [divmod(block_num, block_in_maze) for block_num in range(block_in_maze * block_in_maze)]
         
     def __str__(self):
         """
@@ -77,28 +136,196 @@ class Maze(Cell):
         Returns:
             tuple: The row and column indices of the block.
         """
-        for row in range(self.block_in_maze):
-            for col in range(self.block_in_maze):
-                if self.block[row][col].block_num == block_number:
-                    return (row, col)
+        if 0 <= block_number < len(self.block_number_index):
+            return self.block_number_index[block_number]
         print("Incorrect block number")
         return (-1, -1)
         
+    def cell_index(self, pos):
+        """
+        Get the index of a cell's connect mask in the connect grid.
+
+        Args:
+            pos (tuple): The position of the cell (block_row, block_col, cell_row, cell_col).
+
+        Returns:
+            int: The index of the cell in self.connect_grid.
+        """
+        block_row, block_col, cell_row, cell_col = pos
+        return ((block_row * self.block_in_maze + block_col) * CELL_IN_BLOCK + cell_row) * CELL_IN_BLOCK + cell_col
+    
+    def is_connected(self, pos, direction):
+        """
+        Check whether a cell is open in the given direction.
+
+        Args:
+            pos (tuple): The position of the cell (block_row, block_col, cell_row, cell_col).
+            direction (tuple): The direction to check (dir_x, dir_y).
+
+        Returns:
+            bool: True if the cell has no wall on that side, False otherwise.
+        """
+        return self.connect_grid[self.cell_index(pos)] & DIRECTION_BIT[direction] != 0
+    
+    def grid_index(self, pos):
+        """
+        Get the index of a cell in the whole grid of cells, counted row by row.
+
+        Args:
+            pos (tuple): The position of the cell (block_row, block_col, cell_row, cell_col).
+
+        Returns:
+            int: The grid index (row * size + col) where size is the number of cells per side.
+        """
+        size = self.block_in_maze * CELL_IN_BLOCK
+        return (pos[0] * CELL_IN_BLOCK + pos[2]) * size + pos[1] * CELL_IN_BLOCK + pos[3]
+    
+    def grid_pos(self, index):
+        """
+        Get the position of a cell from its grid index.
+
+        Args:
+            index (int): The grid index of the cell.
+
+        Returns:
+            tuple: The position of the cell (block_row, block_col, cell_row, cell_col).
+        """
+        row, col = divmod(index, self.block_in_maze * CELL_IN_BLOCK)
+        return (row // CELL_IN_BLOCK, col // CELL_IN_BLOCK, row % CELL_IN_BLOCK, col % CELL_IN_BLOCK)
+    
+    def grid_connect_masks(self):
+        """
+        Get the connect masks of all cells in grid order (row by row over the whole maze),
+        following the current arrangement of the blocks.
+
+        Returns:
+            bytearray: The connect mask of the cell with grid index i at position i.
+        """
+        size = self.block_in_maze * CELL_IN_BLOCK
+        masks = bytearray(size * size)
+        for block_row in range(self.block_in_maze):
+            for block_col in range(self.block_in_maze):
+                offset = self.block[block_row][block_col].offset
+                for cell_row in range(CELL_IN_BLOCK):
+                    start = (block_row * CELL_IN_BLOCK + cell_row) * size + block_col * CELL_IN_BLOCK
+                    masks[start:start+CELL_IN_BLOCK] = self.connect_grid[offset+cell_row*CELL_IN_BLOCK:offset+(cell_row+1)*CELL_IN_BLOCK]
+        return masks
+    
+    def set_grid_connect_masks(self, masks):
+        """
+        Set the connect masks of all cells from masks in grid order, the inverse of grid_connect_masks.
+
+        Args:
+            masks (bytearray): The connect mask of the cell with grid index i at position i.
+        """
+        size = self.block_in_maze * CELL_IN_BLOCK
+        for block_row in range(self.block_in_maze):
+            for block_col in range(self.block_in_maze):
+                offset = self.block[block_row][block_col].offset
+                for cell_row in range(CELL_IN_BLOCK):
+                    start = (block_row * CELL_IN_BLOCK + cell_row) * size + block_col * CELL_IN_BLOCK
+                    self.connect_grid[offset+cell_row*CELL_IN_BLOCK:offset+(cell_row+1)*CELL_IN_BLOCK] = masks[start:start+CELL_IN_BLOCK]
+    
+    def get_pos(self, block_number, cell_row, cell_col):
+        """
+        Get the current position of a cell given by its block number.
+
+        Args:
+            block_number (int): The number of the block containing the cell.
+            cell_row (int): The row of the cell in the block.
+            cell_col (int): The column of the cell in the block.
+
+        Returns:
+            tuple: The position (block_row, block_col, cell_row, cell_col).
+        """
+        block_row, block_col = self.get_block_number_index(block_number)
+        return (block_row, block_col, cell_row, cell_col)
+    
+    def grid_neighbor(self, index, direction):
+        """
+        Get the grid index of the neighbor of a cell, wrapping around the maze like wrap_around.
+
+        Args:
+            index (int): The grid index of the cell.
+            direction (tuple): The direction of the neighbor (dir_x, dir_y).
+
+        Returns:
+            int: The grid index of the neighbor.
+        """
+        size = self.block_in_maze * CELL_IN_BLOCK
+        row, col = divmod(index, size)
+        return ((row + direction[0]) % size) * size + (col + direction[1]) % size
+    
+    def carve(self, index, direction):
+        """
+        Remove the wall between a cell and its (wrapped) neighbor in the given direction.
+
+        Args:
+            index (int): The grid index of the cell.
+            direction (tuple): The direction of the neighbor (dir_x, dir_y).
+        """
+        self.connect_grid[self.cell_index(self.grid_pos(index))] |= DIRECTION_BIT[direction]
+        neighbor = self.grid_neighbor(index, direction)
+        self.connect_grid[self.cell_index(self.grid_pos(neighbor))] |= DIRECTION_BIT[OPPOSITE_DIRECTION[direction]]
+    
+    def get_cell_pos(self, pos):
+        """
+        Get the pixel position of the top-left corner of a cell.
+
+        Args:
+            pos (tuple): The position of the cell (block_row, block_col, cell_row, cell_col).
+
+        Returns:
+            tuple: The (x, y) pixel position of the cell.
+        """
+        block_row, block_col, cell_row, cell_col = pos
+        return (self.x + (block_col * CELL_IN_BLOCK + cell_col) * self.cell_size,\
+                self.y + (block_row * CELL_IN_BLOCK + cell_row) * self.cell_size)
+        
+    def visible_range(self, rect):
+        """
+        Get the range of cells of the maze, at its current position, that can show in a rectangle.
+
+        Cells whose walls could reach into the rectangle are included as well.
+
+        Args:
+            rect (pygame.Rect): The rectangle, in the coordinates the maze is drawn in.
+
+        Returns:
+            tuple: (first_row, last_row, first_col, last_col) of the cells in grid coordinates, end excluded.
+        """
+        size = self.block_in_maze * CELL_IN_BLOCK
+        margin = self.line_width + 1
+        first_row = max(0, math.floor((rect.top - margin - self.y) / self.cell_size))
+        last_row = min(size, math.floor((rect.bottom + margin - self.y) / self.cell_size) + 1)
+        first_col = max(0, math.floor((rect.left - margin - self.x) / self.cell_size))
+        last_col = min(size, math.floor((rect.right + margin - self.x) / self.cell_size) + 1)
+        return (first_row, max(first_row, last_row), first_col, max(first_col, last_col))
+
     def draw(self, window, color):
         """
         Draw the maze on the window.
 
+        Only the blocks and cells that can show in the clip area of the window are drawn,
+        so the cost depends on the size of the window and not on the size of the maze.
+
         Args:
             window: The Pygame window surface to draw on.
             color: The color of the lines to draw.
         """
-        for i in range(self.block_in_maze):
-            for j in range(self.block_in_maze):
-                self.block[i][j].draw(window, color)
+        block_size = self.cell_size * CELL_IN_BLOCK
+        first_row, last_row, first_col, last_col = self.visible_range(window.get_clip())
+        if first_row == last_row or first_col == last_col:
+            return
+        for i in range(first_row // CELL_IN_BLOCK, (last_row - 1) // CELL_IN_BLOCK + 1):
+            rows = range(max(first_row - i * CELL_IN_BLOCK, 0), min(last_row - i * CELL_IN_BLOCK, CELL_IN_BLOCK))
+            for j in range(first_col // CELL_IN_BLOCK, (last_col - 1) // CELL_IN_BLOCK + 1):
+                cols = range(max(first_col - j * CELL_IN_BLOCK, 0), min(last_col - j * CELL_IN_BLOCK, CELL_IN_BLOCK))
+                self.block[i][j].draw(window, color, self.x+j*block_size, self.y+i*block_size, self.cell_size, self.line_width, rows, cols)
                 
     def move(self, dx, dy):
         """
-        Move the maze and its blocks by the specified amount.
+        Move the maze by the specified amount.
 
         Args:
             dx (int): The amount to move in the x-direction.
@@ -106,9 +333,6 @@ class Maze(Cell):
         """
         self.x += dx
         self.y += dy
-        for row in self.block:
-            for block in row:
-                block.move(dx, dy)
     
     def reset_pos(self):
         '''
@@ -116,9 +340,6 @@ class Maze(Cell):
         '''
         self.x = 0
         self.y = 0
-        for row in range(self.block_in_maze):
-            for col in range(self.block_in_maze):
-                self.block[row][col].reset_pos(col * self.cell_size * CELL_IN_BLOCK, row * self.cell_size * CELL_IN_BLOCK)
                 
     def wrap_around(self, pos, direction):
         """
@@ -159,79 +380,141 @@ class Maze(Cell):
         """
         Generate a maze within the Maze object using a depth-first search algorithm.
 
+        The search runs on global cell indices (row * size + col) and keeps each
+        path as a parent pointer instead of a copied list, so generation is linear
+        in the number of cells. Neighbors come from precomputed tables and walls
+        are carved into grid-ordered masks, without a method call per cell. The
+        random calls are made in the same order as before, on a random.Random of
+        its own, so a given seed still produces the same maze and longest path
+        whatever else draws random numbers meanwhile.
+
         Args:
             my_seed (int): Seed value for random number generation.
 
         Returns:
             list: The longest path found during maze generation.
         """
-        random.seed(my_seed)
+        rng = random.Random(my_seed)
         
         # Create a copy of the DIRECTION list to avoid changing the original list
         direction_list = DIRECTION.copy()
         
-        # Define a dictionary to map directions to their opposites
-        direction_dict = {
-            UP: DOWN,
-            DOWN: UP,
-            RIGHT: LEFT,
-            LEFT: RIGHT
-        }
+        size = self.block_in_maze * CELL_IN_BLOCK
         
-        # Initialize sets and lists for tracking visited positions, the stack, and the longest path found
-        visited = set()
+        # Carve into the masks in grid order, written back to the connect grid at the end, and
+        # look up the neighbors of a cell in per-direction tables of wrapped rows and columns
+        masks = self.grid_connect_masks()
+        neighbor_tables = {direction: ([((row + direction[0]) % size) * size for row in range(size)],
+                                       [(col + direction[1]) % size for col in range(size)]) for direction in DIRECTION}
+        opposite_bit = {direction: DIRECTION_BIT[OPPOSITE_DIRECTION[direction]] for direction in DIRECTION}
+        
+        # Visited flags per cell and the path tree: node i ends at path_cell[i] and continues path_parent[i]
+        visited = bytearray(size * size)
+        path_cell = []
+        path_parent = []
+        path_length = []
         stack = []
-        longest_path = []
+        longest_node = -1
+        longest_length = 0
         
         # Choose a random starting position within the maze
-        start = (random.choice(range(self.block_in_maze)),random.choice(range(self.block_in_maze)),random.choice(range(CELL_IN_BLOCK)),random.choice(range(CELL_IN_BLOCK)))
+        start = (rng.choice(range(self.block_in_maze)),rng.choice(range(self.block_in_maze)),rng.choice(range(CELL_IN_BLOCK)),rng.choice(range(CELL_IN_BLOCK)))
+        start_index = self.grid_index(start)
         
         # Mark the starting position as visited
-        visited.add(start)
+        visited[start_index] = 1
         
         # Choose a random starting direction
-        start_direction = random.choice(direction_list)
-        # print(start, start_direction)
+        start_direction = rng.choice(direction_list)
         
-        # Push the starting position, direction, and path onto the stack
-        stack.append((start, start_direction, [start, self.wrap_around(start, start_direction)]))
+        # Push the starting position, direction, and path [start, start + direction] onto the stack
+        path_cell += [start_index, self.grid_neighbor(start_index, start_direction)]
+        path_parent += [-1, 0]
+        path_length += [1, 2]
+        stack.append((start_index, start_direction, 1))
         
         # Main loop for maze generation
-        while len(stack) > 0:
+        shuffle, getrandbits = rng.shuffle, rng.getrandbits
+        push = stack.append
+        while stack:
             # Pop the top element from the stack
-            (pos, direction, path) = stack.pop()
+            pos, direction, node = stack.pop()
             
-             # Calculate the position in the current direction
-            curr_pos = self.wrap_around(pos, direction)
+            # The current position is the last cell of the popped path
+            curr_pos = path_cell[node]
+            length = path_length[node]
             
             # Update the longest path found if the current path is longer
-            if len(path) > len(longest_path):
-                longest_path = path.copy()
+            if length > longest_length:
+                longest_node = node
+                longest_length = length
                 
             # If the current position has not been visited
-            if curr_pos not in visited:
+            if not visited[curr_pos]:
                 # Mark the current position as visited
-                visited.add(curr_pos)
+                visited[curr_pos] = 1
                 
-                # Add the direction to the connection list of both current cell (current pos) and original cell (pos)
-                self.block[pos[0]][pos[1]].cell[pos[2]][pos[3]].connect.append(direction)
-                self.block[curr_pos[0]][curr_pos[1]].cell[curr_pos[2]][curr_pos[3]].connect.append(direction_dict[direction])
+                # Open the wall between the original cell (pos) and the current cell (current pos) on both sides
+                masks[pos] |= DIRECTION_BIT[direction]
+                masks[curr_pos] |= opposite_bit[direction]
             
             # Shuffle the direction list to explore in a random order
-            random.shuffle(direction_list)
+            if FAST_SHUFFLE:
+                shuffle_directions(getrandbits, direction_list)
+            else:
+                shuffle(direction_list)
             
             # Explore neighbors in the current position
+            row, col = divmod(curr_pos, size)
             for direction in direction_list:
-                new_pos = self.wrap_around(curr_pos, direction)
-                # If the neighbor has not been visited and is not already in the stack
-                if (new_pos not in visited) and ((curr_pos, direction, path) not in stack):
-                    # Add the neighbor position, direction, and new path to the stack
-                    new_path = path + [new_pos]
-                    stack.append((curr_pos, direction, new_path))
+                row_table, col_table = neighbor_tables[direction]
+                new_pos = row_table[row] + col_table[col]
+                if not visited[new_pos]:
+                    # Extend the path by one node pointing back to the current path
+                    path_cell.append(new_pos)
+                    path_parent.append(node)
+                    path_length.append(length + 1)
+                    push((curr_pos, direction, len(path_cell) - 1))
+        self.set_grid_connect_masks(masks)
+        
+        # Walk the parent pointers back from the end of the longest path
+        longest_path = []
+        while longest_node != -1:
+            row, col = divmod(path_cell[longest_node], size)
+            longest_path.append((row // CELL_IN_BLOCK, col // CELL_IN_BLOCK, row % CELL_IN_BLOCK, col % CELL_IN_BLOCK))
+            longest_node = path_parent[longest_node]
+        longest_path.reverse()
                     
         # Return the longest path found during maze generation
         return longest_path
     
+    def generate(self, my_seed, algorithm="dfs"):
+        """
+        Generate the maze with one of the registered generation algorithms.
+
+        Args:
+            my_seed (int): Seed value for random number generation.
+            algorithm (str): The name of the algorithm in GENERATORS
+                ("dfs", "kruskal", "wilson", "binary_tree" or "sidewinder").
+
+        Returns:
+            tuple: The start and end positions (block_row, block_col, cell_row, cell_col).
+        """
+        if algorithm not in GENERATORS:
+            raise ValueError(f"Unknown maze generation algorithm: {algorithm}")
+        return GENERATORS[algorithm](self, my_seed)
+    
+    def save(self, file_name):
+        """
+        Save the connect grid of the maze to a maze file (the format written by save_eller_maze).
+
+        Args:
+            file_name (str): The name of the file to write.
+        """
+        with open(file_name, "wb") as fh:
+            fh.write(MAZE_FILE_HEADER.pack(MAZE_FILE_MAGIC, self.block_in_maze, CELL_IN_BLOCK))
+            fh.write(self.connect_grid)
+    
     def exchange_block(self, block1_idx, block2_idx):
         """
         Exchange the positions and connections of two blocks in the maze.
@@ -243,13 +526,16 @@ class Maze(Cell):
         block1_x, block1_y = block1_idx
         block2_x, block2_y = block2_idx
         
-        for i in range(CELL_IN_BLOCK):
-            for j in range(CELL_IN_BLOCK):
-                temp_connect = self.block[block1_x][block1_y].cell[i][j].connect.copy()
-                self.block[block1_x][block1_y].cell[i][j].connect = self.block[block2_x][block2_y].cell[i][j].connect.copy()
-                self.block[block2_x][block2_y].cell[i][j].connect = temp_connect
+        # Swap the two contiguous slices of the connect grid
+        block_cells = CELL_IN_BLOCK * CELL_IN_BLOCK
+        offset1 = self.block[block1_x][block1_y].offset
+        offset2 = self.block[block2_x][block2_y].offset
+        self.connect_grid[offset1:offset1+block_cells], self.connect_grid[offset2:offset2+block_cells] = \
+            self.connect_grid[offset2:offset2+block_cells], self.connect_grid[offset1:offset1+block_cells]
         
         self.block[block1_x][block1_y].block_num, self.block[block2_x][block2_y].block_num = self.block[block2_x][block2_y].block_num, self.block[block1_x][block1_y].block_num
+        self.block_number_index[self.block[block1_x][block1_y].block_num] = (block1_x, block1_y)
+        self.block_number_index[self.block[block2_x][block2_y].block_num] = (block2_x, block2_y)
 
     
     def randomize(self, my_seed):
@@ -259,9 +545,9 @@ class Maze(Cell):
         Args:
             my_seed (int): Seed value for random number generation.
         """
-        random.seed(my_seed)
+        rng = random.Random(my_seed)
         for _ in range(10):
-            self.exchange_block((random.choice(range(self.block_in_maze)),random.choice(range(self.block_in_maze))), (random.choice(range(self.block_in_maze)),random.choice(range(self.block_in_maze))))
+            self.exchange_block((rng.choice(range(self.block_in_maze)),rng.choice(range(self.block_in_maze))), (rng.choice(range(self.block_in_maze)),rng.choice(range(self.block_in_maze))))
 
     def draw_sol_line(self, pos_1, pos_2, window):
         """
@@ -275,10 +561,12 @@ class Maze(Cell):
         # Calculate center coordinates of cells in the blocks
         block_1_row, block_1_col, cell_1_row, cell_1_col = pos_1
         block_2_row, block_2_col, cell_2_row, cell_2_col = pos_2
-        block_1_center_x = self.block[block_1_row][block_1_col].cell[cell_1_row][cell_1_col].x + self.cell_size/2
-        block_1_center_y = self.block[block_1_row][block_1_col].cell[cell_1_row][cell_1_col].y + self.cell_size/2
-        block_2_center_x = self.block[block_2_row][block_2_col].cell[cell_2_row][cell_2_col].x + self.cell_size/2
-        block_2_center_y = self.block[block_2_row][block_2_col].cell[cell_2_row][cell_2_col].y + self.cell_size/2
+        block_1_x, block_1_y = self.get_cell_pos(pos_1)
+        block_2_x, block_2_y = self.get_cell_pos(pos_2)
+        block_1_center_x = block_1_x + self.cell_size/2
+        block_1_center_y = block_1_y + self.cell_size/2
+        block_2_center_x = block_2_x + self.cell_size/2
+        block_2_center_y = block_2_y + self.cell_size/2
         
         # Draw the line between the centers of the cells
         # block in maze must > 2
@@ -310,4 +598,177 @@ class Maze(Cell):
             window: The Pygame window surface to draw on.
         """
         for i in range(len(path)-1):
-            self.draw_sol_line(path[i], path[i+1], window)
\ No newline at end of file
+            self.draw_sol_line(path[i], path[i+1], window)
+
+    def snapshot(self):
+        """
+        Get a view of the maze frozen with its current walls and block order, for a reader on another thread.
+
+        Only the connect grid and the block number index are copied, not every Block, so it stays fast on
+        very large mazes. The blocks are still shared with the maze, so the snapshot is meant for readers of
+        the walls and the block order only, such as export.save_maze_png.
+
+        Returns:
+            MazeView: The frozen view, at the position, cell size and line width of the maze.
+        """
+        view = MazeView(self, self.x, self.y, self.cell_size, self.line_width)
+        view.connect_grid = bytes(self.connect_grid)
+        view.block_number_index = self.block_number_index.copy()
+        return view
+
+def load_maze(file_name, x, y, cell_size, line_width):
+    """
+    Load a maze saved by Maze.save or save_eller_maze.
+
+    Args:
+        file_name (str): The name of the maze file.
+        x (int): The x-coordinate of the top-left corner of the maze.
+        y (int): The y-coordinate of the top-left corner of the maze.
+        cell_size (int): The size of each cell in the maze.
+        line_width (int): The width of the lines to draw for the maze.
+
+    Returns:
+        Maze: The loaded maze, with blocks in their original order.
+    """
+    with open(file_name, "rb") as fh:
+        magic, block_in_maze, cell_in_block = MAZE_FILE_HEADER.unpack(fh.read(MAZE_FILE_HEADER.size))
+        if magic != MAZE_FILE_MAGIC or cell_in_block != CELL_IN_BLOCK:
+            raise ValueError(f"{file_name} is not a maze file with {CELL_IN_BLOCK} cells per block")
+        maze = Maze(x, y, block_in_maze, cell_size, line_width)
+        if fh.readinto(maze.connect_grid) != len(maze.connect_grid):
+            raise ValueError(f"{file_name} is truncated")
+    return maze
+
+class MazeView(Maze):
+    """Class representing another view of an existing maze.
+
+    A view only holds its own position, cell size and line width; the blocks,
+    connect grid and block number index are shared with the maze it was created
+    from, so generating, randomizing or exchanging blocks through any of them
+    updates all of them at once.
+    """
+    
+    def __init__(self, maze: Maze, x, y, cell_size, line_width):
+        """
+        Initialize a view of a maze.
+
+        Args:
+            maze (Maze): The maze whose topology the view shares.
+            x (int): The x-coordinate of the top-left corner of the view.
+            y (int): The y-coordinate of the top-left corner of the view.
+            cell_size (int): The size of each cell in the view.
+            line_width (int): The width of the lines to draw for the view.
+        """
+        self.x = x
+        self.y = y
+        self.cell_size = cell_size
+        self.line_width = line_width
+        self.block_in_maze = maze.block_in_maze
+        self.connect_grid = maze.connect_grid
+        self.block = maze.block
+        self.block_number_index = maze.block_number_index
+
+class MazeCache:
+    """Class keeping a pre-rendered image of a maze view.
+
+    The whole maze is drawn once into an off-screen image and each frame only
+    the visible part of it is blitted. When blocks are exchanged only their
+    tiles are drawn again (see render_block). Mazes wider than MAZE_CACHE_MAX_SIZE
+    pixels are not cached; their visible cells are drawn on every frame instead.
+
+    The image is drawn at positive coordinates, so the outline of a block lying
+    partly left of or above a view at a fractional position may end up one pixel
+    away from where Maze.draw puts it (pygame rounds negative positions up).
+    """
+
+    def __init__(self, maze: Maze, width, height, background, color):
+        """
+        Initialize the cache of a maze view.
+
+        Args:
+            maze (Maze): The maze or maze view to draw; its position is read on every draw.
+            width (int): The width of the visible part of the maze.
+            height (int): The height of the visible part of the maze.
+            background: The background color of the maze.
+            color: The color of the lines to draw.
+        """
+        self.maze = maze
+        self.background = background
+        self.color = color
+        self.surface = pygame.Surface((width, height))
+        # Wall lines stick out of the maze by up to line_width pixels
+        self.margin = math.ceil(maze.line_width) + 1
+        self.image = None
+        self.fraction = None
+
+    def get_fraction(self):
+        """
+        Get the fractional part of the position of the maze, which changes how its lines are rounded.
+
+        Returns:
+            tuple: The fractional parts of x and y.
+        """
+        return (self.maze.x - math.floor(self.maze.x), self.maze.y - math.floor(self.maze.y))
+
+    def render(self):
+        """
+        Draw the whole maze into the cached image.
+        """
+        self.fraction = self.get_fraction()
+        size = math.ceil(self.maze.block_in_maze * CELL_IN_BLOCK * self.maze.cell_size) + 2 * self.margin
+        self.image = pygame.Surface((size, size))
+        self.image.fill(self.background)
+        self.get_image_view().draw(self.image, self.color)
+
+    def get_image_view(self):
+        """
+        Get a view of the maze placed at its position inside the cached image.
+
+        Returns:
+            MazeView: The view.
+        """
+        return MazeView(self.maze, self.margin + self.fraction[0], self.margin + self.fraction[1], self.maze.cell_size, self.maze.line_width)
+
+    def render_block(self, block_row, block_col):
+        """
+        Draw one block tile of the cached image again, after the block at that position changed.
+
+        The lines of neighboring blocks reaching into the tile are drawn again as well, in the
+        same order as Maze.draw, so the tile ends up as it would after a full render.
+
+        Args:
+            block_row (int): The row of the block in the maze.
+            block_col (int): The column of the block in the maze.
+        """
+        if self.image is None:
+            return
+        view = self.get_image_view()
+        block_size = view.cell_size * CELL_IN_BLOCK
+        tile = pygame.Rect(math.floor(view.x + block_col * block_size) - self.margin, math.floor(view.y + block_row * block_size) - self.margin,
+                           math.ceil(block_size) + 2 * self.margin, math.ceil(block_size) + 2 * self.margin)
+        # Maze.draw only draws what reaches into the clip area, in its usual order
+        self.image.set_clip(tile)
+        self.image.fill(self.background)
+        view.draw(self.image, self.color)
+        self.image.set_clip(None)
+
+    def draw(self, window, pos):
+        """
+        Blit the visible part of the maze to the window.
+
+        Args:
+            window: The Pygame window surface to draw on.
+            pos (tuple): The position of the visible part on the window.
+
+        Returns:
+            pygame.Rect: The area of the window drawn on.
+        """
+        self.surface.fill(self.background)
+        if self.maze.block_in_maze * CELL_IN_BLOCK * self.maze.cell_size > MAZE_CACHE_MAX_SIZE:
+            # Too large to keep as one image: draw the visible cells only
+            self.maze.draw(self.surface, self.color)
+        else:
+            if self.image is None or self.fraction != self.get_fraction():
+                self.render()
+            self.surface.blit(self.image, (math.floor(self.maze.x) - self.margin, math.floor(self.maze.y) - self.margin))
+        return window.blit(self.surface, pos)
@@ -0,0 +1,191 @@
+import os
+import threading
+import pygame
+from variables import *
+from image_cache import load_image
+from sound_bank import SOUND_BANK
+from text_cache import get_font
+
+ITEM_TYPE_LIST = ["coin", "sword", "meat", "coke", "shield", "finish_flag"]
+# The middle maze fills the visible part of the screen, so its cell size depends on the number of blocks
+MIDDLE_MAZE_CELL_SIZES = [VISIBLE_WIDTH/(block_in_maze*CELL_IN_BLOCK) for block_in_maze in (3, 4, 5)]
+
+def game_image_list():
+    """
+    List the images play_game loads, with the size and alpha flag game_play loads them with.
+
+    Returns:
+        list: (path, size, alpha) tuples, as passed to load_image.
+    """
+    images = [("assets/image/Game Background.png", (SCREEN_WIDTH, SCREEN_HEIGHT), True),
+              ("assets/image/coin.png", (HELPER_COIN_SIZE, HELPER_COIN_SIZE), True),
+              ("assets/image/red-circle.png", (SMALL_MAZE_CELL_SIZE, SMALL_MAZE_CELL_SIZE), False),
+              ("assets/image/danger.png", (SMALL_MAZE_CELL_SIZE, SMALL_MAZE_CELL_SIZE), False)]
+    for icon in ICON_LIST:
+        images.append((f"assets/image/{icon}.png", (PLAYER_INFORMATION_IMAGE_SIZE, PLAYER_INFORMATION_IMAGE_SIZE), True))
+    for helper in HELPER_LIST:
+        for portrait in (helper, f"bw_{helper}"):
+            images.append((f"assets/image/portrait/{portrait}.png", (HELPER_PORTRAIT_SIZE, HELPER_PORTRAIT_SIZE), True))
+        images.append((f"assets/image/portrait/{helper}_effect.jpg", (730, 730), True))
+    for direction in ("up", "down", "left", "right"):
+        for frame in (1, 2):
+            images.append((f"assets/image/move_{direction}/frame_{frame}.png", None, False))
+    for item_type in ITEM_TYPE_LIST:
+        for cell_size in [LARGE_MAZE_CELL_SIZE, SMALL_MAZE_CELL_SIZE] + MIDDLE_MAZE_CELL_SIZES:
+            images.append((f"assets/image/{item_type}.png", (cell_size, cell_size), True))
+    for cell_size in MIDDLE_MAZE_CELL_SIZES:
+        images.append(("assets/image/red-circle.png", (cell_size, cell_size), False))
+        images.append(("assets/image/danger.png", (cell_size, cell_size), False))
+    for name in HARD_ENEMY_LIST:
+        images.append((f"assets/image/enemy/{name}/{name}.png", (LARGE_MAZE_CELL_SIZE, LARGE_MAZE_CELL_SIZE), False))
+    return images
+
+def battle_image_list():
+    """
+    List the images battle loads, with the size and alpha flag game_play loads them with.
+
+    Returns:
+        list: (path, size, alpha) tuples, as passed to load_image.
+    """
+    battle_size = (BATTLE_PLAYER_IMAGE_SIZE, BATTLE_PLAYER_IMAGE_SIZE)
+    images = [("assets/image/battle_background.png", (VISIBLE_WIDTH+5, VISIBLE_HEIGHT+5), True),
+              ("assets/image/move_left/frame_2.png", battle_size, True),
+              ("assets/image/defend.png", battle_size, True),
+              ("assets/image/sword.png", (TURN_ICON_IMAGE_SIZE, TURN_ICON_IMAGE_SIZE), True),
+              ("assets/image/defense.png", (TURN_ICON_IMAGE_SIZE, TURN_ICON_IMAGE_SIZE), True)]
+    for icon in ENEMY_ICON_LIST:
+        images.append((f"assets/image/{icon}.png", (PLAYER_INFORMATION_IMAGE_SIZE, PLAYER_INFORMATION_IMAGE_SIZE), True))
+    for i in range(1, 4):
+        images.append((f"assets/image/attack/attack_{i}.png", battle_size, True))
+    for name in HARD_ENEMY_LIST:
+        for image_name in [name, "defend"] + [f"attack_{i}" for i in range(1, 4)]:
+            images.append((f"assets/image/enemy/{name}/{image_name}.png", battle_size, True))
+    return images
+
+def game_over_image_list():
+    """
+    List the images game_over loads, with the size and alpha flag game_play loads them with.
+
+    Returns:
+        list: (path, size, alpha) tuples, as passed to load_image.
+    """
+    return [("assets/image/brick_background.jpg", (SCREEN_WIDTH, 1080), True),
+            ("assets/image/wanted.png", (569, 800), True),
+            ("assets/image/lose.jpg", (SCREEN_WIDTH, 1080), True)]
+
+def font_list():
+    """
+    List the fonts game_play uses.
+
+    Returns:
+        list: (face, size) tuples, as passed to get_font.
+    """
+    fonts = [(pygame.font.get_default_font(), 25), (pygame.font.get_default_font(), 15)]
+    for cell_size in MIDDLE_MAZE_CELL_SIZES:
+        fonts.append((pygame.font.get_default_font(), int(cell_size * CELL_IN_BLOCK * 0.8)))
+    for size in (100, 80, 60):
+        fonts.append(("assets/font/one piece font.ttf", size))
+    return fonts
+
+class AssetPreloader:
+    """Class warming the image, font and sound caches on a worker thread.
+
+    The tasks run in the order the game needs them: sound effects and fonts, the
+    game screen, the battle screen, the music tracks and the game over screen.
+    Anything the game asks for before the preloader got to it is simply loaded
+    on demand, as without a preloader. Assets that fail to load are skipped.
+    """
+
+    def __init__(self):
+        """
+        Initialize a preloader. Nothing is loaded before start.
+        """
+        self.tasks = []
+        self.done = 0
+        self.failed = 0
+        self.ready = threading.Event()
+        self.thread = None
+
+    def create_tasks(self):
+        """
+        Build the list of loading tasks.
+
+        Returns:
+            list: (function, args) tuples.
+        """
+        sound_names = sorted(os.listdir(SOUND_BANK.folder))
+        tasks = [(SOUND_BANK.get, (name,)) for name in sound_names if name not in MUSIC_TRACK_LIST]
+        tasks += [(get_font, font) for font in font_list()]
+        for images in (game_image_list(), battle_image_list()):
+            tasks += [(load_image, image) for image in images]
+        tasks += [(SOUND_BANK.get, (name,)) for name in sound_names if name in MUSIC_TRACK_LIST]
+        tasks += [(load_image, image) for image in game_over_image_list()]
+        return tasks
+
+    def start(self):
+        """
+        Start loading on the worker thread. Needs pygame.init and the display mode to be set,
+        since images are converted to the display format.
+        """
+        if self.thread is not None:
+            return
+        SOUND_BANK.setup_channels()
+        self.tasks = self.create_tasks()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Run every loading task, then set the ready flag.
+        """
+        for function, args in self.tasks:
+            try:
+                function(*args)
+            except (pygame.error, OSError):
+                self.failed += 1
+            self.done += 1
+        self.ready.set()
+
+    def progress(self):
+        """
+        Get the share of the tasks done.
+
+        Returns:
+            float: From 0 before start to 1 once every asset is loaded.
+        """
+        if not self.tasks:
+            return 1.0 if self.ready.is_set() else 0.0
+        return self.done / len(self.tasks)
+
+    def is_ready(self):
+        """
+        Check whether every asset has been loaded.
+
+        Returns:
+            bool: True once the worker is done.
+        """
+        return self.ready.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait until every asset has been loaded.
+
+        Args:
+            timeout (float, optional): The longest time to wait in seconds, forever if None.
+
+        Returns:
+            bool: True if the preloader is done.
+        """
+        return self.ready.wait(timeout)
+
+    def __str__(self):
+        """
+        Return a string representation of the preloader progress.
+
+        Returns:
+            str: String representation of the preloader.
+        """
+        return f'done:{self.done}/{len(self.tasks)} failed:{self.failed} ready:{self.is_ready()}'
+
+# The preloader of the game, started by game.main
+PRELOADER = AssetPreloader()
@@ -0,0 +1,77 @@
+import random
+import zlib
+import numpy as np
+from variables import *
+
+# A game draws its random numbers from one stream per subsystem (RANDOM_STREAM_LIST), all derived
+# from the game seed, so drawing more or fewer numbers in one subsystem never changes another one.
+
+def derive_seed(game_seed, stream):
+    """
+    Derive the seed of one random stream of a game.
+
+    The seed only depends on the game seed and the name of the stream, so it is the same in
+    every process and adding a stream does not change the seeds of the others.
+
+    Args:
+        game_seed (int): The seed of the game.
+        stream (str): The name of the stream, one of RANDOM_STREAM_LIST.
+
+    Returns:
+        int: The seed of the stream.
+    """
+    sequence = np.random.SeedSequence(game_seed, spawn_key=(zlib.crc32(stream.encode()),))
+    return int(sequence.generate_state(1, np.uint64)[0])
+
+class RandomStreams:
+    """Class keeping the random number generators of one game, one per subsystem.
+
+    Every generator is a random.Random seeded with derive_seed, never the global random module.
+    """
+
+    def __init__(self, game_seed):
+        """
+        Initialize the streams of a game.
+
+        Args:
+            game_seed (int): The seed of the game.
+        """
+        self.game_seed = game_seed
+        self.generators = {stream: random.Random(self.seed(stream)) for stream in RANDOM_STREAM_LIST}
+
+    def seed(self, stream):
+        """
+        Get the seed of a stream, for the functions taking a seed such as Maze.generate_maze.
+
+        Args:
+            stream (str): The name of the stream.
+
+        Returns:
+            int: The seed of the stream.
+        """
+        if stream not in RANDOM_STREAM_LIST:
+            raise ValueError(f"Unknown random stream: {stream}")
+        return derive_seed(self.game_seed, stream)
+
+    def get(self, stream):
+        """
+        Get the generator of a stream.
+
+        Args:
+            stream (str): The name of the stream.
+
+        Returns:
+            random.Random: The generator of the stream.
+        """
+        if stream not in self.generators:
+            raise ValueError(f"Unknown random stream: {stream}")
+        return self.generators[stream]
+
+    def __str__(self):
+        """
+        Return a string representation of the streams.
+
+        Returns:
+            str: String representation of the streams.
+        """
+        return f'game_seed:{self.game_seed} streams:{",".join(RANDOM_STREAM_LIST)}'
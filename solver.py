@@ -0,0 +1,426 @@
+import heapq
+from array import array
+from collections import deque
+import numpy as np
+from variables import *
+
+# Grid moves as (direction bit, opposite bit, row step, col step) in DIRECTION order
+MOVES = [(DIRECTION_BIT[direction], DIRECTION_BIT[OPPOSITE_DIRECTION[direction]], direction[0], direction[1]) for direction in DIRECTION]
+
+def passable_masks(maze):
+    """
+    Get, for every cell in grid order, the directions in which the player can actually move.
+
+    A move is allowed under the same rule as check_*_validate in game_play: both cells must be
+    open towards each other and the move must not leave the maze (there is no wrapping).
+    The current arrangement of the blocks is used.
+
+    Args:
+        maze: The Maze object.
+
+    Returns:
+        bytearray: The passable mask (see DIRECTION_BIT) of the cell with grid index i at position i.
+    """
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    masks = np.frombuffer(maze.grid_connect_masks(), dtype=np.uint8).reshape(size, size)
+    passable = np.zeros((size, size), dtype=np.uint8)
+    for bit, opposite, row_step, col_step in MOVES:
+        # Compare every cell with its neighbor at once, over the cells whose neighbor is inside the maze
+        rows = slice(max(0, -row_step), size - max(0, row_step))
+        cols = slice(max(0, -col_step), size - max(0, col_step))
+        neighbor_rows = slice(rows.start + row_step, rows.stop + row_step)
+        neighbor_cols = slice(cols.start + col_step, cols.stop + col_step)
+        open_both = (masks[rows, cols] & bit != 0) & (masks[neighbor_rows, neighbor_cols] & opposite != 0)
+        passable[rows, cols] |= open_both.astype(np.uint8) * bit
+    return bytearray(passable.tobytes())
+
+def neighbors(passable, size, index):
+    """
+    Get the cells reachable in one move from a cell.
+
+    Args:
+        passable (bytearray): The passable masks from passable_masks.
+        size (int): The number of cells in each row and column of the maze.
+        index (int): The grid index of the cell.
+
+    Returns:
+        list: The grid indices of the reachable neighbors.
+    """
+    mask = passable[index]
+    return [index + row_step * size + col_step for bit, _, row_step, col_step in MOVES if mask & bit]
+
+def new_index_array(size):
+    """
+    Create an array holding one grid index per cell, initialized to -1 (not reached).
+
+    Args:
+        size (int): The number of cells in each row and column of the maze.
+
+    Returns:
+        array: The array of size * size entries.
+    """
+    return array("i", [-1]) * (size * size)
+
+def build_path(maze, came_from, start_index, end_index):
+    """
+    Rebuild a path by following came_from links back from the end to the start.
+
+    Args:
+        maze: The Maze object.
+        came_from (array): The previous cell of every reached cell.
+        start_index (int): The grid index of the start cell.
+        end_index (int): The grid index of the end cell.
+
+    Returns:
+        list: The path as positions (block_row, block_col, cell_row, cell_col) from start to end.
+    """
+    path = [end_index]
+    while path[-1] != start_index:
+        path.append(came_from[path[-1]])
+    path.reverse()
+    return [maze.grid_pos(index) for index in path]
+
+def bfs(maze, start, end, passable=None):
+    """
+    Find a shortest path with a breadth-first search.
+
+    Args:
+        maze: The Maze object.
+        start (tuple): The start position (block_row, block_col, cell_row, cell_col).
+        end (tuple): The end position (block_row, block_col, cell_row, cell_col).
+        passable (bytearray, optional): Precomputed passable masks of the maze.
+
+    Returns:
+        list: The shortest path from start to end, or an empty list if end is unreachable.
+    """
+    if passable is None:
+        passable = passable_masks(maze)
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    start_index, end_index = maze.grid_index(start), maze.grid_index(end)
+    came_from = new_index_array(size)
+    came_from[start_index] = start_index
+    queue = deque([start_index])
+    while queue:
+        index = queue.popleft()
+        if index == end_index:
+            return build_path(maze, came_from, start_index, end_index)
+        for neighbor in neighbors(passable, size, index):
+            if came_from[neighbor] == -1:
+                came_from[neighbor] = index
+                queue.append(neighbor)
+    return []
+
+def a_star(maze, start, end, passable=None):
+    """
+    Find a shortest path with A* search and the Manhattan distance heuristic.
+
+    Args:
+        maze: The Maze object.
+        start (tuple): The start position (block_row, block_col, cell_row, cell_col).
+        end (tuple): The end position (block_row, block_col, cell_row, cell_col).
+        passable (bytearray, optional): Precomputed passable masks of the maze.
+
+    Returns:
+        list: The shortest path from start to end, or an empty list if end is unreachable.
+    """
+    if passable is None:
+        passable = passable_masks(maze)
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    start_index, end_index = maze.grid_index(start), maze.grid_index(end)
+    end_row, end_col = divmod(end_index, size)
+
+    def heuristic(index):
+        row, col = divmod(index, size)
+        return abs(row - end_row) + abs(col - end_col)
+
+    came_from = new_index_array(size)
+    came_from[start_index] = start_index
+    cost = new_index_array(size)
+    cost[start_index] = 0
+    heap = [(heuristic(start_index), 0, start_index)]
+    while heap:
+        _, index_cost, index = heapq.heappop(heap)
+        if index == end_index:
+            return build_path(maze, came_from, start_index, end_index)
+        if index_cost > cost[index]:
+            continue
+        for neighbor in neighbors(passable, size, index):
+            new_cost = index_cost + 1
+            if cost[neighbor] == -1 or new_cost < cost[neighbor]:
+                cost[neighbor] = new_cost
+                came_from[neighbor] = index
+                heapq.heappush(heap, (new_cost + heuristic(neighbor), new_cost, neighbor))
+    return []
+
+def bidirectional(maze, start, end, passable=None):
+    """
+    Find a shortest path with a breadth-first search from both ends at once.
+
+    The smaller frontier is expanded one whole level at a time until the two searches meet.
+
+    Args:
+        maze: The Maze object.
+        start (tuple): The start position (block_row, block_col, cell_row, cell_col).
+        end (tuple): The end position (block_row, block_col, cell_row, cell_col).
+        passable (bytearray, optional): Precomputed passable masks of the maze.
+
+    Returns:
+        list: The shortest path from start to end, or an empty list if end is unreachable.
+    """
+    if passable is None:
+        passable = passable_masks(maze)
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    start_index, end_index = maze.grid_index(start), maze.grid_index(end)
+    came_from_start = new_index_array(size)
+    came_from_start[start_index] = start_index
+    came_from_end = new_index_array(size)
+    came_from_end[end_index] = end_index
+    depth_start = new_index_array(size)
+    depth_start[start_index] = 0
+    depth_end = new_index_array(size)
+    depth_end[end_index] = 0
+    frontier_start, frontier_end = [start_index], [end_index]
+    meet = start_index if start_index == end_index else None
+    while meet is None and frontier_start and frontier_end:
+        # Expand the smaller side
+        if len(frontier_start) <= len(frontier_end):
+            frontier, came_from, depth, other_depth = frontier_start, came_from_start, depth_start, depth_end
+        else:
+            frontier, came_from, depth, other_depth = frontier_end, came_from_end, depth_end, depth_start
+        # Finish the whole level and keep the shortest of the meetings found in it
+        next_frontier = []
+        best_length = -1
+        for index in frontier:
+            for neighbor in neighbors(passable, size, index):
+                if came_from[neighbor] == -1:
+                    came_from[neighbor] = index
+                    depth[neighbor] = depth[index] + 1
+                    next_frontier.append(neighbor)
+                    if other_depth[neighbor] != -1 and (best_length == -1 or depth[neighbor] + other_depth[neighbor] < best_length):
+                        meet = neighbor
+                        best_length = depth[neighbor] + other_depth[neighbor]
+        if frontier is frontier_start:
+            frontier_start = next_frontier
+        else:
+            frontier_end = next_frontier
+    if meet is None:
+        return []
+    path = build_path(maze, came_from_start, start_index, meet)
+    second_half = build_path(maze, came_from_end, end_index, meet)
+    second_half.reverse()
+    return path + second_half[1:]
+
+SOLVERS = {
+    "bfs": bfs,
+    "a_star": a_star,
+    "bidirectional": bidirectional
+}
+
+def solve(maze, start, end, algorithm="bfs", passable=None):
+    """
+    Find a shortest path between two positions of the maze, following its current block arrangement.
+
+    Args:
+        maze: The Maze object.
+        start (tuple): The start position (block_row, block_col, cell_row, cell_col).
+        end (tuple): The end position (block_row, block_col, cell_row, cell_col).
+        algorithm (str): The name of the solver in SOLVERS ("bfs", "a_star" or "bidirectional").
+        passable (bytearray, optional): Precomputed passable masks of the maze.
+
+    Returns:
+        list: The shortest path from start to end, or an empty list if end is unreachable.
+    """
+    if algorithm not in SOLVERS:
+        raise ValueError(f"Unknown maze solving algorithm: {algorithm}")
+    return SOLVERS[algorithm](maze, start, end, passable)
+
+def block_grid_indices(maze, block_idx):
+    """
+    Get the grid indices of all cells of a block.
+
+    Args:
+        maze: The Maze object.
+        block_idx (tuple): Indices of the block (row, column).
+
+    Returns:
+        list: The grid indices of the block's cells.
+    """
+    size = maze.block_in_maze * CELL_IN_BLOCK
+    first_row, first_col = block_idx[0] * CELL_IN_BLOCK, block_idx[1] * CELL_IN_BLOCK
+    return [row * size + col for row in range(first_row, first_row + CELL_IN_BLOCK) for col in range(first_col, first_col + CELL_IN_BLOCK)]
+
+class DistanceField:
+    """Cache of the distance from every cell to a target cell, repaired locally after block exchanges."""
+
+    def __init__(self, maze, block_number, cell_row, cell_col):
+        """
+        Initialize the distance field with a full breadth-first search from the target.
+
+        Args:
+            maze: The Maze object.
+            block_number (int): The number of the block containing the target (e.g. the finish flag).
+            cell_row (int): The row of the target in its block.
+            cell_col (int): The column of the target in its block.
+        """
+        self.maze = maze
+        self.size = maze.block_in_maze * CELL_IN_BLOCK
+        self.target = (block_number, cell_row, cell_col)
+        self.recompute()
+
+    def target_index(self):
+        """
+        Get the current grid index of the target, which moves with its block.
+
+        Returns:
+            int: The grid index of the target.
+        """
+        return self.maze.grid_index(self.maze.get_pos(*self.target))
+
+    def recompute(self):
+        """
+        Recompute the passable masks and all distances from scratch.
+        """
+        self.passable = passable_masks(self.maze)
+        self.target_grid_index = self.target_index()
+        self.dist = new_index_array(self.size)
+        self.dist[self.target_grid_index] = 0
+        queue = deque([self.target_grid_index])
+        while queue:
+            index = queue.popleft()
+            for neighbor in neighbors(self.passable, self.size, index):
+                if self.dist[neighbor] == -1:
+                    self.dist[neighbor] = self.dist[index] + 1
+                    queue.append(neighbor)
+
+    def distance(self, pos):
+        """
+        Get the number of moves from a position to the target.
+
+        Args:
+            pos (tuple): The position (block_row, block_col, cell_row, cell_col).
+
+        Returns:
+            int: The distance, or -1 if the target cannot be reached.
+        """
+        return self.dist[self.maze.grid_index(pos)]
+
+    def path(self, pos):
+        """
+        Get a shortest path from a position to the target by always stepping to a closer neighbor.
+
+        Args:
+            pos (tuple): The start position (block_row, block_col, cell_row, cell_col).
+
+        Returns:
+            list: The path as positions from pos to the target, or an empty list if the target cannot be reached.
+        """
+        index = self.maze.grid_index(pos)
+        if self.dist[index] == -1:
+            return []
+        path = [index]
+        while self.dist[index] > 0:
+            index = next(neighbor for neighbor in neighbors(self.passable, self.size, index) if self.dist[neighbor] == self.dist[index] - 1)
+            path.append(index)
+        return [self.maze.grid_pos(index) for index in path]
+
+    def passable_mask(self, index):
+        """
+        Compute the passable mask of one cell from the maze (see passable_masks).
+
+        Args:
+            index (int): The grid index of the cell.
+
+        Returns:
+            int: The passable mask of the cell.
+        """
+        maze, size = self.maze, self.size
+        mask = maze.connect_grid[maze.cell_index(maze.grid_pos(index))]
+        row, col = divmod(index, size)
+        result = 0
+        for bit, opposite, row_step, col_step in MOVES:
+            if mask & bit and 0 <= row + row_step < size and 0 <= col + col_step < size:
+                neighbor = index + row_step * size + col_step
+                if maze.connect_grid[maze.cell_index(maze.grid_pos(neighbor))] & opposite:
+                    result |= bit
+        return result
+
+    def update_after_exchange(self, block1_idx, block2_idx):
+        """
+        Repair the distance field after Maze.exchange_block swapped two blocks.
+
+        Only the two blocks, the cells bordering them and the cells whose shortest path went
+        through them are visited: first every cell that lost all its neighbors one step closer to
+        the target is invalidated (in order of old distance), then distances are rebuilt outwards
+        from the changed region, which also spreads shortcuts opened by the exchange.
+
+        Args:
+            block1_idx (tuple): Indices of the first exchanged block (row, column).
+            block2_idx (tuple): Indices of the second exchanged block (row, column).
+        """
+        if block1_idx == block2_idx:
+            return
+        if self.target_index() != self.target_grid_index:
+            # The target moved with its block, so every distance changed
+            self.recompute()
+            return
+        size, dist = self.size, self.dist
+        moved = set(block_grid_indices(self.maze, block1_idx)) | set(block_grid_indices(self.maze, block2_idx))
+        border = set()
+        for index in moved:
+            row, col = divmod(index, size)
+            for _, _, row_step, col_step in MOVES:
+                if 0 <= row + row_step < size and 0 <= col + col_step < size:
+                    neighbor = index + row_step * size + col_step
+                    if neighbor not in moved:
+                        border.add(neighbor)
+        
+        # Refresh the passable masks of the changed cells, keeping the old ones for the old shortest-path tree
+        old_passable = {}
+        for index in moved | border:
+            old_passable[index] = self.passable[index]
+            self.passable[index] = self.passable_mask(index)
+        
+        # Invalidate the moved cells and every cell that no longer has a valid neighbor one step closer
+        invalid = set()
+        heap = [(max(dist[index], 0), index) for index in moved] + [(dist[index], index) for index in border if dist[index] != -1]
+        heapq.heapify(heap)
+        while heap:
+            old_dist, index = heapq.heappop(heap)
+            if index in invalid or index == self.target_grid_index:
+                continue
+            if index not in moved:
+                supported = any(neighbor not in invalid and dist[neighbor] == old_dist - 1
+                                for neighbor in neighbors(self.passable, size, index))
+                if supported:
+                    continue
+            invalid.add(index)
+            if dist[index] == -1:
+                continue
+            # Children of the cell in the old shortest-path tree may have lost their support
+            old_mask = old_passable.get(index, self.passable[index])
+            row, col = divmod(index, size)
+            for bit, _, row_step, col_step in MOVES:
+                if old_mask & bit:
+                    child = index + row_step * size + col_step
+                    if dist[child] == old_dist + 1 and child not in invalid:
+                        heapq.heappush(heap, (old_dist + 1, child))
+        for index in invalid:
+            dist[index] = -1
+        
+        # Rebuild distances from every valid cell around the changed region
+        heap = []
+        for index in invalid | border:
+            if dist[index] != -1:
+                heap.append((dist[index], index))
+            for neighbor in neighbors(self.passable, size, index):
+                if dist[neighbor] != -1 and neighbor not in invalid:
+                    heap.append((dist[neighbor], neighbor))
+        heapq.heapify(heap)
+        while heap:
+            index_dist, index = heapq.heappop(heap)
+            if index_dist != dist[index]:
+                continue
+            for neighbor in neighbors(self.passable, size, index):
+                if dist[neighbor] == -1 or index_dist + 1 < dist[neighbor]:
+                    dist[neighbor] = index_dist + 1
+                    heapq.heappush(heap, (index_dist + 1, neighbor))
@@ -0,0 +1,163 @@
+import os
+import threading
+import pygame
+from variables import *
+
+# Reserved channels, never handed out to sound effects
+MUSIC_CHANNEL = 0
+VOICE_CHANNEL = 1
+
+# Event posted when a music track played with a callback ends
+MUSIC_END_EVENT = pygame.event.custom_type()
+
+class SoundBank:
+    """Class keeping every decoded sound of the game and the channels that play them.
+
+    Sounds are decoded once and kept by file name. Music plays on a reserved
+    channel from decoded sounds as well, so switching tracks never reads or
+    decodes a file again. Effects share the remaining channels; when they are
+    all busy the oldest effect is cut off.
+
+    Sounds can be decoded from another thread (see preloader.py). The decode runs
+    outside of the lock, so playing a decoded sound never waits for it.
+
+    A track can be given a callback to run when it ends, for example to start the
+    next track. The callback runs from handle_event, which the event loops call
+    for every event (see loop_driver.py), so nothing has to wait for the track.
+    """
+
+    def __init__(self, folder, channel_count):
+        """
+        Initialize a sound bank. Nothing is decoded before the first use of a sound.
+
+        Args:
+            folder (str): The folder containing the sound files.
+            channel_count (int): The number of mixer channels, including the reserved ones.
+        """
+        self.folder = folder
+        self.channel_count = channel_count
+        self.sounds = {}
+        self.channels_ready = False
+        self.music = None
+        self.on_music_end = None
+        self.lock = threading.Lock()
+
+    def setup_channels(self):
+        """
+        Allocate the mixer channels and reserve the music and voice channels.
+        """
+        if not self.channels_ready:
+            pygame.mixer.set_num_channels(self.channel_count)
+            pygame.mixer.set_reserved(VOICE_CHANNEL + 1)
+            self.channels_ready = True
+
+    def get(self, name):
+        """
+        Get a decoded sound, decoding it on first use.
+
+        Args:
+            name (str): The file name of the sound in the folder.
+
+        Returns:
+            pygame.mixer.Sound: The sound.
+        """
+        with self.lock:
+            sound = self.sounds.get(name)
+        if sound is None:
+            sound = pygame.mixer.Sound(os.path.join(self.folder, name))
+            with self.lock:
+                # Another thread may have decoded it in the meantime
+                sound = self.sounds.setdefault(name, sound)
+        return sound
+
+    def play(self, name):
+        """
+        Play a sound effect on a free effect channel, or on the oldest busy one.
+
+        Args:
+            name (str): The file name of the sound in the folder.
+
+        Returns:
+            pygame.mixer.Channel: The channel playing the sound.
+        """
+        self.setup_channels()
+        channel = pygame.mixer.find_channel(True)
+        channel.play(self.get(name))
+        return channel
+
+    def play_voice(self, name):
+        """
+        Play a sound on the voice channel, stopping the previous voice.
+
+        Args:
+            name (str): The file name of the sound in the folder.
+
+        Returns:
+            pygame.mixer.Channel: The voice channel.
+        """
+        self.setup_channels()
+        channel = pygame.mixer.Channel(VOICE_CHANNEL)
+        channel.play(self.get(name))
+        return channel
+
+    def play_music(self, name, loops=-1, on_end=None):
+        """
+        Play a music track from the start on the music channel, replacing the current one.
+
+        Args:
+            name (str): The file name of the track in the folder.
+            loops (int, optional): The number of extra repetitions, -1 to loop forever.
+            on_end (callable, optional): The function to call, without arguments, when the track ends.
+        """
+        self.setup_channels()
+        channel = pygame.mixer.Channel(MUSIC_CHANNEL)
+        # The callback of the track being replaced must not run
+        self.on_music_end = on_end
+        channel.set_endevent(MUSIC_END_EVENT if on_end is not None else pygame.NOEVENT)
+        channel.play(self.get(name), loops)
+        self.music = name
+
+    def handle_event(self, event):
+        """
+        Run the callback of the music track if the event says it ended.
+
+        Args:
+            event (pygame.event.Event): An event from the event queue.
+
+        Returns:
+            bool: True if the event was a music end event, which needs no other handling.
+        """
+        if event.type != MUSIC_END_EVENT:
+            return False
+        on_end = self.on_music_end
+        self.on_music_end = None
+        pygame.mixer.Channel(MUSIC_CHANNEL).set_endevent()
+        if on_end is not None:
+            on_end()
+        return True
+
+# The sound bank shared by the whole game
+SOUND_BANK = SoundBank(SOUND_FOLDER, SOUND_CHANNEL_COUNT)
+
+def play_sound(name):
+    """
+    Play a sound effect from the shared sound bank (see SoundBank.play).
+
+    Args:
+        name (str): The file name of the sound.
+
+    Returns:
+        pygame.mixer.Channel: The channel playing the sound.
+    """
+    return SOUND_BANK.play(name)
+
+def play_music(name, loops=-1, on_end=None):
+    """
+    Play a music track from the shared sound bank (see SoundBank.play_music).
+
+    Args:
+        name (str): The file name of the track.
+        loops (int, optional): The number of extra repetitions, -1 to loop forever.
+        on_end (callable, optional): The function to call when the track ends.
+    """
+    SOUND_BANK.play_music(name, loops, on_end)
@@ -0,0 +1,132 @@
+from variables import *
+
+class SpatialIndex:
+    """Class keeping the items and enemies of a maze by block number, with one bucket per cell.
+
+    Entities are filed under their kind ("coin", ..., "finish_flag", "enemy") in the bucket
+    of their (block_number, cell_row, cell_col) key. Block numbers follow the blocks when
+    they are exchanged, so the index stays valid without being rebuilt. Collected items and
+    defeated enemies are removed, so queries only ever look at live entities.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty spatial index.
+        """
+        self.blocks = {}
+        self.kinds = {}
+
+    def add(self, kind, entity):
+        """
+        Add an entity to the index.
+
+        Args:
+            kind (str): The kind of the entity, like the item type or "enemy".
+            entity: The Item or Enemy object.
+        """
+        cells = self.blocks.setdefault(entity.block_number, {})
+        cells.setdefault((entity.cell_row, entity.cell_col), {})[kind] = entity
+        self.kinds.setdefault(kind, {})[(entity.block_number, entity.cell_row, entity.cell_col)] = entity
+
+    def add_all(self, kind, entity_dict):
+        """
+        Add every entity of a dictionary to the index.
+
+        Args:
+            kind (str): The kind of the entities.
+            entity_dict (dict): The entities, keyed by (block_number, cell_row, cell_col).
+        """
+        for entity in entity_dict.values():
+            self.add(kind, entity)
+
+    def remove(self, kind, entity):
+        """
+        Remove an entity from the index. Empty buckets are dropped.
+
+        Args:
+            kind (str): The kind of the entity.
+            entity: The Item or Enemy object.
+        """
+        cells = self.blocks.get(entity.block_number)
+        if cells is None:
+            return
+        cell = (entity.cell_row, entity.cell_col)
+        bucket = cells.get(cell)
+        if bucket is None or bucket.get(kind) is not entity:
+            return
+        del bucket[kind]
+        del self.kinds[kind][(entity.block_number, entity.cell_row, entity.cell_col)]
+        if not bucket:
+            del cells[cell]
+            if not cells:
+                del self.blocks[entity.block_number]
+
+    def get_cell(self, block_number, cell_row, cell_col):
+        """
+        Get the entities in one cell.
+
+        Args:
+            block_number (int): The number of the block containing the cell.
+            cell_row (int): The row of the cell in the block.
+            cell_col (int): The column of the cell in the block.
+
+        Returns:
+            dict: The entities of the cell keyed by kind, empty if there are none. Must not be modified.
+        """
+        cells = self.blocks.get(block_number)
+        if cells is None:
+            return {}
+        return cells.get((cell_row, cell_col), {})
+
+    def get_all(self, kind):
+        """
+        Get every entity of a kind still in the index.
+
+        Args:
+            kind (str): The kind of the entities.
+
+        Returns:
+            list: The entities.
+        """
+        return list(self.kinds.get(kind, {}).values())
+
+    def get_in_range(self, maze, kind, first_row, last_row, first_col, last_col):
+        """
+        Get the entities of a kind in a range of cells of the maze, at the current block positions.
+
+        Only the blocks overlapping the range are looked at.
+
+        Args:
+            maze (Maze): The maze the range is in.
+            kind (str): The kind of the entities.
+            first_row (int): The first row of cells in grid coordinates.
+            last_row (int): The row after the last one.
+            first_col (int): The first column of cells in grid coordinates.
+            last_col (int): The column after the last one.
+
+        Returns:
+            list: The entities in the range.
+        """
+        entities = []
+        if first_row >= last_row or first_col >= last_col:
+            return entities
+        for block_row in range(first_row // CELL_IN_BLOCK, (last_row - 1) // CELL_IN_BLOCK + 1):
+            for block_col in range(first_col // CELL_IN_BLOCK, (last_col - 1) // CELL_IN_BLOCK + 1):
+                cells = self.blocks.get(maze.block[block_row][block_col].block_num)
+                if cells is None:
+                    continue
+                for (cell_row, cell_col), bucket in cells.items():
+                    entity = bucket.get(kind)
+                    if entity is not None and first_row <= block_row * CELL_IN_BLOCK + cell_row < last_row \
+                            and first_col <= block_col * CELL_IN_BLOCK + cell_col < last_col:
+                        entities.append(entity)
+        return entities
+
+    def __len__(self):
+        """
+        Get the number of entities in the index.
+
+        Returns:
+            int: The number of entities.
+        """
+        return sum(len(entities) for entities in self.kinds.values())
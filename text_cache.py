@@ -0,0 +1,111 @@
+import threading
+import pygame
+from collections import OrderedDict
+from variables import *
+
+# Fonts shared by the whole game, keyed by (face, size)
+FONTS = {}
+# FreeType needs the fonts to be opened one at a time, whatever thread opens them
+FONTS_LOCK = threading.Lock()
+
+def get_font(face, size):
+    """
+    Get a font from the shared font registry, creating it on first use.
+
+    Args:
+        face (str): The path to the font file, or pygame.font.get_default_font() for the default font.
+        size (int): The size of the font.
+
+    Returns:
+        pygame.font.Font: The font.
+    """
+    key = (face, size)
+    with FONTS_LOCK:
+        font = FONTS.get(key)
+        if font is None:
+            font = pygame.font.Font(face, size)
+            FONTS[key] = font
+    return font
+
+class TextCache:
+    """Class keeping rendered text surfaces, evicting the least recently used ones.
+
+    Texts are keyed on (font, text, color, alpha) and the cache holds at most
+    max_entries of them. The surfaces returned are shared, so callers must not
+    draw on them or change their alpha.
+    """
+
+    def __init__(self, max_entries):
+        """
+        Initialize a text cache.
+
+        Args:
+            max_entries (int): The maximum number of rendered texts kept.
+        """
+        self.max_entries = max_entries
+        self.texts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, alpha=None):
+        """
+        Get an antialiased rendering of a text, rendering it only if it is not cached yet.
+
+        Args:
+            font (pygame.font.Font): The font, from get_font.
+            text (str): The text to render.
+            color: The color of the text.
+            alpha (int, optional): The alpha value of the whole surface (see pygame.Surface.set_alpha).
+
+        Returns:
+            pygame.Surface: The rendered text.
+        """
+        key = (font, text, tuple(color), alpha)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.texts.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        if alpha is not None:
+            surface.set_alpha(alpha)
+        self.texts[key] = surface
+        if len(self.texts) > self.max_entries:
+            self.texts.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """
+        Remove every text from the cache. The counters are kept.
+        """
+        self.texts.clear()
+
+    def __str__(self):
+        """
+        Return a string representation of the cache statistics.
+
+        Returns:
+            str: String representation of the cache.
+        """
+        return f'texts:{len(self.texts)} hits:{self.hits} misses:{self.misses} evictions:{self.evictions}'
+
+# The text cache shared by the whole game
+TEXT_CACHE = TextCache(TEXT_CACHE_MAX_ENTRIES)
+
+def render_text(font, text, color, alpha=None):
+    """
+    Render a text through the shared text cache (see TextCache.render).
+
+    Args:
+        font (pygame.font.Font): The font, from get_font.
+        text (str): The text to render.
+        color: The color of the text.
+        alpha (int, optional): The alpha value of the whole surface.
+
+    Returns:
+        pygame.Surface: The rendered text.
+    """
+    return TEXT_CACHE.render(font, text, color, alpha)
@@ -1,5 +1,3 @@
-import random
-
 SCREEN_WIDTH = 1540
 SCREEN_HEIGHT = 1190
 VISIBLE_WIDTH = 725
@@ -15,6 +13,9 @@ SMALL_MAZE_CELL_SIZE = 15
 
 LEFT, RIGHT, UP, DOWN = (0,-1), (0,1), (-1,0), (1,0)
 DIRECTION = [LEFT, RIGHT, UP, DOWN]
+# Bit of each direction in a cell's connect mask (bit set = open towards that side)
+DIRECTION_BIT = {LEFT: 1, RIGHT: 2, UP: 4, DOWN: 8}
+OPPOSITE_DIRECTION = {LEFT: RIGHT, RIGHT: LEFT, UP: DOWN, DOWN: UP}
 
 WHITE = (255,255,255)
 RED = (255, 0, 0)
@@ -75,10 +76,67 @@ HELPER_LIST = ["Zoro", "Sanji", "Nami", "Usopp", "Chopper", "Brook"]
 EASY_ENEMY_LIST = ["BUGGY", "Kuro", "Krieg", "Arlong"]
 MEDIUM_ENEMY_LIST = ["BUGGY", "Kuro", "Krieg", "Arlong", "Crocodile", "Lucci", "Moria"]
 HARD_ENEMY_LIST = ["BUGGY", "Kuro", "Krieg", "Arlong", "Crocodile", "Lucci", "Moria", "Magellan", "Katakuri", "Blackbeard"]
+# Base stats of the enemies of each level; every enemy gets -1, 0 or +1 attack and defense and
+# -ENEMY_LIFE_VARIATION, 0 or +ENEMY_LIFE_VARIATION life (see the enemy factories in engine.py)
+EASY_ENEMY_ATTACK = 10
+EASY_ENEMY_DEFENSE = 3
+EASY_ENEMY_LIFE = 250
+EASY_ENEMY_DICE = (1, 3)
+MEDIUM_ENEMY_ATTACK = 13
+MEDIUM_ENEMY_DEFENSE = 4
+MEDIUM_ENEMY_LIFE = 400
+MEDIUM_ENEMY_DICE = (1, 4)
+HARD_ENEMY_ATTACK = 15
+HARD_ENEMY_DEFENSE = 5
+HARD_ENEMY_LIFE = 500
+HARD_ENEMY_DICE = (1, 6)
+ENEMY_LIFE_VARIATION = 20
 DELAY_TIME = 50
+# Maze images larger than this many pixels are exported as PNG strips with NumPy (see export.py)
+EXPORT_PIXEL_LIMIT = 4096 * 4096
+EXPORT_STRIP_BYTES = 64 * 1024 * 1024
+# Loaded and resized images are kept up to this many bytes (see image_cache.py)
+IMAGE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+# Mazes wider than this many pixels are drawn cell by cell every frame instead of from a cached image (see MazeCache)
+MAZE_CACHE_MAX_SIZE = 8192
+# Rendered texts kept by the text cache (see text_cache.py)
+TEXT_CACHE_MAX_ENTRIES = 512
+# Sounds are decoded once into the sound bank (see sound_bank.py); music tracks only on their first play
+SOUND_FOLDER = "assets/sounds"
+SOUND_CHANNEL_COUNT = 8
+MUSIC_TRACK_LIST = ["Overtaken.mp3", "Luffy Fierce Attack.mp3", "Strongest.mp3", "bgm_WeAre.wav", "Binks' Sake.mp3", "Mother Sea.mp3"]
+# The event loops run at most TARGET_FPS frames per second and, when idle, sleep in
+# pygame.event.wait for up to IDLE_WAIT_TIME milliseconds (see loop_driver.py)
+TARGET_FPS = 60
+IDLE_WAIT_TIME = 100
+# Output files are written by worker threads from a bounded queue (see artifact_writer.py)
+ARTIFACT_QUEUE_SIZE = 8
+ARTIFACT_WORKER_COUNT = 2
+# Set an output file to False to stop writing it
+ARTIFACT_ENABLED = {"path.txt": True, "maze.jpg": True, "solution.jpg": True, "randomize_maze.jpg": True,
+                    "randomize_solution.jpg": True, "Initial start.jpeg": True, "Exchange Mode.jpeg": True,
+                    "After Exchange.jpeg": True, "Battle.jpeg": True}
 SKILL_EXECUTION_TIME_LIST = ["right_away", "before_attack", "after_attack", "before_defense", "after_defense"]
+# Battles are simulated SIMULATED_BATTLE_BATCH at a time, and stopped as draws after MAX_SIMULATED_ROLLS dice rolls (see battle_sim.py)
+SIMULATED_BATTLE_COUNT = 1000000
+SIMULATED_BATTLE_BATCH = 250000
+MAX_SIMULATED_ROLLS = 1000
+# Odds tables kept by the battle odds oracle, shown in the battle screen (see battle_odds.py)
+BATTLE_ODDS_CACHE_SIZE = 24
+BATTLE_ODDS_RECT_POS = (380, 315, 685, 30)
+# Maze sizes, repetitions and regression tolerance of the benchmark suite (see benchmark.py)
+BENCHMARK_BLOCK_IN_MAZE_LIST = [3, 5, 10, 25, 50, 100, 200]
+BENCHMARK_CELL_IN_BLOCK_LIST = [4, 8, 16]
+BENCHMARK_MAX_CELLS = 2000 * 2000
+BENCHMARK_REPEAT = 5
+BENCHMARK_TIME_BUDGET = 5
+BENCHMARK_CALLS = 1000
+BENCHMARK_EXPORT_CELL_SIZE = 2
+BENCHMARK_TOLERANCE = 0.25
+BENCHMARK_MIN_SECONDS = 0.01
 
 
 # my_seed = random.randint(0, 1000)
+# The seed of the game, and the random streams derived from it, one per subsystem (see rng.py)
 my_seed=42
-random.seed(my_seed)
\ No newline at end of file
+RANDOM_STREAM_LIST = ["maze", "randomize", "items", "enemies", "combat"]
\ No newline at end of file